@@ -1,7 +1,8 @@
 # Import necessary modules
 import streamlit as st
 import streamlit.components.v1 as components  # For embedding custom HTML
-from generate_knowledge_graph import generate_knowledge_graph, get_accumulated_graph_visualization, store_graph_in_neo4j
+from generate_knowledge_graph import generate_knowledge_graph, get_accumulated_graph_visualization, get_neighborhood_graph_visualization
+from kg_config import EXTRACTION_NODE_TYPES, VISUALIZATION_CONFIG
 
 # Set up Streamlit page configuration
 st.set_page_config(
@@ -43,6 +44,28 @@ if st.sidebar.button("Show Accumulated Graph"):
             HtmlFile = open(output_file, 'r', encoding='utf-8')
             components.html(HtmlFile.read(), height=1000)
 
+# Sidebar section for neighborhood exploration
+st.sidebar.markdown("---")
+st.sidebar.title("Neighborhood")
+seed_entity = st.sidebar.text_input("Seed entity id")
+# Extracted nodes are stored under the capitalized extraction types, e.g. Viral_strain
+seed_type = st.sidebar.selectbox(
+    "Entity type", [""] + [node_type.capitalize() for node_type in EXTRACTION_NODE_TYPES]
+)
+hops = st.sidebar.slider("Hops", 1, VISUALIZATION_CONFIG.get("max_hops", 3), 1)
+if st.sidebar.button("Show Neighborhood"):
+    if not seed_entity and not seed_type:
+        st.warning("Enter a seed entity id or choose an entity type.")
+    else:
+        with st.spinner("Loading neighborhood from Neo4j..."):
+            net = get_neighborhood_graph_visualization(seed_entity, seed_type, hops)
+            if net is not None:
+                st.success("Neighborhood graph loaded successfully!")
+                
+                # Open the HTML file and display it within the Streamlit app
+                HtmlFile = open("neighborhood_knowledge_graph.html", 'r', encoding='utf-8')
+                components.html(HtmlFile.read(), height=1000)
+
 # Case 1: User chooses to upload a .txt file
 if input_method == "Upload txt":
     # File uploader widget in the sidebar
@@ -58,15 +81,16 @@ if input_method == "Upload txt":
                 # Call the function to generate the graph from the text
                 document_name = uploaded_file.name
                 net = generate_knowledge_graph(text, document_name=document_name, store_in_neo4j=store_in_neo4j)
-                st.success("Knowledge graph generated successfully!")
-                
-                # Save the graph to an HTML file
-                output_file = "knowledge_graph.html"
-                net.save_graph(output_file) 
+                if net is not None:
+                    st.success("Knowledge graph generated successfully!")
+                    
+                    # Save the graph to an HTML file
+                    output_file = "knowledge_graph.html"
+                    net.save_graph(output_file) 
 
-                # Open the HTML file and display it within the Streamlit app
-                HtmlFile = open(output_file, 'r', encoding='utf-8')
-                components.html(HtmlFile.read(), height=1000)
+                    # Open the HTML file and display it within the Streamlit app
+                    HtmlFile = open(output_file, 'r', encoding='utf-8')
+                    components.html(HtmlFile.read(), height=1000)
 
 # Case 2: User chooses to directly input text
 else:
@@ -78,13 +102,15 @@ else:
             with st.spinner("Generating knowledge graph..."):
                 # Call the function to generate the graph from the input text
                 document_name = "Manual Input"
-                net = generate_knowledge_graph(text, document_name=document_name, store_in_neo4j=store_in_neo4j)
-                st.success("Knowledge graph generated successfully!")
-                
-                # Save the graph to an HTML file
-                output_file = "knowledge_graph.html"
-                net.save_graph(output_file) 
+                # Manual inputs share a name, so they must not be diffed against each other
+                net = generate_knowledge_graph(text, document_name=document_name, store_in_neo4j=store_in_neo4j, incremental=False)
+                if net is not None:
+                    st.success("Knowledge graph generated successfully!")
+                    
+                    # Save the graph to an HTML file
+                    output_file = "knowledge_graph.html"
+                    net.save_graph(output_file) 
 
-                # Open the HTML file and display it within the Streamlit app
-                HtmlFile = open(output_file, 'r', encoding='utf-8')
-                components.html(HtmlFile.read(), height=1000)
\ No newline at end of file
+                    # Open the HTML file and display it within the Streamlit app
+                    HtmlFile = open(output_file, 'r', encoding='utf-8')
+                    components.html(HtmlFile.read(), height=1000)
\ No newline at end of file
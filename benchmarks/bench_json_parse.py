@@ -0,0 +1,73 @@
+"""
+Micro-benchmark for parsing prompt-based (unstructured) extraction responses.
+
+Compares `json_repair.loads` on every response, as before, against the tiered
+parser that tries a strict parser (orjson when installed), then strips a
+markdown code fence, and only repairs what neither can parse. Responses are
+synthetic head/relation/tail lists, well-formed, fenced and truncated.
+
+Usage:
+    python benchmarks/bench_json_parse.py [--relations 2000] [--repeat 5]
+"""
+import argparse
+import functools
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_repair
+
+from kg_config import BIOMEDICAL_RELATIONSHIPS
+import llm_graph_transformer
+from llm_graph_transformer import _loads_json
+
+
+def synthetic_response(num_relations, seed=0):
+    rng = random.Random(seed)
+    return json.dumps(
+        [
+            {
+                "head": f"entity {rng.randrange(num_relations)}",
+                "head_type": source_type,
+                "relation": rel_type,
+                "tail": f"entity {rng.randrange(num_relations)}",
+                "tail_type": target_type,
+            }
+            for source_type, rel_type, target_type in (
+                rng.choice(BIOMEDICAL_RELATIONSHIPS) for _ in range(num_relations)
+            )
+        ],
+        indent=2,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--relations", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    response = synthetic_response(args.relations)
+    responses = {
+        "well-formed": response,
+        "fenced": f"```json\n{response}\n```",
+        "truncated": response[: len(response) * 9 // 10],
+    }
+    repair = functools.partial(json_repair.loads, skip_json_loads=True)
+    strict_parser = getattr(llm_graph_transformer._strict_json_loads, "__module__", "json")
+
+    print(f"relations: {args.relations}, {len(response) / 1024:.0f} KiB, strict parser: {strict_parser}")
+    print(f"{'response':<14}{'json_repair ms':>16}{'tiered ms':>12}{'speedup':>10}")
+    for name, text in responses.items():
+        assert _loads_json(text, repair) == json_repair.loads(text)
+        legacy = min(timeit.repeat(lambda: json_repair.loads(text), number=1, repeat=args.repeat))
+        tiered = min(timeit.repeat(lambda: _loads_json(text, repair), number=1, repeat=args.repeat))
+        print(f"{name:<14}{legacy * 1000:>16.2f}{tiered * 1000:>12.2f}{legacy / tiered:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
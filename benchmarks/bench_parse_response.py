@@ -0,0 +1,170 @@
+"""
+Micro-benchmark for parsing raw graph tool call arguments.
+
+Compares the previous `_parse_and_clean_json` (a node list scan per missing
+endpoint type, then `_format_nodes`/`_format_relationships` rebuilding every
+node) against the single-pass version on a synthetic dense response in which
+a share of the relationships lacks endpoint types. Also reports the memory
+held by the parsed result, where interned endpoint nodes are shared instead
+of copied per relationship.
+
+Usage:
+    python benchmarks/bench_parse_response.py [--nodes 5000] [--relationships 20000]
+"""
+import argparse
+import copy
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.graphs.graph_document import Node, Relationship
+
+from kg_config import BIOMEDICAL_ENTITIES, BIOMEDICAL_RELATIONSHIPS
+from llm_graph_transformer import (
+    DEFAULT_NODE_TYPE,
+    _parse_and_clean_json,
+    format_property_key,
+)
+
+
+def synthetic_arguments(num_nodes, num_relationships, missing_type_rate, seed=0):
+    """Tool call arguments as returned by a model, before validation."""
+    rng = random.Random(seed)
+    nodes = [
+        {"id": f"entity {i}", "type": rng.choice(BIOMEDICAL_ENTITIES).lower()}
+        for i in range(num_nodes)
+    ]
+    relationships = []
+    for _ in range(num_relationships):
+        source, target = rng.choice(nodes), rng.choice(nodes)
+        rel = {
+            "source_node_id": source["id"],
+            "target_node_id": target["id"],
+            "type": rng.choice(BIOMEDICAL_RELATIONSHIPS)[1].lower().replace("_", " "),
+        }
+        if rng.random() >= missing_type_rate:
+            rel["source_node_type"] = source["type"]
+            rel["target_node_type"] = target["type"]
+        relationships.append(rel)
+    return {"nodes": nodes, "relationships": relationships}
+
+
+def legacy_parse_and_clean_json(argument_json):
+    """The parser as it was implemented before the id -> type index."""
+    nodes = []
+    for node in argument_json["nodes"]:
+        if not node.get("id"):
+            continue
+        node_properties = {}
+        if "properties" in node and node["properties"]:
+            for p in node["properties"]:
+                node_properties[format_property_key(p["key"])] = p["value"]
+        nodes.append(
+            Node(id=node["id"], type=node.get("type", DEFAULT_NODE_TYPE), properties=node_properties)
+        )
+    relationships = []
+    for rel in argument_json["relationships"]:
+        if not rel.get("source_node_id") or not rel.get("target_node_id") or not rel.get("type"):
+            continue
+        if not rel.get("source_node_type"):
+            try:
+                rel["source_node_type"] = [
+                    el.get("type") for el in argument_json["nodes"] if el["id"] == rel["source_node_id"]
+                ][0]
+            except IndexError:
+                rel["source_node_type"] = DEFAULT_NODE_TYPE
+        if not rel.get("target_node_type"):
+            try:
+                rel["target_node_type"] = [
+                    el.get("type") for el in argument_json["nodes"] if el["id"] == rel["target_node_id"]
+                ][0]
+            except IndexError:
+                rel["target_node_type"] = DEFAULT_NODE_TYPE
+        rel_properties = {}
+        if "properties" in rel and rel["properties"]:
+            for p in rel["properties"]:
+                rel_properties[format_property_key(p["key"])] = p["value"]
+        relationships.append(
+            Relationship(
+                source=Node(id=rel["source_node_id"], type=rel["source_node_type"]),
+                target=Node(id=rel["target_node_id"], type=rel["target_node_type"]),
+                type=rel["type"],
+                properties=rel_properties,
+            )
+        )
+    return legacy_format_nodes(nodes), legacy_format_relationships(relationships)
+
+
+def legacy_format_nodes(nodes):
+    return [
+        Node(
+            id=el.id.title() if isinstance(el.id, str) else el.id,
+            type=el.type.capitalize() if el.type else DEFAULT_NODE_TYPE,
+            properties=el.properties,
+        )
+        for el in nodes
+    ]
+
+
+def legacy_format_relationships(rels):
+    return [
+        Relationship(
+            source=legacy_format_nodes([el.source])[0],
+            target=legacy_format_nodes([el.target])[0],
+            type=el.type.replace(" ", "_").upper(),
+            properties=el.properties,
+        )
+        for el in rels
+    ]
+
+
+def retained_mb(parse, arguments):
+    """Memory allocated by `parse` that is still referenced by its result."""
+    tracemalloc.start()
+    result = parse(arguments)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--relationships", type=int, default=20000)
+    parser.add_argument("--missing-type-rate", type=float, default=0.2,
+                        help="Share of relationships without endpoint types")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    arguments = synthetic_arguments(args.nodes, args.relationships, args.missing_type_rate)
+
+    # The legacy parser fills in missing types in place, so it gets a fresh copy
+    legacy_result = legacy_parse_and_clean_json(copy.deepcopy(arguments))
+    result = _parse_and_clean_json(arguments)
+    assert legacy_result == result
+
+    legacy = min(timeit.repeat(
+        lambda: legacy_parse_and_clean_json(copy.deepcopy(arguments)),
+        number=1, repeat=args.repeat,
+    ))
+    copying = min(timeit.repeat(lambda: copy.deepcopy(arguments), number=1, repeat=args.repeat))
+    single_pass = min(timeit.repeat(
+        lambda: _parse_and_clean_json(arguments), number=1, repeat=args.repeat,
+    ))
+    legacy -= copying
+    legacy_mb = retained_mb(legacy_parse_and_clean_json, copy.deepcopy(arguments))
+    interned_mb = retained_mb(_parse_and_clean_json, arguments)
+    print(f"nodes: {len(result[0])}, relationships: {len(result[1])}")
+    print(f"legacy:      {legacy * 1000:10.2f} ms")
+    print(f"single pass: {single_pass * 1000:10.2f} ms")
+    print(f"speedup:     {legacy / single_pass:10.1f}x")
+    print(f"result memory: legacy {legacy_mb:.1f} MB, interned {interned_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
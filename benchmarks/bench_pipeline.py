@@ -0,0 +1,356 @@
+"""
+End-to-end benchmark of the extraction pipeline.
+
+Runs a corpus (the papers in `papers/`, optionally scaled up with synthetic
+copies) through every ingestion stage with the deterministic fake LLM backend
+and an in-memory Neo4j stand-in, so runs are reproducible offline:
+
+  chunking       split documents into chunks
+  extraction     LLMGraphTransformer.aiter_graph_documents (mock LLM latency)
+  parse_filter   structured output -> nodes/relationships, then strict mode
+  entity_merge   cross-chunk entity resolution
+  neo4j_write    Neo4jBatchWriter grouping and batched statements
+
+For each stage the wall time, throughput, peak RSS and net allocated memory
+blocks are reported (with --tracemalloc also the peak traced allocation size).
+The results are written as JSON so runs can be diffed between releases.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--scale 10] [--latency 0.05] [--output bench.json]
+    python benchmarks/bench_pipeline.py --neo4j-uri bolt://localhost:7687  # real writes
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from langchain_core.documents import Document
+
+from chunking import TokenChunker
+from entity_resolution import resolve_entities
+from ingestion_manifest import chunk_hash
+from kg_config import (
+    EXTRACTION_CONFIG,
+    EXTRACTION_NODE_TYPES,
+    EXTRACTION_RELATIONSHIP_TYPES,
+    MODEL_CONFIG,
+)
+from llm_backends import create_llm
+from llm_graph_transformer import LLMGraphTransformer, _convert_to_graph_document
+from neo4j_writer import Neo4jBatchWriter
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StageRecorder:
+    """Collects wall time, throughput and memory figures per pipeline stage."""
+
+    def __init__(self, trace_allocations=False):
+        self.trace_allocations = trace_allocations
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name, unit):
+        record = {"unit": unit, "items": 0}
+        if self.trace_allocations:
+            tracemalloc.start()
+        blocks_before = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            elapsed = time.perf_counter() - start
+            record["seconds"] = elapsed
+            record["throughput_per_sec"] = record["items"] / elapsed if elapsed > 0 else 0.0
+            record["net_allocated_blocks"] = sys.getallocatedblocks() - blocks_before
+            record["peak_rss_mb"] = peak_rss_mb()
+            if self.trace_allocations:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                record["tracemalloc_peak_mb"] = peak / (1024 * 1024)
+            self.stages[name] = record
+
+
+class _Result:
+    def __init__(self):
+        self.counters = self
+
+    nodes_deleted = relationships_deleted = 0
+
+    def consume(self):
+        return self
+
+
+class MemoryDriver:
+    """Neo4j driver stand-in that counts statements and rows."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.statements = 0
+        self.rows = 0
+
+    def session(self, database=None):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, work, *args):
+        return work(self, *args)
+
+    def run(self, query, rows=(), **params):
+        if self.latency:
+            time.sleep(self.latency)
+        self.statements += 1
+        self.rows += len(rows)
+        return _Result()
+
+    def close(self):
+        pass
+
+
+def load_corpus(papers_dir, scale, synthetic_docs):
+    """Return (name, text) pairs: the papers repeated `scale` times plus synthetic documents."""
+    papers = []
+    if os.path.isdir(papers_dir):
+        for name in sorted(os.listdir(papers_dir)):
+            if name.endswith(".txt"):
+                with open(os.path.join(papers_dir, name), "r", encoding="utf-8") as f:
+                    papers.append((name, f.read()))
+    corpus = []
+    for copy in range(scale):
+        for name, text in papers:
+            # Distinct copies so chunk hashes (and cache keys) differ
+            corpus.append((f"{copy}-{name}", text if copy == 0 else f"Copy {copy}.\n{text}"))
+    words = " ".join(text for _, text in papers).split() or ["protein", "binds", "receptor"]
+    for i in range(synthetic_docs):
+        start = (i * 7919) % len(words)
+        body = " ".join(words[(start + j) % len(words)] for j in range(3000))
+        corpus.append((f"synthetic-{i}.txt", f"Synthetic document {i}.\n{body}"))
+    return corpus
+
+
+def chunk_corpus(corpus, max_tokens):
+    chunker = TokenChunker(
+        max_tokens=max_tokens,
+        overlap_tokens=EXTRACTION_CONFIG.get("chunk_overlap_tokens", 50),
+    )
+    documents = []
+    for name, text in corpus:
+        chunks = chunker.split_text(text)
+        for i, chunk in enumerate(chunks):
+            documents.append(
+                Document(
+                    page_content=chunk,
+                    metadata={
+                        "chunk_hash": chunk_hash(chunk),
+                        "chunk_index": i,
+                        "total_chunks": len(chunks),
+                        "document": name,
+                    },
+                )
+            )
+    return documents
+
+
+def chunk_budget(transformer):
+    return max(
+        EXTRACTION_CONFIG.get("min_chunk_tokens", 250),
+        EXTRACTION_CONFIG.get("request_token_budget", 2500) - transformer.request_overhead_tokens,
+    )
+
+
+def build_transformer(args, latency, error_rate, pack_size=1):
+    config = dict(MODEL_CONFIG, backend="fake")
+    config["fake"] = dict(
+        MODEL_CONFIG.get("fake", {}),
+        latency=latency,
+        error_rate=error_rate,
+        seed=args.seed,
+    )
+    transformer = LLMGraphTransformer(
+        llm=create_llm(config),
+        allowed_nodes=EXTRACTION_NODE_TYPES,
+        allowed_relationships=EXTRACTION_RELATIONSHIP_TYPES,
+        max_concurrency=args.concurrency,
+        pack_size=pack_size,
+    )
+    # Same request budget as the pipeline, see generate_knowledge_graph.py
+    transformer.pack_token_budget = EXTRACTION_CONFIG.get("pack_token_budget") or chunk_budget(transformer)
+    return transformer
+
+
+async def extract(transformer, documents, base_delay):
+    results = []
+    async for _, graph_document in transformer.aiter_graph_documents(
+        documents, base_delay=base_delay
+    ):
+        results.append(graph_document)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(args):
+    recorder = StageRecorder(trace_allocations=args.tracemalloc)
+    corpus = load_corpus(args.papers, args.scale, args.synthetic_docs)
+    if not corpus:
+        raise SystemExit("No documents to benchmark")
+
+    transformer = build_transformer(args, args.latency, args.error_rate, args.pack_size)
+    chunk_tokens = chunk_budget(transformer)
+    with recorder.stage("chunking", "chunks") as record:
+        documents = chunk_corpus(corpus, chunk_tokens)
+        record["items"] = len(documents)
+        record["characters"] = sum(len(text) for _, text in corpus)
+        record["chunk_token_budget"] = chunk_tokens
+    with recorder.stage("extraction", "chunks") as record:
+        graph_documents = asyncio.run(extract(transformer, documents, args.retry_delay))
+        record["items"] = len(graph_documents)
+        record["failed"] = len(documents) - len(graph_documents)
+        record["mock_latency_sec"] = args.latency
+        record["concurrency"] = args.concurrency
+        record["pack_size"] = args.pack_size
+        record["requests"] = len(transformer._plan_packs(documents))
+
+    # Replay raw structured outputs without latency to time parsing on its own
+    replay = build_transformer(args, 0.0, 0.0)
+    raw_outputs = [replay.chain.invoke({"input": doc.page_content}) for doc in documents]
+    with recorder.stage("parse_filter", "chunks") as record:
+        kept_nodes = kept_relationships = parsed_nodes = parsed_relationships = 0
+        for raw in raw_outputs:
+            nodes, relationships = _convert_to_graph_document(raw)
+            parsed_nodes += len(nodes)
+            parsed_relationships += len(relationships)
+            nodes, relationships = replay._apply_strict_mode(nodes, relationships)
+            kept_nodes += len(nodes)
+            kept_relationships += len(relationships)
+        record["items"] = len(raw_outputs)
+        record["nodes_dropped"] = parsed_nodes - kept_nodes
+        record["relationships_dropped"] = parsed_relationships - kept_relationships
+
+    with recorder.stage("entity_merge", "nodes") as record:
+        record["items"] = sum(len(doc.nodes) for doc in graph_documents)
+        graph_documents, mapping = resolve_entities(
+            graph_documents, EXTRACTION_CONFIG.get("entity_similarity_threshold", 0.85)
+        )
+        record["merged_ids"] = len(mapping)
+
+    if args.neo4j_uri:
+        from neo4j import GraphDatabase
+
+        driver = GraphDatabase.driver(
+            args.neo4j_uri,
+            auth=(os.getenv("NEO4J_USERNAME", "neo4j"), os.getenv("NEO4J_PASSWORD", "password")),
+        )
+    else:
+        driver = MemoryDriver(latency=args.neo4j_latency)
+    writer = Neo4jBatchWriter(
+        driver,
+        batch_size=args.batch_size,
+        base_entity_label=EXTRACTION_CONFIG.get("base_entity_label", False),
+        include_source=EXTRACTION_CONFIG.get("include_source", False),
+    )
+    with recorder.stage("neo4j_write", "rows") as record:
+        stats = writer.write(graph_documents, document_name="benchmark")
+        record["items"] = stats["nodes"] + stats["relationships"] + stats["documents"]
+        record["backend"] = "neo4j" if args.neo4j_uri else "memory"
+        if isinstance(driver, MemoryDriver):
+            record["statements"] = driver.statements
+    driver.close()
+
+    stages = recorder.stages
+    return {
+        "meta": {
+            "benchmark": "pipeline",
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "corpus": {
+            "documents": len(corpus),
+            "characters": stages["chunking"]["characters"],
+            "chunks": len(documents),
+        },
+        "stages": stages,
+        "total_seconds": sum(stage["seconds"] for stage in stages.values()),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--papers", default=os.path.join(REPO_ROOT, "papers"))
+    parser.add_argument("--scale", type=int, default=1, help="Copies of the papers corpus")
+    parser.add_argument("--synthetic-docs", type=int, default=0, help="Extra synthetic documents")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock LLM seconds per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock LLM failure rate")
+    parser.add_argument("--retry-delay", type=float, default=0.01, help="Base retry backoff")
+    parser.add_argument("--concurrency", type=int, default=EXTRACTION_CONFIG.get("max_concurrency", 5))
+    parser.add_argument(
+        "--pack-size", type=int, default=EXTRACTION_CONFIG.get("pack_size", 1),
+        help="Chunks extracted per LLM request",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000, help="Neo4j rows per statement")
+    parser.add_argument("--neo4j-uri", default=None, help="Write to a real Neo4j instead of memory")
+    parser.add_argument("--neo4j-latency", type=float, default=0.0, help="Simulated seconds per statement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tracemalloc", action="store_true", help="Trace peak allocation size (slower)")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(f"{report['corpus']['documents']} documents, {report['corpus']['chunks']} chunks")
+    print(f"{'stage':<14}{'seconds':>10}{'items/s':>12}{'peak RSS MB':>13}{'alloc blocks':>14}")
+    for name, stage in report["stages"].items():
+        rss = stage["peak_rss_mb"]
+        print(
+            f"{name:<14}{stage['seconds']:>10.3f}{stage['throughput_per_sec']:>12.1f}"
+            f"{rss if rss is not None else float('nan'):>13.1f}{stage['net_allocated_blocks']:>14}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark for LLMGraphTransformer strict-mode filtering.
+
+Compares the previous per-relationship list rebuild against the schema index
+compiled once at init, on a synthetic extraction using the biomedical schema.
+
+Usage:
+    python benchmarks/bench_strict_mode.py [--relationships 10000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_community.graphs.graph_document import Node, Relationship
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from kg_config import BIOMEDICAL_ENTITIES, BIOMEDICAL_RELATIONSHIPS
+from llm_graph_transformer import LLMGraphTransformer
+
+
+def synthetic_extraction(num_relationships, seed=0):
+    """Build nodes/relationships where roughly half match the allowed schema."""
+    rng = random.Random(seed)
+    node_types = BIOMEDICAL_ENTITIES + ["Person", "Country", "Organization"]
+    rel_types = list({rel[1] for rel in BIOMEDICAL_RELATIONSHIPS}) + ["WORKS_FOR"]
+    nodes = [
+        Node(id=f"entity_{i}", type=rng.choice(node_types))
+        for i in range(num_relationships // 2)
+    ]
+    relationships = []
+    for _ in range(num_relationships):
+        if rng.random() < 0.5:
+            source_type, rel_type, target_type = rng.choice(BIOMEDICAL_RELATIONSHIPS)
+            source = Node(id=f"entity_{rng.randrange(len(nodes))}", type=source_type)
+            target = Node(id=f"entity_{rng.randrange(len(nodes))}", type=target_type)
+        else:
+            source, target = rng.choice(nodes), rng.choice(nodes)
+            rel_type = rng.choice(rel_types)
+        relationships.append(Relationship(source=source, target=target, type=rel_type))
+    return nodes, relationships
+
+
+def legacy_strict_mode(transformer, nodes, relationships):
+    """The filter as it was implemented before the compiled index."""
+    lower_allowed_nodes = [el.lower() for el in transformer.allowed_nodes]
+    nodes = [node for node in nodes if node.type.lower() in lower_allowed_nodes]
+    relationships = [
+        rel
+        for rel in relationships
+        if rel.source.type.lower() in lower_allowed_nodes
+        and rel.target.type.lower() in lower_allowed_nodes
+    ]
+    relationships = [
+        rel
+        for rel in relationships
+        if (rel.source.type.lower(), rel.type.lower(), rel.target.type.lower())
+        in [
+            (s_t.lower(), r_t.lower(), t_t.lower())
+            for s_t, r_t, t_t in transformer.allowed_relationships
+        ]
+    ]
+    return nodes, relationships
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--relationships", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    transformer = LLMGraphTransformer(
+        llm=FakeListChatModel(responses=["[]"]),
+        allowed_nodes=BIOMEDICAL_ENTITIES,
+        allowed_relationships=BIOMEDICAL_RELATIONSHIPS,
+    )
+    nodes, relationships = synthetic_extraction(args.relationships)
+
+    legacy_result = legacy_strict_mode(transformer, nodes, relationships)
+    compiled_result = transformer._apply_strict_mode(nodes, relationships)
+    assert [len(el) for el in legacy_result] == [len(el) for el in compiled_result]
+
+    legacy = min(timeit.repeat(
+        lambda: legacy_strict_mode(transformer, nodes, relationships),
+        number=1, repeat=args.repeat,
+    ))
+    compiled = min(timeit.repeat(
+        lambda: transformer._apply_strict_mode(nodes, relationships),
+        number=1, repeat=args.repeat,
+    ))
+    print(f"relationships: {len(relationships)} (kept {len(compiled_result[1])})")
+    print(f"legacy:   {legacy * 1000:8.2f} ms")
+    print(f"compiled: {compiled * 1000:8.2f} ms")
+    print(f"speedup:  {legacy / compiled:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Micro-benchmark for LLMGraphTransformer construction.
+
+Builds transformers for random subsets of the biomedical schema, as a
+multi-tenant service building one transformer per request would, and compares
+construction with cold caches against construction reusing cached schema
+models, prompts and structured-output runnables, with one shared LLM and with
+a new LLM instance of the same configuration per transformer.
+
+Usage:
+    python benchmarks/bench_transformer_init.py [--schemas 10] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import llm_graph_transformer
+from kg_config import BIOMEDICAL_RELATIONSHIPS
+from llm_backends import FakeGraphChatModel
+from llm_graph_transformer import LLMGraphTransformer
+
+
+def schema_subsets(count, seed=0):
+    """Random (allowed_nodes, allowed_relationships) subsets of the biomedical schema."""
+    rng = random.Random(seed)
+    subsets = []
+    for _ in range(count):
+        relationships = rng.sample(BIOMEDICAL_RELATIONSHIPS, len(BIOMEDICAL_RELATIONSHIPS) // 2)
+        nodes = sorted({el[0] for el in relationships} | {el[2] for el in relationships})
+        subsets.append((nodes, relationships))
+    return subsets
+
+
+def build_all(new_llm, subsets):
+    start = time.perf_counter()
+    for nodes, relationships in subsets:
+        LLMGraphTransformer(llm=new_llm(), allowed_nodes=nodes, allowed_relationships=relationships)
+    return (time.perf_counter() - start) / len(subsets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--schemas", type=int, default=10, help="Distinct schema subsets")
+    parser.add_argument("--repeat", type=int, default=20, help="Constructions per schema")
+    args = parser.parse_args()
+
+    llm = FakeGraphChatModel()
+    shared_llm = lambda: llm
+    subsets = schema_subsets(args.schemas)
+
+    cold = []
+    for _ in range(args.repeat):
+        llm_graph_transformer._schema_cache.clear()
+        llm_graph_transformer._runnable_cache.clear()
+        cold.append(build_all(shared_llm, subsets))
+    warm = [build_all(shared_llm, subsets) for _ in range(args.repeat)]
+    # Building the LLM itself is left out of the comparison
+    llm_seconds = min(timeit.repeat(FakeGraphChatModel, number=len(subsets), repeat=args.repeat)) / len(subsets)
+    fresh = [build_all(FakeGraphChatModel, subsets) - llm_seconds for _ in range(args.repeat)]
+
+    print(
+        f"schemas: {len(subsets)}, cached schema entries: {len(llm_graph_transformer._schema_cache)}, "
+        f"runnables: {len(llm_graph_transformer._runnable_cache)}"
+    )
+    print(f"cold:             {min(cold) * 1000:8.2f} ms per transformer")
+    print(f"cached:           {min(warm) * 1000:8.2f} ms per transformer")
+    print(f"cached, new LLM:  {min(fresh) * 1000:8.2f} ms per transformer")
+    print(f"speedup:          {min(cold) / min(warm):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Token-aware chunking of documents for graph extraction.
+
+Chunks are sized by an approximate token count instead of characters, so
+every request uses a similar share of the model's budget. Paragraphs are
+packed together up to the budget, and the section headers written by
+`sample_papers.py` ("Title:", "Authors:", "Abstract:", "Full Text:") are
+treated as hard boundaries: a chunk only spans several sections when all of
+them fit completely, and long sections are split on paragraph, then sentence,
+then word boundaries. Words longer than the budget on their own (e.g.
+sequences or URLs) are cut into pieces, so no chunk exceeds `max_tokens`.
+"""
+import re
+from typing import Callable, List, Optional, Pattern, Tuple
+
+from rate_limiter import estimate_tokens
+
+SECTION_HEADER = re.compile(r"^(Title|Authors|Abstract|Full Text):", re.MULTILINE)
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sections(
+    text: str, pattern: Pattern[str] = SECTION_HEADER
+) -> List[Tuple[Optional[str], str]]:
+    """Split `text` at section headers into `(section name, section text)` pairs.
+
+    Text before the first header (or all of it, without headers) belongs to a
+    section named None. Section texts keep their header line.
+    """
+    matches = list(pattern.finditer(text))
+    if not matches:
+        return [(None, text)] if text.strip() else []
+    sections: List[Tuple[Optional[str], str]] = []
+    if text[: matches[0].start()].strip():
+        sections.append((None, text[: matches[0].start()].strip()))
+    for match, following in zip(matches, matches[1:] + [None]):
+        end = following.start() if following else len(text)
+        body = text[match.start() : end].strip()
+        if body:
+            sections.append((match.group(1), body))
+    return sections
+
+
+class TokenChunker:
+    """Packs text into chunks of at most `max_tokens` approximate tokens.
+
+    Args:
+        max_tokens (int): Token budget of a chunk, i.e. the per-request budget
+            minus the prompt and schema overhead.
+        overlap_tokens (int): Trailing sentences of a chunk, up to this many
+            tokens, repeated at the start of the next chunk of the same section.
+        count_tokens (Callable[[str], int]): Token estimator. Defaults to the
+            estimate used by the rate limiter.
+        section_pattern (Pattern[str]): Regex matching section header lines.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 1000,
+        overlap_tokens: int = 50,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+        section_pattern: Pattern[str] = SECTION_HEADER,
+    ) -> None:
+        if max_tokens < 1:
+            raise ValueError("`max_tokens` must be a positive integer.")
+        if not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("`overlap_tokens` must be between 0 and `max_tokens`.")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = count_tokens
+        self.section_pattern = section_pattern
+
+    def _pieces(self, word: str) -> List[str]:
+        """`word`, cut into pieces within the budget if it exceeds it alone."""
+        pieces: List[str] = []
+        while self.count_tokens(word) > self.max_tokens:
+            end = max(1, len(word) * self.max_tokens // self.count_tokens(word))
+            while end > 1 and self.count_tokens(word[:end]) > self.max_tokens:
+                end -= 1
+            pieces.append(word[:end])
+            word = word[end:]
+        return pieces + [word] if word else pieces
+
+    def _units(self, text: str) -> List[Tuple[str, str]]:
+        """`(separator, unit)` pairs: paragraphs, with paragraphs over budget
+        broken into sentences or words."""
+        units: List[Tuple[str, str]] = []
+        for paragraph in _PARAGRAPH_BREAK.split(text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if self.count_tokens(paragraph) <= self.max_tokens:
+                units.append(("\n\n", paragraph))
+                continue
+            separator = "\n\n"
+            for sentence in _SENTENCE_END.split(paragraph):
+                if self.count_tokens(sentence) <= self.max_tokens:
+                    units.append((separator, sentence))
+                    separator = " "
+                    continue
+                words: List[str] = []
+                pieces = [piece for word in sentence.split() for piece in self._pieces(word)]
+                for word in pieces:
+                    if words and self.count_tokens(" ".join(words + [word])) > self.max_tokens:
+                        units.append((separator, " ".join(words)))
+                        separator, words = " ", []
+                    words.append(word)
+                if words:
+                    units.append((separator, " ".join(words)))
+                    separator = " "
+        return units
+
+    def _overlap(self, text: str) -> str:
+        """Trailing sentences of `text` within the overlap budget."""
+        if not self.overlap_tokens:
+            return ""
+        tail: List[str] = []
+        tokens = 0
+        for sentence in reversed(_SENTENCE_END.split(text)):
+            tokens += self.count_tokens(sentence)
+            if tokens > self.overlap_tokens:
+                break
+            tail.insert(0, sentence)
+        return " ".join(tail)
+
+    def split_with_sections(self, text: str) -> List[Tuple[str, Optional[str]]]:
+        """Split `text` into `(chunk text, first section name)` pairs."""
+        chunks: List[Tuple[str, Optional[str]]] = []
+        current = ""
+        current_section: Optional[str] = None
+
+        def flush() -> None:
+            nonlocal current
+            if current:
+                chunks.append((current, current_section))
+            current = ""
+
+        for section, section_text in split_sections(text, self.section_pattern):
+            # Whole sections are packed together only if they fit completely
+            if current and self.count_tokens(current + "\n\n" + section_text) <= self.max_tokens:
+                current += "\n\n" + section_text
+                continue
+            flush()
+            current_section = section
+            if self.count_tokens(section_text) <= self.max_tokens:
+                current = section_text
+                continue
+            for separator, unit in self._units(section_text):
+                candidate = current + separator + unit if current else unit
+                if current and self.count_tokens(candidate) > self.max_tokens:
+                    overlap = self._overlap(current)
+                    flush()
+                    if overlap and self.count_tokens(overlap + " " + unit) <= self.max_tokens:
+                        current = overlap + " " + unit
+                    else:
+                        current = unit
+                else:
+                    current = candidate
+        flush()
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        """Split `text` into chunk texts."""
+        return [chunk for chunk, _ in self.split_with_sections(text)]
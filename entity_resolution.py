@@ -0,0 +1,312 @@
+"""
+Cross-chunk entity resolution for extracted GraphDocuments.
+
+Overlapping chunks return the same entity under slightly different ids
+("Ace2 Receptor", "ACE2 receptors", "Angiotensin-Converting Enzyme 2 (ACE2)").
+Before anything is written to Neo4j, node ids of the same type are clustered
+and rewritten to one canonical id per cluster.
+
+Candidates are found through a blocking index instead of comparing all pairs:
+  - a normalized key (case, punctuation and plural insensitive),
+  - an acronym key linking "ACE2" to "Angiotensin-converting enzyme 2"
+    (only when the acronym is unambiguous),
+  - character trigram similarity, only compared within (type, prefix) blocks
+    and only between ids with the same numbers, roman numerals and
+    single-letter tokens ("ACE1" and "ACE2" are different genes).
+
+The blocking features of an id only depend on the id itself. An
+`EntityIndex` keeps them across batches and can be filled while responses are
+still streaming in, so resolving a batch only compares precomputed features.
+"""
+import re
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_PARENTHETICAL = re.compile(r"\(([^()]*)\)")
+_DIGITS = re.compile(r"\d+")
+_ROMAN_NUMERAL = re.compile(r"^(?:i{1,3}|iv|vi{0,3}|ix|x)$")
+
+
+def _singular(word: str) -> str:
+    if len(word) > 3 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def normalize_id(entity_id: str) -> str:
+    """Lowercase, strip punctuation and singularize each word of an entity id."""
+    words = _NON_ALNUM.sub(" ", entity_id.lower()).split()
+    return " ".join(_singular(word) for word in words)
+
+
+def acronym_key(normalized: str) -> str:
+    """Initials of the alphabetic words followed by any numbers, e.g. 'ace2'."""
+    words = normalized.split()
+    if len(words) < 2:
+        return ""
+    return "".join(word if word.isdigit() else word[0] for word in words)
+
+
+def _distinguishing_tokens(normalized: str) -> Tuple[str, ...]:
+    """Numbers, roman numerals and single letters of a normalized id.
+
+    Ids differing only in these ("il 6"/"il 8", "type i"/"type ii",
+    "hepatitis b"/"hepatitis c") name different entities however similar the
+    rest of the text is.
+    """
+    markers = _DIGITS.findall(normalized)
+    markers.extend(
+        word
+        for word in normalized.split()
+        if len(word) == 1 or _ROMAN_NUMERAL.match(word)
+    )
+    return tuple(markers)
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _keys(entity_id: str) -> Iterable[str]:
+    """Exact blocking keys: ids sharing any of them are the same entity."""
+    normalized = normalize_id(entity_id)
+    if not normalized:
+        return
+    yield "n:" + normalized
+    yield "c:" + normalized.replace(" ", "")
+    # "Angiotensin-Converting Enzyme 2 (ACE2)" states its own alias
+    for inner in _PARENTHETICAL.findall(entity_id):
+        inner_normalized = normalize_id(inner)
+        if inner_normalized:
+            yield "c:" + inner_normalized.replace(" ", "")
+
+
+class _Features(NamedTuple):
+    normalized: str
+    keys: Tuple[str, ...]
+    acronym: str
+    trigrams: FrozenSet[str]
+    markers: Tuple[str, ...]
+
+
+class EntityIndex:
+    """Blocking features of entity ids, computed once per id.
+
+    Pass the same index to every `resolve_entities` call of an ingestion, and
+    `add` ids as soon as they are extracted to take the work off the batch.
+    """
+
+    def __init__(self) -> None:
+        self._features: Dict[str, _Features] = {}
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    def add(self, entity_id: str) -> _Features:
+        """Return the features of `entity_id`, computing them on first use."""
+        features = self._features.get(entity_id)
+        if features is None:
+            normalized = normalize_id(entity_id)
+            features = self._features[entity_id] = _Features(
+                normalized,
+                tuple(_keys(entity_id)),
+                acronym_key(normalize_id(_PARENTHETICAL.sub(" ", entity_id))),
+                frozenset(_trigrams(normalized)),
+                _distinguishing_tokens(normalized),
+            )
+        return features
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: Dict[str, str] = {}
+
+    def find(self, item: str) -> str:
+        self.parent.setdefault(item, item)
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: str, b: str) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+def cluster_ids(
+    ids: Sequence[str],
+    similarity_threshold: float = 0.85,
+    prefix_length: int = 4,
+    min_acronym_length: int = 3,
+    index: Optional[EntityIndex] = None,
+) -> List[List[str]]:
+    """Cluster entity ids (all of one type) that refer to the same entity.
+
+    Args:
+        ids: Distinct entity ids.
+        similarity_threshold: Minimum trigram Jaccard similarity for fuzzy merges,
+            which also require identical numbers, roman numerals and
+            single-letter tokens. Values above 1 disable fuzzy matching.
+        prefix_length: Length of the normalized prefix used to block fuzzy comparisons.
+        min_acronym_length: Shortest abbreviation matched against multi-word ids.
+        index: Optional index holding precomputed features of the ids.
+
+    Returns:
+        List[List[str]]: Clusters with more than one id.
+    """
+    if index is None:
+        index = EntityIndex()
+    features = {entity_id: index.add(entity_id) for entity_id in ids}
+    union_find = _UnionFind()
+    key_owner: Dict[str, str] = {}
+    for entity_id in ids:
+        union_find.find(entity_id)
+        for key in features[entity_id].keys:
+            if key in key_owner:
+                union_find.union(key_owner[key], entity_id)
+            else:
+                key_owner[key] = entity_id
+
+    # Link single-token abbreviations to the one multi-word id they abbreviate.
+    # Acronyms shared by several distinct entities are ambiguous and skipped.
+    long_forms: Dict[str, Set[str]] = defaultdict(set)
+    for entity_id in ids:
+        acronym = features[entity_id].acronym
+        if len(acronym) >= min_acronym_length:
+            long_forms[acronym].add(entity_id)
+    for entity_id in ids:
+        normalized = features[entity_id].normalized
+        if " " in normalized:
+            continue
+        candidates = {union_find.find(el) for el in long_forms.get(normalized, ())}
+        if len(candidates) == 1:
+            union_find.union(candidates.pop(), entity_id)
+
+    if similarity_threshold <= 1:
+        blocks: Dict[str, List[Tuple[str, FrozenSet[str], Tuple[str, ...]]]] = defaultdict(list)
+        for entity_id in ids:
+            normalized, _, _, grams, markers = features[entity_id]
+            if len(normalized) < prefix_length:
+                continue
+            for other_id, other_grams, other_markers in blocks[normalized[:prefix_length]]:
+                if markers != other_markers:
+                    continue
+                overlap = len(grams & other_grams)
+                if overlap / (len(grams) + len(other_grams) - overlap) >= similarity_threshold:
+                    union_find.union(other_id, entity_id)
+            blocks[normalized[:prefix_length]].append((entity_id, grams, markers))
+
+    clusters: Dict[str, List[str]] = defaultdict(list)
+    for entity_id in ids:
+        clusters[union_find.find(entity_id)].append(entity_id)
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+def resolve_entities(
+    graph_documents: Sequence[GraphDocument],
+    similarity_threshold: float = 0.85,
+    known_ids: Optional[Dict[str, Set[str]]] = None,
+    index: Optional[EntityIndex] = None,
+) -> Tuple[List[GraphDocument], Dict[Tuple[str, str], str]]:
+    """Merge duplicate entities across all graph documents.
+
+    Within each node type, clustered ids are rewritten to the most frequent id
+    of the cluster (ties go to the longest, i.e. most complete, identifier).
+    Nodes and relationships that become identical are deduplicated per document.
+
+    Args:
+        graph_documents: The extracted graph documents.
+        similarity_threshold: Minimum trigram similarity for fuzzy merges.
+        known_ids: Optional ids per type that were already resolved (e.g. in an
+            earlier batch of the same ingestion). They take part in clustering,
+            are preferred as canonical ids and are never rewritten themselves.
+        index: Optional index shared across calls, see `EntityIndex`.
+
+    Returns:
+        Tuple[List[GraphDocument], Dict[Tuple[str, str], str]]: The rewritten
+        documents and the applied mapping `(type, old id) -> canonical id`.
+    """
+    counts: Dict[str, Counter] = defaultdict(Counter)
+    for doc in graph_documents:
+        for node in doc.nodes:
+            counts[node.type][node.id] += 1
+        for rel in doc.relationships:
+            counts[rel.source.type][rel.source.id] += 1
+            counts[rel.target.type][rel.target.id] += 1
+
+    known_ids = known_ids or {}
+    mapping: Dict[Tuple[str, str], str] = {}
+    for node_type, id_counts in counts.items():
+        known = known_ids.get(node_type, set())
+        ids = [entity_id for entity_id in id_counts if isinstance(entity_id, str)]
+        ids.extend(entity_id for entity_id in known if entity_id not in id_counts)
+        for cluster in cluster_ids(ids, similarity_threshold, index=index):
+            canonical = max(
+                cluster, key=lambda el: (el in known, id_counts[el], len(el), el)
+            )
+            for entity_id in cluster:
+                if entity_id != canonical and entity_id not in known:
+                    mapping[(node_type, entity_id)] = canonical
+
+    if not mapping:
+        return list(graph_documents), mapping
+
+    def canonical_node(node: Node) -> Node:
+        new_id = mapping.get((node.type, node.id))
+        if new_id is None:
+            return node
+        return Node(id=new_id, type=node.type, properties=node.properties)
+
+    resolved = []
+    for doc in graph_documents:
+        nodes: Dict[Tuple[str, str], Node] = {}
+        for node in doc.nodes:
+            node = canonical_node(node)
+            key = (node.type, node.id)
+            if key in nodes:
+                merged = nodes[key]
+                nodes[key] = Node(
+                    id=merged.id,
+                    type=merged.type,
+                    properties={**merged.properties, **(node.properties or {})},
+                )
+            else:
+                nodes[key] = node
+        relationships: Dict[Tuple[str, str, str, str, str], Relationship] = {}
+        for rel in doc.relationships:
+            source, target = canonical_node(rel.source), canonical_node(rel.target)
+            # A merge can turn a relationship between two aliases into a self-loop
+            if (source.type, source.id) == (target.type, target.id) and (
+                rel.source.id != rel.target.id
+            ):
+                continue
+            key = (source.type, source.id, rel.type, target.type, target.id)
+            if key in relationships:
+                merged_rel = relationships[key]
+                relationships[key] = Relationship(
+                    source=source,
+                    target=target,
+                    type=rel.type,
+                    properties={**merged_rel.properties, **(rel.properties or {})},
+                )
+            else:
+                relationships[key] = Relationship(
+                    source=source, target=target, type=rel.type, properties=rel.properties
+                )
+        resolved.append(
+            GraphDocument(
+                nodes=list(nodes.values()),
+                relationships=list(relationships.values()),
+                source=doc.source,
+            )
+        )
+    return resolved, mapping
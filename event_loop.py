@@ -0,0 +1,69 @@
+"""
+Long-lived background event loop shared by every ingestion request.
+
+`asyncio.run` creates and closes a new loop per call, which discards the
+connection pools of async clients bound to it (the LLM provider's HTTP
+client, the async Neo4j driver). Instead, a single daemon thread owns one
+loop for the lifetime of the process, and synchronous callers such as
+Streamlit reruns submit coroutines to it and wait for the result.
+"""
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Optional
+
+
+class BackgroundLoop:
+    """An asyncio event loop running forever in a daemon thread.
+
+    Args:
+        name (str): Name of the owning thread.
+    """
+
+    def __init__(self, name: str = "kg-event-loop") -> None:
+        self.loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+        self._started.wait()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._started.set)
+        self.loop.run_forever()
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """Schedule `coro` on the loop and return a concurrent future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run `coro` on the loop and block until it returns."""
+        if threading.current_thread() is self.thread:
+            raise RuntimeError("BackgroundLoop.run() cannot be called from the loop thread.")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        """Stop the loop and wait for its thread to exit."""
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+_background_loop: Optional[BackgroundLoop] = None
+_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Return the process-wide background loop, starting it on first use."""
+    global _background_loop
+    with _lock:
+        if _background_loop is None or _background_loop.loop.is_closed():
+            _background_loop = BackgroundLoop()
+        return _background_loop
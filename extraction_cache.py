@@ -0,0 +1,201 @@
+"""
+Persistent, content-addressed cache for LLM graph extractions.
+
+Entries are keyed by a hash of the chunk text together with everything that
+influences the model output (prompt, allowed schema, model configuration), and
+store the parsed nodes and relationships so that a cache hit skips the LLM
+round trip entirely.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_community.graphs.graph_document import Node, Relationship
+
+from node_interner import NodeInterner
+
+
+def fingerprint(*parts: Any) -> str:
+    """Return a stable sha256 hex digest for an arbitrary sequence of values."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(repr(part).encode("utf-8"))
+        hasher.update(b"\x00")
+    return hasher.hexdigest()
+
+
+def _serialize(nodes: List[Node], relationships: List[Relationship]) -> str:
+    return json.dumps(
+        {
+            "nodes": [[n.id, n.type, n.properties] for n in nodes],
+            "relationships": [
+                [
+                    r.source.id,
+                    r.source.type,
+                    r.target.id,
+                    r.target.type,
+                    r.type,
+                    r.properties,
+                ]
+                for r in relationships
+            ],
+        },
+        ensure_ascii=False,
+    )
+
+
+def _deserialize(
+    payload: str, interner: Optional[NodeInterner] = None
+) -> Tuple[List[Node], List[Relationship]]:
+    data = json.loads(payload)
+    if interner is None:
+        interner = NodeInterner()
+    nodes = [
+        Node(id=n[0], type=n[1], properties=n[2]) if n[2] else interner.node(n[0], n[1])
+        for n in data["nodes"]
+    ]
+    relationships = [
+        Relationship(
+            source=interner.node(r[0], r[1]),
+            target=interner.node(r[2], r[3]),
+            type=r[4],
+            properties=r[5],
+        )
+        for r in data["relationships"]
+    ]
+    return nodes, relationships
+
+
+class ExtractionCache:
+    """SQLite-backed cache of parsed extraction results with size-based eviction.
+
+    Args:
+        path (str): Location of the SQLite database file.
+        max_size_mb (float): Upper bound for the total size of stored payloads.
+          When exceeded, the least recently used entries are evicted until the
+          cache is back under 90% of the limit.
+    """
+
+    def __init__(
+        self, path: str = "extraction_cache.sqlite", max_size_mb: float = 256
+    ) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON extractions(last_access)"
+        )
+        self._conn.commit()
+        self._size_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM extractions"
+        ).fetchone()[0]
+
+    @staticmethod
+    def make_key(text: str, context_fingerprint: str) -> str:
+        """Build the cache key for a chunk of text under a given extraction context."""
+        return fingerprint(context_fingerprint, text)
+
+    def get(
+        self, key: str, interner: Optional[NodeInterner] = None
+    ) -> Optional[Tuple[List[Node], List[Relationship]]]:
+        """Return the cached nodes and relationships for `key`, or None on a miss.
+
+        Property-less nodes are taken from `interner` when given.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE extractions SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+        return _deserialize(row[0], interner)
+
+    def set(
+        self, key: str, nodes: List[Node], relationships: List[Relationship]
+    ) -> None:
+        """Store the parsed extraction result for `key`, evicting old entries if needed."""
+        payload = _serialize(nodes, relationships)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_size_bytes:
+            return
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, payload, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, size, time.time()),
+            )
+            self._size_bytes += size - (previous[0] if previous else 0)
+            if self._size_bytes > self.max_size_bytes:
+                self._evict(int(self.max_size_bytes * 0.9))
+            self._conn.commit()
+
+    def _evict(self, target_bytes: int) -> None:
+        # Caller holds the lock. Drop least recently used entries until under target.
+        rows = self._conn.execute(
+            "SELECT key, size FROM extractions ORDER BY last_access ASC"
+        )
+        to_delete = []
+        for key, size in rows:
+            if self._size_bytes <= target_bytes:
+                break
+            to_delete.append((key,))
+            self._size_bytes -= size
+        self._conn.executemany("DELETE FROM extractions WHERE key = ?", to_delete)
+        self.evictions += len(to_delete)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM extractions")
+            self._conn.commit()
+            self._size_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and the current cache footprint."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": self._size_bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
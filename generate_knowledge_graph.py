@@ -1,115 +1,134 @@
 from llm_graph_transformer import LLMGraphTransformer
+from extraction_cache import ExtractionCache
+from rate_limiter import TokenBucketRateLimiter, estimate_tokens
+from neo4j_writer import AsyncNeo4jBatchWriter, provenance_key
+from neo4j_schema import ensure_schema
+from neo4j_reader import GraphReader
+from ingestion_manifest import IngestionManifest, chunk_hash
+from chunking import TokenChunker
+from entity_resolution import EntityIndex, resolve_entities
+from llm_backends import create_llm
 from langchain_core.documents import Document
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pyvis.network import Network
 from langchain_neo4j import Neo4jGraph
-import streamlit as st
-from datetime import datetime
+from progress import reporter
+from telemetry import telemetry
+from event_loop import get_background_loop
+from neo4j import AsyncGraphDatabase
 from dotenv import load_dotenv
 import os
 import asyncio
-from kg_config import EXTRACTION_CONFIG
+from collections import defaultdict
+from kg_config import (
+    BIOMEDICAL_ENTITIES, EXTRACTION_CONFIG, EXTRACTION_NODE_TYPES, EXTRACTION_RELATIONSHIP_TYPES,
+    MODEL_CONFIG, NEO4J_CONFIG, RATE_LIMIT_CONFIG, TELEMETRY_CONFIG, VISUALIZATION_CONFIG
+)
 
 
 # Load the .env file
 load_dotenv()
-# Get API key from environment variable
-api_key = os.getenv("GOOGLE_API_KEY")
-
 neo4j_uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 neo4j_username = os.getenv("NEO4J_USERNAME", "neo4j")
 neo4j_password = os.getenv("NEO4J_PASSWORD", "password")
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0,
-    google_api_key=api_key
+# Per-stage spans and metrics; a no-op unless enabled
+if TELEMETRY_CONFIG.get("enabled", False):
+    telemetry.configure(True, TELEMETRY_CONFIG.get("max_spans"))
+    if TELEMETRY_CONFIG.get("prometheus_port"):
+        telemetry.serve_prometheus(TELEMETRY_CONFIG["prometheus_port"])
+
+# Chat model of the configured backend (API keys are read from the environment)
+llm = create_llm(MODEL_CONFIG)
+
+# Optional persistent cache so re-ingested chunks skip the LLM call
+extraction_cache = (
+    ExtractionCache(
+        path=EXTRACTION_CONFIG.get("cache_path", ".kg_cache/extraction_cache.sqlite"),
+        max_size_mb=EXTRACTION_CONFIG.get("cache_max_size_mb", 256),
+    )
+    if EXTRACTION_CONFIG.get("cache_enabled", False)
+    else None
+)
+
+# Queue requests to stay within provider quotas instead of truncating input
+rate_limiter = TokenBucketRateLimiter(
+    requests_per_minute=RATE_LIMIT_CONFIG.get("requests_per_minute"),
+    tokens_per_minute=RATE_LIMIT_CONFIG.get("tokens_per_minute"),
+    burst=RATE_LIMIT_CONFIG.get("burst", 0.1),
+)
+
+# Sidecar manifest of ingested chunks per document for incremental re-ingestion
+ingestion_manifest = (
+    IngestionManifest(EXTRACTION_CONFIG.get("manifest_path", ".kg_cache/ingestion_manifest.sqlite"))
+    if EXTRACTION_CONFIG.get("incremental", False)
+    else None
 )
 
 graph_transformer = LLMGraphTransformer(llm=llm,
-    allowed_nodes=["viral_strain","viral_gene","human_gene","cell_type","tissue_type","organ_system","symptom","clinical_outcome",
-    "drug","drug_class","vaccine","treatment_protocol","risk_factor","gene_variant","pathology","biological_process"],
-    allowed_relationships=["upregulates", "downregulates", "has_positive_correlation_with", "has_negative_correlation_with",
-    "interacts_with","is_expressed_in", "is_risk_factor_for", "treats", "prevents"],
-    additional_instructions="Do NOT extract author information or references, Countries etc. Only extract biomedical entities and relationships."
+    allowed_nodes=EXTRACTION_NODE_TYPES,
+    allowed_relationships=EXTRACTION_RELATIONSHIP_TYPES,
+    additional_instructions="Do NOT extract author information or references, Countries etc. Only extract biomedical entities and relationships.",
+    max_concurrency=EXTRACTION_CONFIG.get("max_concurrency", 5),
+    rate_limiter=rate_limiter,
+    cache=extraction_cache,
+    pack_size=EXTRACTION_CONFIG.get("pack_size", 1),
+    streaming=EXTRACTION_CONFIG.get("stream_responses", False),
+)
+
+# Chunk tokens per request: the request budget minus the prompt and schema overhead
+chunk_token_budget = max(
+    EXTRACTION_CONFIG.get("min_chunk_tokens", 250),
+    EXTRACTION_CONFIG.get("request_token_budget", 2500) - graph_transformer.request_overhead_tokens,
 )
+# Packed requests share the prompt, so they stay within the same request budget
+# by packing only chunks that together fit the chunk budget
+graph_transformer.pack_token_budget = EXTRACTION_CONFIG.get("pack_token_budget") or chunk_token_budget
 
-# Initialize text splitter for chunking long documents
-text_splitter = RecursiveCharacterTextSplitter(
-    separators=["\n\n", "\n", ". ", ".", " ", ""],
-    chunk_size=EXTRACTION_CONFIG.get("chunk_size", 1500),
-    chunk_overlap=EXTRACTION_CONFIG.get("overlap", 200),
-    length_function=len,
-    is_separator_regex=False,
+# Token-aware chunker: each request (prompt + schema + chunk) stays within the budget
+chunker = TokenChunker(
+    max_tokens=chunk_token_budget,
+    overlap_tokens=EXTRACTION_CONFIG.get("chunk_overlap_tokens", 50),
 )
 
 neo4j_graph = None  # Global variable to hold Neo4j connection
+async_neo4j_driver = None  # Async driver pool, bound to the background event loop
 
 # Extract graph data from input text
-async def extract_graph_data(text):
+def split_into_documents(text):
     """
-    Asynchronously extracts graph data from input text using a graph transformer.
-    Automatically chunks long text to ensure better processing.
+    Splits input text into chunk Documents tagged with their index and content hash.
 
     Args:
-        text (str): Input text to be processed into graph format.
+        text (str): Input text to be chunked.
 
     Returns:
-        list: A list of GraphDocument objects containing nodes and relationships.
+        list: A list of Document objects, one per chunk.
     """
-    # Get chunk size from config
-    chunk_size = EXTRACTION_CONFIG.get("chunk_size", 1500)
-    max_chunks = 10  # Gemini rate limit: 10 requests per minute
-    
     # Check if text needs chunking
-    if len(text) > chunk_size:
-        # Split text into chunks
-        chunks = text_splitter.split_text(text)
-        
-        # Limit chunks to respect Gemini rate limits
-        if len(chunks) > max_chunks:
-            st.warning(f"⚠️ **Text would create {len(chunks)} chunks, limiting to {max_chunks} due to API rate limits**")
-            # Calculate new chunk size to fit within limit
-            new_chunk_size = len(text) // max_chunks + 1
-            temp_splitter = RecursiveCharacterTextSplitter(
-                separators=["\n\n", "\n", ". ", ".", " ", ""],
-                chunk_size=new_chunk_size,
-                chunk_overlap=EXTRACTION_CONFIG.get("overlap", 200),
-                length_function=len,
-                is_separator_regex=False,
-            )
-            chunks = temp_splitter.split_text(text)[:max_chunks]
-            st.write(f"📄 **Text split into {len(chunks)} chunks** (~{new_chunk_size} chars each)")
-        elif len(chunks) > 1:
-            st.write(f"📄 **Text split into {len(chunks)} chunks** (~{chunk_size} chars each)")
+    if estimate_tokens(text) > chunker.max_tokens:
+        # Pack paragraphs up to the token budget without crossing section headers
+        with telemetry.span("chunking", chars=len(text)):
+            chunks = chunker.split_with_sections(text)
+        if len(chunks) > 1:
+            reporter.write(f"📄 **Text split into {len(chunks)} chunks** (≤{chunker.max_tokens} tokens each)")
     else:
-        chunks = [text]
+        chunks = [(text, None)]
     
     # Create documents from chunks
     documents = []
-    for i, chunk in enumerate(chunks):
-        chunk_metadata = {}
+    for i, (chunk, section) in enumerate(chunks):
+        chunk_metadata = {"chunk_hash": chunk_hash(chunk)}
         if len(chunks) > 1:
             chunk_metadata["chunk_index"] = i
             chunk_metadata["total_chunks"] = len(chunks)
+        if section:
+            chunk_metadata["section"] = section
         
         documents.append(Document(
             page_content=chunk,
             metadata=chunk_metadata
         ))
-    
-    # Extract graph from all documents at once
-    try:
-        if len(chunks) > 0:
-            st.write(f"🔬 **Processing {len(documents)} document chunks...**")
-        
-        graph_documents = await graph_transformer.aconvert_to_graph_documents(documents)
-        return graph_documents
-        
-    except Exception as e:
-        st.error(f"❌ **Error processing documents:** {e}")
-        return []
+    return documents
 
 
 def visualize_graph(graph_documents):
@@ -123,9 +142,15 @@ def visualize_graph(graph_documents):
         pyvis.network.Network: The visualized network graph object.
     """
     if not graph_documents:
-        st.warning("⚠️ **No graph documents to visualize**")
+        reporter.warning("⚠️ **No graph documents to visualize**")
         return None
     
+    with telemetry.span("visualize_graph", chunks=len(graph_documents)):
+        return _build_graph_network(graph_documents)
+
+
+def _build_graph_network(graph_documents):
+    """Build the PyVis network of `graph_documents` and save it to knowledge_graph.html."""
     # Create network
     net = Network(height="1200px", width="100%", directed=True,
                       notebook=False, bgcolor="#222222", font_color="white", filter_menu=True, cdn_resources='remote') 
@@ -199,54 +224,247 @@ def visualize_graph(graph_documents):
         print(f"Error saving graph: {e}")
         return None
 
-def store_graph_in_neo4j(graph_documents, document_name=None):
-    """Store graph documents in Neo4j database"""
+def get_async_batch_writer():
+    """Create a batched Neo4j writer on the shared async driver pool.
+
+    Must be called on the background event loop, which owns the driver.
+    """
+    global async_neo4j_driver
+    get_neo4j_connection()
+    if async_neo4j_driver is None:
+        async_neo4j_driver = AsyncGraphDatabase.driver(
+            neo4j_uri,
+            auth=(neo4j_username, neo4j_password),
+            max_connection_pool_size=NEO4J_CONFIG.get("max_connection_pool_size", 50),
+        )
+    return AsyncNeo4jBatchWriter(
+        async_neo4j_driver,
+        database=NEO4J_CONFIG.get("database", "neo4j"),
+        batch_size=NEO4J_CONFIG.get("write_batch_size", 1000),
+        base_entity_label=EXTRACTION_CONFIG.get("base_entity_label", False),
+        include_source=EXTRACTION_CONFIG.get("include_source", False),
+    )
+
+
+def run_async(coro):
+    """
+    Run a coroutine on the long-lived background event loop and wait for it.
+
+    Unlike asyncio.run, the loop survives between calls (and Streamlit reruns),
+    so the LLM client and the async Neo4j driver keep their pooled connections.
+    Progress messages of `coro` reach the caller's page, even while other
+    sessions run their own coroutines on the same loop.
+    """
+    loop = get_background_loop()
+    return loop.run(reporter.bind(coro))
+
+
+def record_write_metrics(stats):
+    """Count the rows a Neo4j write stored."""
+    for kind in ("nodes", "relationships", "documents"):
+        telemetry.increment("neo4j_rows_written_total", stats[kind], kind=kind)
+
+
+def export_telemetry():
+    """Write recorded spans and metrics to the configured OTLP/JSON file."""
+    path = TELEMETRY_CONFIG.get("otlp_json_path")
+    if telemetry.enabled and path:
+        telemetry.write_otlp_json(path)
+
+
+async def astore_graph_in_neo4j(graph_documents, document_name=None, removed_chunks=None):
+    """
+    Store graph documents in Neo4j using batched UNWIND writes.
+
+    Writes go through the pooled async Neo4j driver, so storage overlaps with
+    the LLM calls still in flight on the same event loop.
+    """
     try:
-        graph = get_neo4j_connection()
-        
-        st.write("💾 **Storing graph data in Neo4j...**")
-        
-        # Add document metadata to nodes if document_name is provided
-        if document_name:
-            for doc in graph_documents:
-                for node in doc.nodes:
-                    if not hasattr(node, 'properties'):
-                        node.properties = {}
-                    node.properties['source_document'] = document_name
-                    node.properties['created_at'] = datetime.now().isoformat()
+        writer = get_async_batch_writer()
         
-        # Store in Neo4j
-        graph.add_graph_documents(graph_documents)
+        if removed_chunks:
+            with telemetry.span("neo4j_delete", chunks=len(removed_chunks)):
+                deleted = await writer.delete_chunks(removed_chunks, document_name)
+            reporter.write(f"🧹 **Removed graph of {len(removed_chunks)} outdated chunks** ({deleted['nodes']} nodes, {deleted['relationships']} relationships deleted)")
         
-        st.write("✅ **Graph data stored successfully in Neo4j**")
+        if graph_documents:
+            with telemetry.span("neo4j_write", chunks=len(graph_documents)):
+                stats = await writer.write(graph_documents, document_name)
+            record_write_metrics(stats)
+            reporter.write(f"💾 **Stored {len(graph_documents)} chunks in Neo4j** ({stats['nodes']} nodes, {stats['relationships']} relationships, {stats['rows_per_sec']:.0f} rows/sec)")
         return True
         
     except Exception as e:
-        st.error(f"❌ **Error storing graph in Neo4j:** {str(e)}")
+        reporter.error(f"❌ **Error storing graph in Neo4j:** {str(e)}")
         return False
     
-def generate_knowledge_graph(text, document_name=None, store_in_neo4j=True):
+async def ingest_document(text, document_name=None, store_in_neo4j=True, incremental=True):
+    """
+    Asynchronously chunks, extracts and optionally stores one document.
+
+    Chunks are written to Neo4j in small batches as soon as they are extracted,
+    so storage overlaps with the remaining LLM calls. Entity ids are indexed for
+    resolution as their relationships stream in. With incremental ingestion
+    enabled, chunks of a named document that are already stored are skipped and
+    the graph of removed chunks is deleted.
+
+    Args:
+        text (str): Input text to convert into a knowledge graph.
+        document_name (str): Optional name for the document being processed.
+        store_in_neo4j (bool): Whether to store the graph in Neo4j database.
+        incremental (bool): Whether `document_name` identifies a document whose
+            previous version may be diffed against. Disable for ad-hoc input.
+
+    Returns:
+        dict: The extracted `graph_documents` plus chunk counts (`chunks`,
+        `skipped_chunks`, `failed_chunks`), estimated input `tokens` and
+        whether the graph was `stored`.
+    """
+    documents = split_into_documents(text)
+    result = {
+        "graph_documents": [],
+        "chunks": len(documents),
+        "skipped_chunks": 0,
+        "failed_chunks": 0,
+        "tokens": 0,
+        "stored": False,
+    }
+    
+    incremental = (
+        incremental and ingestion_manifest is not None and store_in_neo4j and document_name
+    )
+    removed_chunks = []
+    if incremental:
+        added_chunks, removed_chunks = ingestion_manifest.diff(
+            document_name, [doc.metadata["chunk_hash"] for doc in documents]
+        )
+        added = set(added_chunks)
+        result["skipped_chunks"] = len(documents) - len(added)
+        telemetry.increment("chunks_skipped_total", result["skipped_chunks"])
+        documents = [doc for doc in documents if doc.metadata["chunk_hash"] in added]
+        if result["skipped_chunks"]:
+            reporter.write(f"♻️ **Skipping {result['skipped_chunks']} unchanged chunks of {document_name}**")
+        if not documents and not removed_chunks:
+            reporter.info(f"**{document_name} is unchanged, nothing to ingest**")
+            return result
+    
+    result["tokens"] = sum(estimate_tokens(doc.page_content) for doc in documents)
+    resolve = EXTRACTION_CONFIG.get("entity_resolution", False)
+    similarity_threshold = EXTRACTION_CONFIG.get("entity_similarity_threshold", 0.85)
+    known_ids = defaultdict(set)  # Canonical ids already written during this ingestion
+    # Blocking features of every entity id, computed as relationships stream in
+    entity_index = EntityIndex() if resolve else None
+    graph_documents = []
+    stored = True
+    
+    if store_in_neo4j and removed_chunks:
+        stored = await astore_graph_in_neo4j([], document_name, removed_chunks)
+        if incremental and stored:
+            ingestion_manifest.record(document_name, [], removed_chunks)
+    
+    async def store_batch(batch):
+        # Merge entities that overlapping chunks returned under different ids,
+        # keeping ids of earlier batches canonical
+        if resolve:
+            with telemetry.span("entity_resolution", chunks=len(batch)):
+                batch, merged_ids = resolve_entities(
+                    batch, similarity_threshold, known_ids, entity_index
+                )
+            telemetry.increment("entity_ids_merged_total", len(merged_ids))
+            if merged_ids:
+                reporter.write(f"🧬 **Merged {len(merged_ids)} duplicate entity ids across chunks**")
+            for doc in batch:
+                for node in doc.nodes:
+                    known_ids[node.type].add(node.id)
+        graph_documents.extend(batch)
+        if not store_in_neo4j:
+            return True
+        batch_stored = await astore_graph_in_neo4j(batch, document_name)
+        if incremental and batch_stored:
+            # Only successfully extracted and stored chunks count as ingested
+            ingestion_manifest.record(
+                document_name, [doc.source.metadata["chunk_hash"] for doc in batch]
+            )
+        return batch_stored
+    
+    def index_relationship(index, relationship):
+        # Prepare entity resolution of the endpoints while the rest of the
+        # response is still being generated
+        for node in (relationship.source, relationship.target):
+            if isinstance(node.id, str):
+                entity_index.add(node.id)
+    
+    requests_per_minute = RATE_LIMIT_CONFIG.get("requests_per_minute")
+    if requests_per_minute and len(documents) > requests_per_minute:
+        reporter.write(f"⏳ **Rate limited to {requests_per_minute} requests/min, estimated {len(documents) / requests_per_minute:.1f} min**")
+    if documents:
+        reporter.write(f"🔬 **Processing {len(documents)} document chunks...**")
+    
+    # Without Neo4j, resolve across the whole document at the end instead
+    stream_batch_size = EXTRACTION_CONFIG.get("stream_batch_size", 5) if store_in_neo4j else len(documents)
+    pending = []
+    # Extraction and storage spans of this document share one trace
+    with telemetry.span("ingest_document", document=document_name or "", chunks=len(documents)):
+        try:
+            async for index, graph_document in graph_transformer.aiter_graph_documents(
+                documents, on_relationship=index_relationship if resolve else None
+            ):
+                telemetry.increment("chunks_extracted_total")
+                reporter.write(f"🧩 **Chunk {index + 1}/{len(documents)} extracted** ({len(graph_document.nodes)} nodes, {len(graph_document.relationships)} relationships)")
+                pending.append(graph_document)
+                if len(pending) >= stream_batch_size:
+                    stored = await store_batch(pending) and stored
+                    pending = []
+        except Exception as e:
+            reporter.error(f"❌ **Error processing documents:** {e}")
+        if pending:
+            stored = await store_batch(pending) and stored
+    
+    if extraction_cache is not None:
+        stats = extraction_cache.stats()
+        reporter.write(f"🗄️ **Extraction cache:** {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+    
+    # Keep the original chunk order for visualization
+    graph_documents.sort(key=lambda doc: doc.source.metadata.get("chunk_index", 0))
+    result["graph_documents"] = graph_documents
+    result["failed_chunks"] = len(documents) - len(graph_documents)
+    result["stored"] = store_in_neo4j and stored
+    return result
+
+
+def generate_knowledge_graph(text, document_name=None, store_in_neo4j=True, incremental=True):
     """
     Generates and visualizes a knowledge graph from input text.
 
-    This function runs the graph extraction asynchronously, optionally stores
-    the graph in Neo4j, and visualizes the resulting graph using PyVis.
+    This function runs the graph extraction on the shared background event
+    loop, optionally stores the graph in Neo4j, and visualizes the resulting
+    graph using PyVis.
 
     Args:
         text (str): Input text to convert into a knowledge graph.
         document_name (str): Optional name for the document being processed.
         store_in_neo4j (bool): Whether to store the graph in Neo4j database.
+        incremental (bool): Whether to skip chunks already ingested under
+            `document_name`. Disable for ad-hoc input.
 
     Returns:
         pyvis.network.Network: The visualized network graph object.
     """
-    graph_documents = asyncio.run(extract_graph_data(text))
-    
-    # Store in Neo4j if requested
-    if store_in_neo4j and graph_documents:
-        store_graph_in_neo4j(graph_documents, document_name)
+    if store_in_neo4j:
+        # Connect (and bootstrap the schema) from the caller's thread first
+        get_neo4j_connection()
+    result = run_async(ingest_document(text, document_name, store_in_neo4j, incremental))
+    if result["skipped_chunks"]:
+        # Unchanged chunks were not extracted again, show the whole stored document
+        net = get_document_graph_visualization(document_name)
+        export_telemetry()
+        return net
+    if not result["graph_documents"]:
+        export_telemetry()
+        return None
     
-    net = visualize_graph(graph_documents)
+    net = visualize_graph(result["graph_documents"])
+    export_telemetry()
     return net
 
 def get_neo4j_connection():
@@ -254,85 +472,213 @@ def get_neo4j_connection():
     global neo4j_graph
     if neo4j_graph is None:
         try:
-            st.write("🔗 **Connecting to Neo4j database...**")
+            reporter.write("🔗 **Connecting to Neo4j database...**")
             neo4j_graph = Neo4jGraph(
                 url=neo4j_uri,
                 username=neo4j_username,
-                password=neo4j_password
+                password=neo4j_password,
+                database=NEO4J_CONFIG.get("database", "neo4j"),
+            )
+            reporter.write("✅ **Connected to Neo4j database**")
+            # Index every label written by the transformer so MERGE on id is a lookup
+            labels = BIOMEDICAL_ENTITIES + [
+                node_type.capitalize() for node_type in graph_transformer.allowed_nodes
+            ]
+            schema_report = ensure_schema(
+                neo4j_graph,
+                labels,
+                base_entity_label=EXTRACTION_CONFIG.get("base_entity_label", False),
+                include_source=EXTRACTION_CONFIG.get("include_source", False),
             )
-            st.write("✅ **Connected to Neo4j database**")
+            reporter.write(f"🗂️ **Neo4j schema:** {len(schema_report['created'])} created, {len(schema_report['existing'])} existing, {len(schema_report['failed'])} failed")
         except Exception as e:
-            st.error(f"❌ **Failed to connect to Neo4j:** {str(e)}")
-            st.write("💡 **Make sure Neo4j is running and credentials are correct**")
+            reporter.error(f"❌ **Failed to connect to Neo4j:** {str(e)}")
+            reporter.write("💡 **Make sure Neo4j is running and credentials are correct**")
             raise e
     return neo4j_graph
 
 
+def build_neo4j_network(nodes_data, relationships_data, output_file):
+    """
+    Build and save a PyVis network from node/relationship rows read from Neo4j.
+
+    Args:
+        nodes_data (list): Rows with internal_id, id, type and source_document.
+        relationships_data (list): Rows with source, target (internal ids) and type.
+        output_file (str): HTML file the network is saved to.
+
+    Returns:
+        pyvis.network.Network: The visualized network graph object.
+    """
+    # Create PyVis network
+    net = Network(height="1200px", width="100%", directed=True,
+                  notebook=False, bgcolor="#222222", font_color="white", 
+                  filter_menu=True, cdn_resources='remote')
+    
+    # Add nodes - use internal_id as unique identifier, id as display label
+    node_ids = set()
+    for node in nodes_data:
+        net.add_node(
+            node['internal_id'], 
+            label=node['id'], 
+            title=f"Type: {node['type']}\nID: {node['id']}\nSource: {node['source_document'] or 'Unknown'}", 
+            group=node['type']
+        )
+        node_ids.add(node['internal_id'])
+    
+    # Add relationships between rendered nodes
+    for rel in relationships_data:
+        if rel['source'] in node_ids and rel['target'] in node_ids:
+            net.add_edge(rel['source'], rel['target'], label=rel['type'])
+    
+    # Configure layout
+    net.set_options("""
+        {
+            "physics": {
+                "forceAtlas2Based": {
+                    "gravitationalConstant": -100,
+                    "centralGravity": 0.01,
+                    "springLength": 200,
+                    "springConstant": 0.08
+                },
+                "minVelocity": 0.75,
+                "solver": "forceAtlas2Based"
+            }
+        }
+    """)
+    
+    net.save_graph(output_file)
+    return net
+
+
 def get_accumulated_graph_visualization():
     """
     Create a visualization of the accumulated graph from Neo4j
     """
     try:
-        st.write("📊 **Fetching accumulated graph from Neo4j...**")
+        reporter.write("📊 **Fetching accumulated graph from Neo4j...**")
         graph = get_neo4j_connection()
         
-        # Query all nodes and relationships using internal Neo4j ID
-        nodes_query = """
-        MATCH (n) 
-        RETURN id(n) as internal_id, n.id as id, labels(n)[0] as type, properties(n) as properties
-        """
+        # Page through the graph, sampling by degree if it exceeds the node budget
+        reader = GraphReader(graph, page_size=VISUALIZATION_CONFIG.get("page_size", 5000))
+        result = reader.load(
+            node_budget=VISUALIZATION_CONFIG.get("node_budget"),
+            edge_budget=VISUALIZATION_CONFIG.get("edge_budget"),
+        )
+        nodes_data = result["nodes"]
+        relationships_data = result["relationships"]
         
-        relationships_query = """
-        MATCH (a)-[r]->(b) 
-        RETURN id(a) as source, id(b) as target, type(r) as type
-        """
+        reporter.write(f"📊 **Found {result['total_nodes']} nodes and {result['total_relationships']} relationships in Neo4j**")
+        if result["sampled"]:
+            reporter.write(f"✂️ **Showing {len(nodes_data)} highest-degree nodes and {len(relationships_data)} relationships**")
         
-        nodes_data = graph.query(nodes_query)
-        relationships_data = graph.query(relationships_query)
+        # Save and return
+        output_file = "accumulated_knowledge_graph.html"
+        net = build_neo4j_network(nodes_data, relationships_data, output_file)
+        reporter.write(f"✅ **Accumulated graph saved to {output_file}**")
         
-        st.write(f"📊 **Found {len(nodes_data)} nodes and {len(relationships_data)} relationships in Neo4j**")
+        return net
         
-        # Create PyVis network
-        net = Network(height="1200px", width="100%", directed=True,
-                      notebook=False, bgcolor="#222222", font_color="white", 
-                      filter_menu=True, cdn_resources='remote')
+    except Exception as e:
+        reporter.error(f"❌ **Error creating accumulated graph visualization:** {str(e)}")
+        return None
+
+
+def get_document_graph_visualization(document_name):
+    """
+    Create a visualization of the graph stored in Neo4j for one document.
+
+    Selects the nodes and relationships whose chunk provenance includes a chunk
+    recorded for `document_name` in the ingestion manifest.
+
+    Args:
+        document_name (str): Name the document was ingested under.
+
+    Returns:
+        pyvis.network.Network: The visualized network graph object.
+    """
+    try:
+        reporter.write(f"📊 **Fetching the stored graph of {document_name} from Neo4j...**")
+        graph = get_neo4j_connection()
         
-        # Add nodes - use internal_id as unique identifier, id as display label
-        for node in nodes_data:
-            net.add_node(
-                node['internal_id'], 
-                label=node['id'], 
-                title=f"Type: {node['type']}\nID: {node['id']}\nSource: {node['properties'].get('source_document', 'Unknown')}", 
-                group=node['type']
-            )
+        chunks = [
+            provenance_key(h, document_name)
+            for h in ingestion_manifest.chunk_hashes(document_name)
+        ]
+        reader = GraphReader(graph, page_size=VISUALIZATION_CONFIG.get("page_size", 5000))
+        result = reader.load(
+            node_budget=VISUALIZATION_CONFIG.get("node_budget"),
+            edge_budget=VISUALIZATION_CONFIG.get("edge_budget"),
+            chunks=chunks,
+        )
+        if not result["nodes"]:
+            reporter.warning(f"⚠️ **No stored graph found for {document_name}**")
+            return None
         
-        # Add relationships
-        for rel in relationships_data:
-            net.add_edge(rel['source'], rel['target'], label=rel['type'])
+        reporter.write(f"📊 **Found {result['total_nodes']} nodes and {result['total_relationships']} relationships of {document_name}**")
+        if result["sampled"]:
+            reporter.write(f"✂️ **Showing {len(result['nodes'])} highest-degree nodes and {len(result['relationships'])} relationships**")
         
-        # Configure layout
-        net.set_options("""
-            {
-                "physics": {
-                    "forceAtlas2Based": {
-                        "gravitationalConstant": -100,
-                        "centralGravity": 0.01,
-                        "springLength": 200,
-                        "springConstant": 0.08
-                    },
-                    "minVelocity": 0.75,
-                    "solver": "forceAtlas2Based"
-                }
-            }
-        """)
+        output_file = "knowledge_graph.html"
+        net = build_neo4j_network(result["nodes"], result["relationships"], output_file)
+        reporter.write(f"✅ **Graph saved to {output_file}**")
         
-        # Save and return
-        output_file = "accumulated_knowledge_graph.html"
-        net.save_graph(output_file)
-        st.write(f"✅ **Accumulated graph saved to {output_file}**")
+        return net
+        
+    except Exception as e:
+        reporter.error(f"❌ **Error creating document graph visualization:** {str(e)}")
+        return None
+
+
+def get_neighborhood_graph_visualization(entity_id=None, entity_type=None, hops=1):
+    """
+    Create a visualization of the k-hop neighborhood around a seed entity or entity type.
+
+    Only the seed lookup (served by the id/label indexes) and a bounded expansion
+    of at most `max_fanout` relationships per node and hop are queried.
+
+    Args:
+        entity_id (str): Optional id of the seed entity.
+        entity_type (str): Optional label; restricts the seed lookup, or selects
+            the highest-degree nodes of that type when no id is given.
+        hops (int): Neighborhood radius.
+
+    Returns:
+        pyvis.network.Network: The visualized network graph object.
+    """
+    try:
+        reporter.write("🧭 **Fetching neighborhood from Neo4j...**")
+        graph = get_neo4j_connection()
+        
+        reader = GraphReader(graph, page_size=VISUALIZATION_CONFIG.get("page_size", 5000))
+        max_fanout = VISUALIZATION_CONFIG.get("max_fanout", 25)
+        seeds = reader.find_seeds(
+            entity_id=entity_id or None,
+            entity_type=entity_type or None,
+            limit=max_fanout,
+            base_entity_label=EXTRACTION_CONFIG.get("base_entity_label", False),
+        )
+        if not seeds:
+            reporter.warning("⚠️ **No matching entity found in Neo4j**")
+            return None
+        
+        hops = min(hops, VISUALIZATION_CONFIG.get("max_hops", 3))
+        result = reader.neighborhood(
+            seeds,
+            hops=hops,
+            max_fanout=max_fanout,
+            node_budget=VISUALIZATION_CONFIG.get("node_budget"),
+        )
+        reporter.write(f"🧭 **Found {len(result['nodes'])} nodes and {len(result['relationships'])} relationships within {hops} hop(s) of {len(seeds)} seed(s)**")
+        if result["truncated"]:
+            reporter.write("✂️ **Neighborhood truncated at the node budget**")
+        
+        output_file = "neighborhood_knowledge_graph.html"
+        net = build_neo4j_network(result["nodes"], result["relationships"], output_file)
+        reporter.write(f"✅ **Neighborhood graph saved to {output_file}**")
         
         return net
         
     except Exception as e:
-        st.error(f"❌ **Error creating accumulated graph visualization:** {str(e)}")
-        return None
\ No newline at end of file
+        reporter.error(f"❌ **Error creating neighborhood graph visualization:** {str(e)}")
+        return None
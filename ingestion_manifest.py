@@ -0,0 +1,94 @@
+"""
+Per-document manifest of ingested chunks for incremental re-ingestion.
+
+The manifest maps a document name to the hashes of the chunks whose graph is
+already stored in Neo4j. Re-ingesting a document only needs to extract the
+chunks whose hash is new, and to remove the graph contributed by chunks that
+no longer exist.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Iterable, List, Set, Tuple
+
+
+def chunk_hash(text: str) -> str:
+    """Stable identifier of a chunk's content."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class IngestionManifest:
+    """SQLite sidecar recording which chunks of each document were ingested.
+
+    Args:
+        path (str): Location of the SQLite database file.
+    """
+
+    def __init__(self, path: str = "ingestion_manifest.sqlite") -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                document TEXT NOT NULL,
+                chunk_hash TEXT NOT NULL,
+                ingested_at TEXT NOT NULL,
+                PRIMARY KEY (document, chunk_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def chunk_hashes(self, document: str) -> Set[str]:
+        """Return the hashes of the chunks recorded for `document`."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_hash FROM chunks WHERE document = ?", (document,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def diff(self, document: str, hashes: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Compare the current chunk hashes of `document` against the manifest.
+
+        Returns:
+            Tuple[List[str], List[str]]: Hashes that are new (must be extracted)
+            and hashes that were removed (their graph must be deleted).
+        """
+        current = list(dict.fromkeys(hashes))
+        stored = self.chunk_hashes(document)
+        current_set = set(current)
+        added = [h for h in current if h not in stored]
+        removed = sorted(stored - current_set)
+        return added, removed
+
+    def record(
+        self, document: str, added: Iterable[str], removed: Iterable[str] = ()
+    ) -> None:
+        """Apply an ingestion result to the manifest."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM chunks WHERE document = ? AND chunk_hash = ?",
+                [(document, h) for h in removed],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (document, chunk_hash, ingested_at) "
+                "VALUES (?, ?, ?)",
+                [(document, h, now) for h in added],
+            )
+            self._conn.commit()
+
+    def forget(self, document: str) -> None:
+        """Drop every entry of `document`, forcing a full re-ingestion."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE document = ?", (document,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
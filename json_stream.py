@@ -0,0 +1,145 @@
+"""
+Incremental extraction of JSON objects from a streamed LLM response.
+
+`JSONObjectStream` is fed the response text piece by piece and returns every
+object of a JSON array as soon as its closing brace arrives, without waiting
+for the rest of the document:
+
+    stream = JSONObjectStream()  # [{...}, {...}]
+    stream = JSONObjectStream({"nodes", "relationships"})  # {"nodes": [{...}], ...}
+    for key, object_text in stream.feed(delta):
+        ...
+
+Only the structure is tracked (nesting, strings and escapes). The returned
+object texts are parsed by the caller, and text the stream no longer needs is
+discarded, so memory stays bounded by the largest single object.
+"""
+import json
+import re
+from typing import Iterable, List, Optional, Tuple
+
+_STRUCTURAL = re.compile(r'[\[\]{}",:]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class JSONObjectStream:
+    """Incremental scanner returning the objects of JSON arrays as they close.
+
+    Args:
+        array_keys (Optional[Iterable[str]]): Return the objects of the arrays
+            stored under these keys of a top-level object. Defaults to None,
+            returning the objects of a top-level array. Text before the
+            top-level value (e.g. a markdown code fence) is skipped.
+    """
+
+    def __init__(self, array_keys: Optional[Iterable[str]] = None) -> None:
+        self.array_keys = frozenset(array_keys) if array_keys is not None else None
+        self._root = "[" if self.array_keys is None else "{"
+        self._text = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._in_string = False
+        self._string_start = 0
+        self._last_string = ""
+        self._pending_key: Optional[str] = None
+        # Open containers as (bracket, key the container is stored under)
+        self._stack: List[Tuple[str, Optional[str]]] = []
+        self._object_start: Optional[int] = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the top-level value has been closed."""
+        return self._finished
+
+    def _is_target(self) -> bool:
+        """Whether the innermost open container is an object to return."""
+        stack = self._stack
+        if self.array_keys is None:
+            return len(stack) == 2 and stack[1][0] == "{"
+        return (
+            len(stack) == 3
+            and stack[1][0] == "["
+            and stack[2][0] == "{"
+            and stack[1][1] in self.array_keys
+        )
+
+    def feed(self, text: str) -> List[Tuple[Optional[str], str]]:
+        """Add the next piece of the response.
+
+        Returns:
+            List[Tuple[Optional[str], str]]: `(array key, object text)` for every
+            object completed by `text`. The key is None for a top-level array.
+        """
+        if self._finished or not text:
+            return []
+        self._text += text
+        buffer = self._text
+        pos = self._pos
+        completed: List[Tuple[Optional[str], str]] = []
+        while True:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(buffer):
+                        # The escaped character has not arrived yet
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                self._last_string = buffer[self._string_start : match.end()]
+                pos = match.end()
+                continue
+            match = _STRUCTURAL.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            char, index, pos = match.group(), match.start(), match.end()
+            if not self._started:
+                if char != self._root:
+                    continue
+                self._started = True
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char == ":":
+                if self._stack and self._stack[-1][0] == "{":
+                    try:
+                        self._pending_key = json.loads(self._last_string)
+                    except ValueError:
+                        self._pending_key = None
+            elif char == ",":
+                self._pending_key = None
+            elif char in "[{":
+                in_object = bool(self._stack) and self._stack[-1][0] == "{"
+                self._stack.append((char, self._pending_key if in_object else None))
+                self._pending_key = None
+                if char == "{" and self._is_target():
+                    self._object_start = index
+            elif self._stack:
+                if char == "}" and self._object_start is not None and self._is_target():
+                    completed.append(
+                        (self._stack[-2][1], buffer[self._object_start : index + 1])
+                    )
+                    self._object_start = None
+                self._stack.pop()
+                if not self._stack:
+                    self._finished = True
+                    break
+        # Drop text that is no longer needed
+        if self._object_start is not None:
+            cut = self._object_start
+        elif self._in_string:
+            cut = self._string_start
+        else:
+            cut = pos
+        self._text = buffer[cut:]
+        self._pos = pos - cut
+        self._string_start -= cut
+        if self._object_start is not None:
+            self._object_start -= cut
+        return completed
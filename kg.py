@@ -0,0 +1,167 @@
+"""
+Headless batch ingestion of a document corpus into the knowledge graph.
+
+Walks a directory for .txt files and ingests several documents concurrently:
+while one document waits on the LLM, others are being chunked or written to
+Neo4j. Progress is logged to the console instead of Streamlit, and a
+throughput summary is printed at the end.
+
+Usage:
+    python -m kg ingest papers/ --workers 4
+    python -m kg ingest papers/some_paper.txt --no-neo4j
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+from event_loop import get_background_loop
+from progress import ConsoleReporter, set_reporter
+from telemetry import telemetry
+
+
+def find_documents(paths, extension=".txt"):
+    """Return the sorted files with `extension` found in the given files/directories."""
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for root, _, files in os.walk(path):
+            found.extend(
+                os.path.join(root, name) for name in files if name.endswith(extension)
+            )
+    return sorted(dict.fromkeys(found))
+
+
+async def ingest_files(files, workers=2, store_in_neo4j=True, incremental=True):
+    """
+    Ingest `files` with up to `workers` documents in flight.
+
+    Returns:
+        dict: Aggregated counts (documents, chunks, tokens, failures).
+    """
+    # Imported here so the console reporter is active before the pipeline loads
+    import generate_knowledge_graph as kg
+
+    if store_in_neo4j:
+        # Connect (and bootstrap the schema) once, before workers share the driver
+        kg.get_neo4j_connection()
+
+    queue = asyncio.Queue()
+    for path in files:
+        queue.put_nowait(path)
+    summary = {
+        "documents": 0,
+        "failed_documents": 0,
+        "chunks": 0,
+        "skipped_chunks": 0,
+        "failed_chunks": 0,
+        "tokens": 0,
+        "nodes": 0,
+        "relationships": 0,
+    }
+
+    async def worker():
+        while True:
+            try:
+                path = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            document_name = os.path.basename(path)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    text = f.read()
+                result = await kg.ingest_document(
+                    text,
+                    document_name=document_name,
+                    store_in_neo4j=store_in_neo4j,
+                    incremental=incremental,
+                )
+            except Exception as e:
+                logging.error(f"Failed to ingest {path}: {e}")
+                summary["failed_documents"] += 1
+                continue
+            summary["documents"] += 1
+            summary["chunks"] += result["chunks"]
+            summary["skipped_chunks"] += result["skipped_chunks"]
+            summary["failed_chunks"] += result["failed_chunks"]
+            summary["tokens"] += result["tokens"]
+            summary["nodes"] += sum(len(doc.nodes) for doc in result["graph_documents"])
+            summary["relationships"] += sum(
+                len(doc.relationships) for doc in result["graph_documents"]
+            )
+            if store_in_neo4j and result["graph_documents"] and not result["stored"]:
+                summary["failed_documents"] += 1
+            logging.info(
+                f"Ingested {document_name}: {result['chunks']} chunks "
+                f"({result['skipped_chunks']} unchanged, {result['failed_chunks']} failed)"
+            )
+
+    await asyncio.gather(*[worker() for _ in range(max(1, min(workers, len(files))))])
+    return summary
+
+
+def format_summary(summary, elapsed):
+    minutes = elapsed / 60 if elapsed > 0 else float("inf")
+    return "\n".join(
+        [
+            f"Ingested {summary['documents']} documents in {elapsed:.1f}s",
+            f"  documents/min:  {summary['documents'] / minutes:.2f}",
+            f"  chunks/min:     {summary['chunks'] / minutes:.2f} "
+            f"({summary['chunks']} chunks, {summary['skipped_chunks']} unchanged)",
+            f"  est. tokens in: {summary['tokens']}",
+            f"  extracted:      {summary['nodes']} nodes, {summary['relationships']} relationships",
+            f"  failures:       {summary['failed_documents']} documents, "
+            f"{summary['failed_chunks']} chunks",
+        ]
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m kg", description="Knowledge graph tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest = subparsers.add_parser("ingest", help="Ingest .txt documents into Neo4j")
+    ingest.add_argument("paths", nargs="+", help="Files or directories to ingest")
+    ingest.add_argument("--workers", type=int, default=2, help="Documents processed concurrently")
+    ingest.add_argument("--no-neo4j", action="store_true", help="Extract only, do not store")
+    ingest.add_argument("--full", action="store_true", help="Re-extract unchanged chunks too")
+    ingest.add_argument(
+        "--telemetry",
+        metavar="PATH",
+        help="Record per-stage spans and metrics and write them as OpenTelemetry JSON",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    set_reporter(ConsoleReporter())
+    if args.telemetry:
+        telemetry.configure(True)
+
+    files = find_documents(args.paths)
+    if not files:
+        logging.error("No .txt documents found")
+        return 1
+    logging.info(f"Found {len(files)} documents")
+
+    start = time.perf_counter()
+    # Same long-lived loop the pipeline's async clients and Neo4j pool live on
+    summary = get_background_loop().run(
+        ingest_files(
+            files,
+            workers=args.workers,
+            store_in_neo4j=not args.no_neo4j,
+            incremental=not args.full,
+        )
+    )
+    print(format_summary(summary, time.perf_counter() - start))
+    if args.telemetry:
+        telemetry.write_otlp_json(args.telemetry)
+        logging.info(f"Telemetry written to {args.telemetry}")
+    return 1 if summary["failed_documents"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@
 Configuration file for biomedical knowledge graph extraction
 Customize entities, relationships, and extraction parameters here
 """
+import os
 
 # Core biomedical entities - expand as needed
 BIOMEDICAL_ENTITIES = [
@@ -111,17 +112,90 @@ BIOMEDICAL_RELATIONSHIPS = [
 # Node properties to extract (currently disabled)
 NODE_PROPERTIES = None
 
-# Model configuration
+# Node and relationship types the graph transformer extracts
+EXTRACTION_NODE_TYPES = [
+    "viral_strain", "viral_gene", "human_gene", "cell_type", "tissue_type", "organ_system",
+    "symptom", "clinical_outcome", "drug", "drug_class", "vaccine", "treatment_protocol",
+    "risk_factor", "gene_variant", "pathology", "biological_process"
+]
+EXTRACTION_RELATIONSHIP_TYPES = [
+    "upregulates", "downregulates", "has_positive_correlation_with", "has_negative_correlation_with",
+    "interacts_with", "is_expressed_in", "is_risk_factor_for", "treats", "prevents"
+]
+
+# Model configuration; top-level values apply to every backend, the backend's section overrides them
 MODEL_CONFIG = {
-    "model_name": "microsoft/mai-ds-r1:free",  # Free model via OpenRouter
+    "backend": os.getenv("KG_LLM_BACKEND", "google"),  # "google", "openrouter" or "fake"
     "temperature": 0,  # Deterministic extraction
-    "base_url": "https://openrouter.ai/api/v1"
+    "google": {
+        "model_name": "gemini-2.5-flash"
+    },
+    "openrouter": {
+        "model_name": "microsoft/mai-ds-r1:free",  # Free model via OpenRouter
+        "base_url": "https://openrouter.ai/api/v1"
+    },
+    # Offline deterministic stand-in for load tests and benchmarks
+    "fake": {
+        "node_types": EXTRACTION_NODE_TYPES,
+        "relationship_types": EXTRACTION_RELATIONSHIP_TYPES,
+        "nodes_per_chunk": 8,
+        "relationships_per_chunk": 10,
+        "vocabulary_size": 200,  # Distinct ids per type; smaller means more overlap between chunks
+        "latency": 1.0,  # Mean seconds per call
+        "latency_jitter": 0.3,  # +/- fraction of the latency
+        "error_rate": 0.0,  # Fraction of calls that fail
+        "seed": 0
+    }
 }
 
 # Extraction settings
 EXTRACTION_CONFIG = {
     "include_source": True,  # Track source documents
     "base_entity_label": True,  # Add __Entity__ label for indexing
-    "chunk_size": 1500,  # Max characters per document chunk
-    "overlap": 200  # Overlap between chunks
-}
\ No newline at end of file
+    "request_token_budget": 2500,  # Approx. input tokens per LLM request (prompt + schema + chunk)
+    "min_chunk_tokens": 250,  # Floor for the chunk budget when the prompt overhead is large
+    "chunk_overlap_tokens": 50,  # Trailing sentences repeated in the next chunk of a section
+    "max_concurrency": 5,  # Concurrent LLM requests during extraction
+    "pack_size": 4,  # Chunks extracted together in one LLM request (1 disables packing)
+    "pack_token_budget": None,  # Max approx. chunk tokens packed into one request (None: request_token_budget minus prompt overhead)
+    "stream_responses": True,  # Parse relationships while unpacked responses stream in
+    "entity_resolution": True,  # Merge duplicate entity ids across chunks before storing
+    "entity_similarity_threshold": 0.85,  # Trigram similarity for fuzzy id merges (>1 disables)
+    "stream_batch_size": 5,  # Extracted chunks written to Neo4j per progressive write
+    "cache_enabled": False,  # Reuse extractions for previously seen chunks
+    "cache_path": ".kg_cache/extraction_cache.sqlite",  # SQLite cache location
+    "cache_max_size_mb": 256,  # Evict least recently used entries beyond this size
+    "incremental": True,  # Only extract new/changed chunks of re-ingested documents
+    "manifest_path": ".kg_cache/ingestion_manifest.sqlite"  # Ingested chunks per document
+}
+
+# Provider rate limits (Gemini 2.5 Flash free tier); requests queue instead of being dropped
+RATE_LIMIT_CONFIG = {
+    "requests_per_minute": 10,  # None disables the request limit
+    "tokens_per_minute": 250000,  # None disables the token limit
+    "burst": 0.1  # Share of each quota usable at once, the rest is spread over the minute
+}
+
+# Neo4j bulk write settings
+NEO4J_CONFIG = {
+    "database": os.getenv("NEO4J_DATABASE", "neo4j"),  # Database the batch writers target
+    "write_batch_size": 1000,  # Rows per UNWIND statement/transaction
+    "max_connection_pool_size": 50  # Connections of each driver pool
+}
+
+# Per-stage tracing and metrics (no overhead when disabled)
+TELEMETRY_CONFIG = {
+    "enabled": os.getenv("KG_TELEMETRY", "").lower() in ("1", "true", "yes"),
+    "prometheus_port": None,  # e.g. 9464 to serve http://127.0.0.1:9464/metrics
+    "otlp_json_path": ".kg_cache/telemetry.json",  # OpenTelemetry JSON export after each ingestion
+    "max_spans": 10000  # Finished spans kept in memory for export
+}
+
+# Accumulated graph viewer limits; above the node budget a degree-ranked sample is shown
+VISUALIZATION_CONFIG = {
+    "node_budget": 2000,  # Max nodes rendered (None for no limit)
+    "edge_budget": 5000,  # Max relationships rendered (None for no limit)
+    "page_size": 5000,  # Rows fetched per Neo4j query
+    "max_fanout": 25,  # Neighborhood view: relationships followed per node and hop
+    "max_hops": 3  # Neighborhood view: maximum radius
+}
@@ -0,0 +1,323 @@
+"""
+Chat model backends selected by `kg_config.MODEL_CONFIG`.
+
+Backends are registered by name with `register_backend` and built with
+`create_llm(MODEL_CONFIG)`. Provider packages are imported lazily, so only the
+selected backend's dependencies need to be installed.
+
+The built-in `fake` backend is a deterministic stand-in for load testing the
+extraction pipeline offline: it answers both structured-output (tool call)
+and plain JSON prompts with canned graphs, after a configurable latency and
+with a configurable failure rate.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+_PACKED_CHUNK = re.compile(r'<chunk index="(\d+)">\n(.*?)\n</chunk>', re.DOTALL)
+
+LLMFactory = Callable[[Dict[str, Any]], BaseChatModel]
+
+LLM_BACKENDS: Dict[str, LLMFactory] = {}
+
+
+def register_backend(name: str) -> Callable[[LLMFactory], LLMFactory]:
+    """Register a factory building a chat model from backend settings."""
+
+    def decorator(factory: LLMFactory) -> LLMFactory:
+        LLM_BACKENDS[name] = factory
+        return factory
+
+    return decorator
+
+
+def backend_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Shared top-level settings overlaid with the selected backend's section."""
+    backend = config.get("backend", "google")
+    settings = {key: value for key, value in config.items() if not isinstance(value, dict)}
+    settings.update(config.get(backend) or {})
+    return settings
+
+
+def create_llm(config: Dict[str, Any]) -> BaseChatModel:
+    """Build the chat model of `config["backend"]`.
+
+    Args:
+        config (Dict[str, Any]): Model configuration such as `MODEL_CONFIG`.
+            Top-level scalar keys apply to every backend, the section named
+            after the backend overrides them.
+
+    Raises:
+        ValueError: If the backend is not registered.
+    """
+    backend = config.get("backend", "google")
+    if backend not in LLM_BACKENDS:
+        raise ValueError(
+            f"Unknown LLM backend '{backend}'. "
+            f"Available backends: {', '.join(sorted(LLM_BACKENDS))}."
+        )
+    return LLM_BACKENDS[backend](backend_settings(config))
+
+
+@register_backend("google")
+def _google_backend(settings: Dict[str, Any]) -> BaseChatModel:
+    try:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+    except ImportError:
+        raise ImportError(
+            "Could not import langchain_google_genai python package. "
+            "Please install it with `pip install langchain-google-genai`."
+        )
+    return ChatGoogleGenerativeAI(
+        model=settings.get("model_name", "gemini-2.5-flash"),
+        temperature=settings.get("temperature", 0),
+        google_api_key=os.getenv(settings.get("api_key_env", "GOOGLE_API_KEY")),
+    )
+
+
+@register_backend("openrouter")
+def _openrouter_backend(settings: Dict[str, Any]) -> BaseChatModel:
+    try:
+        from langchain_openai import ChatOpenAI
+    except ImportError:
+        raise ImportError(
+            "Could not import langchain_openai python package. "
+            "Please install it with `pip install langchain-openai`."
+        )
+    return ChatOpenAI(
+        model=settings["model_name"],
+        temperature=settings.get("temperature", 0),
+        base_url=settings.get("base_url", "https://openrouter.ai/api/v1"),
+        api_key=os.getenv(settings.get("api_key_env", "OPENROUTER_API_KEY")),
+    )
+
+
+@register_backend("fake")
+def _fake_backend(settings: Dict[str, Any]) -> BaseChatModel:
+    fields = set(FakeGraphChatModel.model_fields)
+    return FakeGraphChatModel(**{key: value for key, value in settings.items() if key in fields})
+
+
+class SimulatedLLMError(RuntimeError):
+    """Failure injected by FakeGraphChatModel according to its `error_rate`."""
+
+
+class FakeGraphChatModel(BaseChatModel):
+    """Deterministic chat model returning synthetic knowledge graphs.
+
+    The graph returned for a prompt depends only on the prompt and `seed`, so
+    repeated runs extract identical graphs. Packed prompts with several
+    `<chunk index="...">` blocks get one graph per chunk, tagged with the
+    chunk index and depending only on the chunk text. Entity ids are drawn from a
+    vocabulary of `vocabulary_size` ids per type, which controls how often
+    chunks share entities.
+    """
+
+    node_types: List[str] = ["Gene", "Disease", "Drug"]
+    """Types assigned to generated nodes."""
+    relationship_types: List[str] = ["INTERACTS_WITH"]
+    """Types assigned to generated relationships."""
+    nodes_per_chunk: int = 8
+    relationships_per_chunk: int = 10
+    vocabulary_size: int = 200
+    """Distinct entity ids per node type."""
+    latency: float = 0.0
+    """Mean seconds each call takes."""
+    latency_jitter: float = 0.0
+    """Relative spread of the latency, e.g. 0.2 for +/-20%."""
+    error_rate: float = 0.0
+    """Probability that a call raises SimulatedLLMError."""
+    seed: int = 0
+    stream_pieces: int = 8
+    """Pieces a streamed response is split into, spread over the latency."""
+    prompt_caching: bool = True
+    """Report repeated tool and system prompt prefixes as cached input tokens,
+    like providers with implicit prompt caching."""
+
+    _rng: random.Random = PrivateAttr()
+    _seen_prefixes: set = PrivateAttr(default_factory=set)
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        # Latency and failures vary per call; the extracted graph does not
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-graph"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {
+            "node_types": self.node_types,
+            "relationship_types": self.relationship_types,
+            "nodes_per_chunk": self.nodes_per_chunk,
+            "relationships_per_chunk": self.relationships_per_chunk,
+            "vocabulary_size": self.vocabulary_size,
+            "seed": self.seed,
+        }
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> Any:
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _graph(self, prompt: str) -> Dict[str, List[Dict[str, str]]]:
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode("utf-8")).hexdigest()
+        rng = random.Random(digest)
+        nodes: Dict[str, Dict[str, str]] = {}
+        for _ in range(self.nodes_per_chunk):
+            node_type = rng.choice(self.node_types)
+            node_id = f"{node_type.replace('_', ' ').title()} {rng.randrange(self.vocabulary_size)}"
+            nodes[node_id] = {"id": node_id, "type": node_type}
+        node_list = list(nodes.values())
+        relationships = []
+        if len(node_list) > 1:
+            for _ in range(self.relationships_per_chunk):
+                source, target = rng.sample(node_list, 2)
+                relationships.append(
+                    {
+                        "source_node_id": source["id"],
+                        "source_node_type": source["type"],
+                        "target_node_id": target["id"],
+                        "target_node_type": target["type"],
+                        "type": rng.choice(self.relationship_types),
+                    }
+                )
+        return {"nodes": node_list, "relationships": relationships}
+
+    def _delay(self) -> float:
+        jitter = self.latency * self.latency_jitter
+        return max(0.0, self.latency + self._rng.uniform(-jitter, jitter))
+
+    def _respond(
+        self, messages: List[BaseMessage], tools: Optional[List[Dict[str, Any]]]
+    ) -> ChatResult:
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise SimulatedLLMError("Simulated LLM failure")
+        prompt = "\n".join(str(message.content) for message in messages)
+        chunks = _PACKED_CHUNK.findall(prompt)
+        if chunks:
+            graphs = [
+                {"chunk": int(index), **self._graph(text)} for index, text in chunks
+            ]
+        else:
+            graphs = [self._graph(prompt)]
+        if tools:
+            args = {"graphs": graphs} if chunks else graphs[0]
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": tools[0]["function"]["name"],
+                        "args": args,
+                        "id": "call_" + hashlib.md5(prompt.encode("utf-8")).hexdigest()[:12],
+                        "type": "tool_call",
+                    }
+                ],
+            )
+            output = json.dumps(args)
+        else:
+            # Prompt-based extraction expects a list of head/relation/tail objects
+            output = json.dumps(
+                [
+                    {
+                        **({"chunk": graph["chunk"]} if chunks else {}),
+                        "head": rel["source_node_id"],
+                        "head_type": rel["source_node_type"],
+                        "relation": rel["type"],
+                        "tail": rel["target_node_id"],
+                        "tail_type": rel["target_node_type"],
+                    }
+                    for graph in graphs
+                    for rel in graph["relationships"]
+                ]
+            )
+            message = AIMessage(content=output)
+        input_tokens = len(prompt) // 4 + 1
+        output_tokens = len(output) // 4 + 1
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        if self.prompt_caching:
+            # Everything before the final message is the stable request prefix
+            prefix = json.dumps(tools or []) + "\n".join(
+                str(message.content) for message in messages[:-1]
+            )
+            digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+            if digest in self._seen_prefixes:
+                message.usage_metadata["input_token_details"] = {
+                    "cache_read": len(prefix) // 4 + 1
+                }
+            self._seen_prefixes.add(digest)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._delay())
+        return self._respond(messages, kwargs.get("tools"))
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return self._respond(messages, kwargs.get("tools"))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        delay = self._delay()
+        message = self._respond(messages, kwargs.get("tools")).generations[0].message
+        tool_call = message.tool_calls[0] if message.tool_calls else None  # type: ignore[attr-defined]
+        text = json.dumps(tool_call["args"]) if tool_call else str(message.content)
+        count = max(1, self.stream_pieces)
+        size = -(-len(text) // count)
+        pieces = [text[start : start + size] for start in range(0, len(text), size)] or [""]
+        for position, piece in enumerate(pieces):
+            await asyncio.sleep(delay / len(pieces))
+            last = position == len(pieces) - 1
+            usage = message.usage_metadata if last else None  # type: ignore[attr-defined]
+            if tool_call:
+                chunk = AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": tool_call["name"] if position == 0 else None,
+                            "args": piece,
+                            "id": tool_call["id"] if position == 0 else None,
+                            "index": 0,
+                        }
+                    ],
+                    usage_metadata=usage,
+                )
+            else:
+                chunk = AIMessageChunk(content=piece, usage_metadata=usage)
+            yield ChatGenerationChunk(message=chunk)
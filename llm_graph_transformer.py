@@ -1,8 +1,27 @@
 import asyncio
+import contextvars
+import functools
+import hashlib
+import inspect
 import json
 import time
 import logging
-from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union, cast
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
 from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
 from langchain_core.documents import Document
@@ -15,8 +34,22 @@ from langchain_core.prompts import (
     PromptTemplate,
 )
 from langchain_core.runnables import RunnableConfig
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from pydantic import BaseModel, Field, create_model
 
+from extraction_cache import ExtractionCache, fingerprint
+from json_stream import JSONObjectStream
+from node_interner import NodeInterner
+from rate_limiter import TokenBucketRateLimiter, estimate_tokens
+from telemetry import telemetry
+
+try:
+    import orjson  # type: ignore
+
+    _strict_json_loads: Callable[[Any], Any] = orjson.loads
+except ImportError:  # Optional speedup, the standard library parser is the fallback
+    _strict_json_loads = json.loads
+
 DEFAULT_NODE_TYPE = "Node"
 
 examples = [
@@ -501,123 +534,88 @@ def create_simple_model(
     return DynamicGraph
 
 
-def map_to_base_node(node: Any) -> Node:
-    """Map the SimpleNode to the base Node."""
-    properties = {}
-    if hasattr(node, "properties") and node.properties:
-        for p in node.properties:
-            properties[format_property_key(p.key)] = p.value
-    return Node(id=node.id, type=node.type, properties=properties)
-
-
-def map_to_base_relationship(rel: Any) -> Relationship:
-    """Map the SimpleRelationship to the base Relationship."""
-    source = Node(id=rel.source_node_id, type=rel.source_node_type)
-    target = Node(id=rel.target_node_id, type=rel.target_node_type)
-    properties = {}
-    if hasattr(rel, "properties") and rel.properties:
-        for p in rel.properties:
-            properties[format_property_key(p.key)] = p.value
-    return Relationship(
-        source=source, target=target, type=rel.type, properties=properties
-    )
+def _format_node_id(node_id: Any) -> Any:
+    return node_id.title() if isinstance(node_id, str) else node_id
 
 
-def _parse_and_clean_json(
-    argument_json: Dict[str, Any],
-) -> Tuple[List[Node], List[Relationship]]:
-    nodes = []
-    for node in argument_json["nodes"]:
-        if not node.get("id"):  # Id is mandatory, skip this node
-            continue
-        node_properties = {}
-        if "properties" in node and node["properties"]:
-            for p in node["properties"]:
-                node_properties[format_property_key(p["key"])] = p["value"]
-        nodes.append(
-            Node(
-                id=node["id"],
-                type=node.get("type", DEFAULT_NODE_TYPE),
-                properties=node_properties,
-            )
-        )
-    relationships = []
-    for rel in argument_json["relationships"]:
-        # Mandatory props
-        if (
-            not rel.get("source_node_id")
-            or not rel.get("target_node_id")
-            or not rel.get("type")
-        ):
-            continue
+def _format_node_type(node_type: Optional[str]) -> str:
+    # Handle missing types and empty strings
+    return node_type.capitalize() if node_type else DEFAULT_NODE_TYPE
 
-        # Node type copying if needed from node list
-        if not rel.get("source_node_type"):
-            try:
-                rel["source_node_type"] = [
-                    el.get("type")
-                    for el in argument_json["nodes"]
-                    if el["id"] == rel["source_node_id"]
-                ][0]
-            except IndexError:
-                rel["source_node_type"] = DEFAULT_NODE_TYPE
-        if not rel.get("target_node_type"):
-            try:
-                rel["target_node_type"] = [
-                    el.get("type")
-                    for el in argument_json["nodes"]
-                    if el["id"] == rel["target_node_id"]
-                ][0]
-            except IndexError:
-                rel["target_node_type"] = DEFAULT_NODE_TYPE
-
-        rel_properties = {}
-        if "properties" in rel and rel["properties"]:
-            for p in rel["properties"]:
-                rel_properties[format_property_key(p["key"])] = p["value"]
-
-        source_node = Node(
-            id=rel["source_node_id"],
-            type=rel["source_node_type"],
-        )
-        target_node = Node(
-            id=rel["target_node_id"],
-            type=rel["target_node_type"],
-        )
-        relationships.append(
-            Relationship(
-                source=source_node,
-                target=target_node,
-                type=rel["type"],
-                properties=rel_properties,
-            )
-        )
-    return nodes, relationships
+
+def _format_properties(properties: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    if not properties:
+        return {}
+    return {format_property_key(p["key"]): p["value"] for p in properties}
 
 
-def _format_nodes(nodes: List[Node]) -> List[Node]:
-    return [
-        Node(
-            id=el.id.title() if isinstance(el.id, str) else el.id,
-            type=el.type.capitalize()  # type: ignore[arg-type]
-            if el.type
-            else DEFAULT_NODE_TYPE,  # handle empty strings  # type: ignore[arg-type]
-            properties=el.properties,
+def _parse_node(node: Dict[str, Any], interner: NodeInterner) -> Optional[Node]:
+    """Formatted Node of a graph tool call node object, or None without an id."""
+    node_id = node.get("id")
+    if not node_id:  # Id is mandatory, skip this node
+        return None
+    node_type = node.get("type", DEFAULT_NODE_TYPE)
+    properties = _format_properties(node.get("properties"))
+    if properties:
+        return Node(
+            id=_format_node_id(node_id),
+            type=_format_node_type(node_type),
+            properties=properties,
         )
-        for el in nodes
-    ]
+    return interner.node(_format_node_id(node_id), _format_node_type(node_type))
+
+
+def _parse_relationship(
+    rel: Dict[str, Any], node_types: Dict[Any, Optional[str]], interner: NodeInterner
+) -> Optional[Relationship]:
+    """Formatted Relationship of a graph tool call relationship object, or None
+    if a mandatory field is missing. Endpoint types default to `node_types`."""
+    source_id = rel.get("source_node_id")
+    target_id = rel.get("target_node_id")
+    rel_type = rel.get("type")
+    # Mandatory props
+    if not source_id or not target_id or not rel_type:
+        return None
+    # Node type copied from the node list if needed
+    source_type = rel.get("source_node_type") or node_types.get(source_id)
+    target_type = rel.get("target_node_type") or node_types.get(target_id)
+    # Endpoints are validated Node instances and the remaining fields are
+    # formatted strings and dicts, so pydantic validation can be skipped
+    return Relationship.model_construct(
+        source=interner.node(_format_node_id(source_id), _format_node_type(source_type)),
+        target=interner.node(_format_node_id(target_id), _format_node_type(target_type)),
+        type=rel_type.replace(" ", "_").upper(),
+        properties=_format_properties(rel.get("properties")),
+    )
 
 
-def _format_relationships(rels: List[Relationship]) -> List[Relationship]:
-    return [
-        Relationship(
-            source=_format_nodes([el.source])[0],
-            target=_format_nodes([el.target])[0],
-            type=el.type.replace(" ", "_").upper(),
-            properties=el.properties,
-        )
-        for el in rels
-    ]
+def _parse_and_clean_json(
+    argument_json: Dict[str, Any], interner: Optional[NodeInterner] = None
+) -> Tuple[List[Node], List[Relationship]]:
+    """Build formatted nodes and relationships from graph tool call arguments.
+
+    Node ids are title-cased, node types capitalized and relationship types
+    upper-cased while the objects are created. Relationship endpoints without a
+    type take the type of the first node with the same id, looked up in an
+    index built once per response. Nodes are reduced to formatted `(id, type)`
+    keys and materialized through `interner`, so every endpoint of an entity
+    shares one validated Node.
+    """
+    if interner is None:
+        interner = NodeInterner()
+    nodes = []
+    node_types: Dict[Any, Optional[str]] = {}
+    for node in argument_json.get("nodes") or []:
+        parsed = _parse_node(node, interner)
+        if parsed is not None:
+            node_types.setdefault(node["id"], node.get("type", DEFAULT_NODE_TYPE))
+            nodes.append(parsed)
+    relationships = []
+    for rel in argument_json.get("relationships") or []:
+        parsed_rel = _parse_relationship(rel, node_types, interner)
+        if parsed_rel is not None:
+            relationships.append(parsed_rel)
+    return nodes, relationships
 
 
 def format_property_key(s: str) -> str:
@@ -629,55 +627,402 @@ def format_property_key(s: str) -> str:
     return "".join([first_word] + capitalized_words)
 
 
+def _strip_code_fence(text: str) -> Optional[str]:
+    """Body of a markdown code fence wrapping all of `text`, or None."""
+    text = text.strip()
+    if not (text.startswith("```") and text.endswith("```") and "\n" in text):
+        return None
+    return text[text.index("\n") + 1 : -3]
+
+
+def _loads_json(text: Any, repair: Optional[Callable[[str], Any]] = None) -> Any:
+    """Parse JSON with the cheapest tier that succeeds.
+
+    Tiers, recorded in the `json_parse_total` metric:
+      - "strict": a strict parser (orjson when installed)
+      - "fenced": the same after stripping a markdown code fence
+      - "repair": `repair` (e.g. json_repair), if given
+
+    Raises:
+        ValueError: If no tier can parse `text`.
+    """
+    try:
+        value = _strict_json_loads(text)
+        tier = "strict"
+    except (ValueError, TypeError):
+        body = _strip_code_fence(text) if isinstance(text, str) else None
+        try:
+            if body is None:
+                raise ValueError("No code fence")
+            value = _strict_json_loads(body)
+            tier = "fenced"
+        except ValueError:
+            if repair is None:
+                telemetry.increment("json_parse_total", tier="failed")
+                raise
+            with telemetry.span("json_repair"):
+                value = repair(text)
+            tier = "repair"
+    telemetry.increment("json_parse_total", tier=tier)
+    return value
+
+
+def _tool_call_arguments(message: Any) -> Any:
+    """Arguments of the first tool call of a raw LLM message."""
+    additional_kwargs = getattr(message, "additional_kwargs", None) or {}
+    if additional_kwargs.get("tool_calls"):  # OpenAI type response
+        try:
+            return _loads_json(additional_kwargs["tool_calls"][0]["function"]["arguments"])
+        except Exception:
+            pass
+    if additional_kwargs.get("function_call"):  # Google type response
+        try:
+            return _loads_json(additional_kwargs["function_call"]["arguments"])
+        except Exception:
+            pass
+    # Ollama type response, arguments already parsed by the integration
+    return message.tool_calls[0]["args"]
+
+
 def _convert_to_graph_document(
-    raw_schema: Dict[Any, Any],
+    raw_schema: Dict[Any, Any], interner: Optional[NodeInterner] = None
 ) -> Tuple[List[Node], List[Relationship]]:
-    # If there are validation errors
-    if not raw_schema["parsed"]:
-        try:
-            try:  # OpenAI type response
-                argument_json = json.loads(
-                    raw_schema["raw"].additional_kwargs["tool_calls"][0]["function"][
-                        "arguments"
-                    ]
-                )
-            except Exception:  # Google type response
-                try:
-                    argument_json = json.loads(
-                        raw_schema["raw"].additional_kwargs["function_call"][
-                            "arguments"
-                        ]
-                    )
-                except Exception:  # Ollama type response
-                    argument_json = raw_schema["raw"].tool_calls[0]["args"]
-                    if isinstance(argument_json["nodes"], str):
-                        argument_json["nodes"] = json.loads(argument_json["nodes"])
-                    if isinstance(argument_json["relationships"], str):
-                        argument_json["relationships"] = json.loads(
-                            argument_json["relationships"]
-                        )
-            nodes, relationships = _parse_and_clean_json(argument_json)
-        except Exception:  # If we can't parse JSON
-            return ([], [])
-    else:  # If there are no validation errors use parsed pydantic object
+    with telemetry.span("parse_response"):
+        # If there are validation errors
+        if not raw_schema["parsed"]:
+            try:
+                argument_json = _tool_call_arguments(raw_schema["raw"])
+                for key in ("nodes", "relationships"):
+                    if isinstance(argument_json.get(key), str):
+                        argument_json[key] = _loads_json(argument_json[key])
+                return _parse_and_clean_json(argument_json, interner)
+            except Exception:  # If we can't parse JSON
+                return ([], [])
+        # If there are no validation errors use parsed pydantic object
         parsed_schema: _Graph = raw_schema["parsed"]
-        nodes = (
-            [map_to_base_node(node) for node in parsed_schema.nodes if node.id]
-            if parsed_schema.nodes
-            else []
-        )
+        return _parse_and_clean_json(parsed_schema.model_dump(), interner)
 
-        relationships = (
-            [
-                map_to_base_relationship(rel)
-                for rel in parsed_schema.relationships
-                if rel.type and rel.source_node_id and rel.target_node_id
-            ]
-            if parsed_schema.relationships
-            else []
+
+# Static, so packs of any size share the cacheable prompt prefix
+PACKED_INPUT_INSTRUCTIONS = (
+    "The input below contains several separate chunks, each enclosed in "
+    '<chunk index="..."> and </chunk> tags. Extract entities and relationships '
+    "from every chunk separately and tag each result with the index of the "
+    "chunk it was extracted from.{format_hint}\n\n"
+)
+
+
+def create_packed_model(graph_model: Type[_Graph]) -> Type[BaseModel]:
+    """Wrap a graph model into a schema returning one graph per input chunk."""
+    ChunkGraph = create_model(  # type: ignore[call-overload]
+        "ChunkGraph",
+        chunk=(
+            int,
+            Field(..., description="Index of the chunk the graph was extracted from"),
+        ),
+        __base__=graph_model,
+    )
+
+    class PackedGraphs(BaseModel):
+        """Knowledge graphs extracted from several input chunks, one per chunk."""
+
+        graphs: List[ChunkGraph] = Field(  # type: ignore[valid-type]
+            description="One graph per input chunk"
         )
-    # Title / Capitalize
-    return _format_nodes(nodes), _format_relationships(relationships)
+
+    return PackedGraphs
+
+
+def format_packed_input(texts: Sequence[str], function_call: bool) -> str:
+    """Join chunk texts into one request input with per-chunk delimiters."""
+    format_hint = (
+        ""
+        if function_call
+        else ' Add a "chunk" key with the chunk index to every JSON object.'
+    )
+    header = PACKED_INPUT_INSTRUCTIONS.format(format_hint=format_hint)
+    return header + "\n".join(
+        f'<chunk index="{index}">\n{text}\n</chunk>' for index, text in enumerate(texts)
+    )
+
+
+def _relation_list(parsed_json: Any) -> List[Any]:
+    """Relations of a parsed prompt-based response.
+
+    A single object counts as one relation. Any other value that is not a list
+    (e.g. `null` or a number) holds no relations.
+    """
+    if isinstance(parsed_json, dict):
+        return [parsed_json]
+    if isinstance(parsed_json, list):
+        return parsed_json
+    return []
+
+
+def _unstructured_relationship(rel: Any, interner: NodeInterner) -> Optional[Relationship]:
+    """Relationship of a prompt-based relation object, or None if a mandatory
+    field is missing."""
+    if (
+        not isinstance(rel, dict)
+        or not rel.get("head")
+        or not rel.get("tail")
+        or not rel.get("relation")
+    ):
+        return None
+    # Use default Node label for nodes if missing
+    source_node = interner.node(rel["head"], rel.get("head_type", DEFAULT_NODE_TYPE))
+    target_node = interner.node(rel["tail"], rel.get("tail_type", DEFAULT_NODE_TYPE))
+    return Relationship(source=source_node, target=target_node, type=rel["relation"])
+
+
+def _relationship_endpoints(
+    relationships: List[Relationship], interner: NodeInterner
+) -> List[Node]:
+    """Distinct endpoint nodes of prompt-based relationships."""
+    nodes_set = set()
+    for rel in relationships:
+        nodes_set.add((rel.source.id, rel.source.type))
+        nodes_set.add((rel.target.id, rel.target.type))
+    return [interner.node(*el) for el in nodes_set]
+
+
+def _convert_unstructured_relations(
+    parsed_json: Any, interner: NodeInterner
+) -> Tuple[List[Node], List[Relationship]]:
+    relationships = []
+    for rel in _relation_list(parsed_json):
+        relationship = _unstructured_relationship(rel, interner)
+        if relationship is not None:
+            relationships.append(relationship)
+    return _relationship_endpoints(relationships, interner), relationships
+
+
+def _convert_packed_response(
+    raw_schema: Any,
+    count: int,
+    function_call: bool,
+    repair: Optional[Callable[[str], Any]] = None,
+    interner: Optional[NodeInterner] = None,
+) -> List[Optional[Tuple[List[Node], List[Relationship]]]]:
+    """Split a packed response back into per-chunk nodes and relationships.
+
+    Chunks the response has no result for are returned as None.
+    """
+    per_chunk: List[Optional[Tuple[List[Node], List[Relationship]]]] = [None] * count
+    if interner is None:
+        interner = NodeInterner()
+
+    def add(index: Any, nodes: List[Node], relationships: List[Relationship]) -> None:
+        if not isinstance(index, int) or not 0 <= index < count:
+            return
+        if per_chunk[index] is None:
+            per_chunk[index] = ([], [])
+        per_chunk[index][0].extend(nodes)  # type: ignore[index]
+        per_chunk[index][1].extend(relationships)  # type: ignore[index]
+
+    with telemetry.span("parse_response", chunks=count):
+        if not function_call:
+            content = raw_schema if isinstance(raw_schema, str) else raw_schema.content
+            parsed_json = _loads_json(content, repair)
+            grouped: Dict[Any, List[Any]] = {}
+            for rel in _relation_list(parsed_json):
+                if isinstance(rel, dict):
+                    grouped.setdefault(rel.get("chunk"), []).append(rel)
+            for index, relations in grouped.items():
+                add(index, *_convert_unstructured_relations(relations, interner))
+        elif raw_schema["parsed"]:
+            for graph in raw_schema["parsed"].graphs or []:
+                add(
+                    graph.chunk,
+                    *_convert_to_graph_document({"parsed": graph, "raw": None}, interner),
+                )
+        else:
+            try:  # Validation failed, use the raw tool call arguments
+                graphs = _tool_call_arguments(raw_schema["raw"])["graphs"]
+                if isinstance(graphs, str):
+                    graphs = _loads_json(graphs)
+            except Exception:
+                graphs = []
+            for graph in graphs:
+                if not isinstance(graph, dict):
+                    continue
+                try:
+                    nodes, relationships = _parse_and_clean_json(graph, interner)
+                except Exception:  # If we can't parse this graph
+                    continue
+                add(graph.get("chunk"), nodes, relationships)
+    return per_chunk
+
+
+def _record_token_usage(response: Any) -> None:
+    """Count the prompt/completion tokens reported with an LLM response."""
+    message = response.get("raw") if isinstance(response, dict) else response
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        telemetry.increment("llm_tokens_total", usage.get("input_tokens", 0), direction="in")
+        telemetry.increment("llm_tokens_total", usage.get("output_tokens", 0), direction="out")
+        # Input tokens served from the provider's prompt prefix cache
+        cache_read = (usage.get("input_token_details") or {}).get("cache_read")
+        if cache_read:
+            telemetry.increment("llm_cached_prefix_tokens_total", cache_read)
+
+
+def _freeze(value: Any) -> Any:
+    """Hashable form of list-valued transformer arguments."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+SCHEMA_CACHE_SIZE = 256
+RUNNABLE_CACHE_SIZE = 32
+
+
+class _LRUCache:
+    """Thread-safe mapping keeping the `maxsize` most recently used entries."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Any, ...]) -> Any:
+        """Return the value of `key` and mark it as recently used.
+
+        Raises:
+            KeyError: If `key` is not cached.
+        """
+        with self._lock:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: Tuple[Any, ...], value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Prompt templates and schema models keyed by the arguments they are built from,
+# shared by every transformer created with the same schema
+_schema_cache = _LRUCache(SCHEMA_CACHE_SIZE)
+# Structured-output runnables keyed by the LLM configuration and schema. Kept
+# apart because every entry holds an LLM client.
+_runnable_cache = _LRUCache(RUNNABLE_CACHE_SIZE)
+
+
+def _llm_config_key(llm: Any) -> Optional[Tuple[Any, ...]]:
+    """Key of the configuration of `llm`, or None if it cannot be identified.
+
+    LLM instances with equal keys (type, `_identifying_params` and secrets such
+    as API keys) are interchangeable, so a runnable built around one of them
+    can serve transformers created with another.
+    """
+    try:
+        params = llm._identifying_params
+    except AttributeError:
+        return None
+    # Identifying params usually leave out credentials, which must not be shared
+    secrets = hashlib.sha256()
+    for name in sorted(getattr(type(llm), "model_fields", None) or {}):
+        value = getattr(llm, name, None)
+        if hasattr(value, "get_secret_value"):
+            secrets.update(f"{name}={value.get_secret_value()}\0".encode("utf-8"))
+    try:
+        params_repr = json.dumps(params, sort_keys=True, default=repr)
+    except (TypeError, ValueError):
+        return None
+    return (type(llm), params_repr, secrets.hexdigest())
+
+
+def _memoized(key: Tuple[Any, ...], build: Any, cache: _LRUCache = _schema_cache) -> Any:
+    """Return the cached value of `key`, building it with `build()` on a miss."""
+    try:
+        value = cache.get(key)
+    except KeyError:
+        telemetry.increment("prompt_prefix_cache_total", result="miss", kind=key[0])
+        value = build()
+        cache.set(key, value)
+    else:
+        telemetry.increment("prompt_prefix_cache_total", result="hit", kind=key[0])
+    return value
+
+
+def _prompt_prefix_tokens(prompt: ChatPromptTemplate) -> Tuple[str, int]:
+    """`repr` of a prompt and the estimated tokens of its static text."""
+    try:
+        prompt_text = prompt.format(input="")
+    except Exception:  # Custom prompts may expect other variables
+        prompt_text = repr(prompt)
+    return repr(prompt), estimate_tokens(prompt_text)
+
+
+class _StreamedGraph:
+    """Nodes and relationships converted while a graph response streams in.
+
+    Relationships whose endpoint type depends on a node that has not arrived
+    yet are kept as raw objects until `finish`.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: List[Node] = []
+        self.node_types: Dict[Any, Optional[str]] = {}
+        self.relationships: List[Union[Relationship, Dict[str, Any]]] = []
+        self.malformed = False
+
+    def finish(
+        self, function_call: bool, interner: NodeInterner
+    ) -> Tuple[List[Node], List[Relationship], List[Relationship]]:
+        """Nodes and relationships in response order, and the relationships
+        that were only converted now."""
+        relationships: List[Relationship] = []
+        deferred: List[Relationship] = []
+        for item in self.relationships:
+            if isinstance(item, dict):
+                relationship = _parse_relationship(item, self.node_types, interner)
+                if relationship is None:
+                    continue
+                deferred.append(relationship)
+                item = relationship
+            relationships.append(item)
+        if function_call:
+            return self.nodes, relationships, deferred
+        return _relationship_endpoints(relationships, interner), relationships, deferred
+
+
+async def _deliver_relationships(
+    graph_document: GraphDocument, on_relationship: Callable[[Relationship], Any]
+) -> None:
+    for relationship in graph_document.relationships:
+        result = on_relationship(relationship)
+        if inspect.isawaitable(result):
+            await result
+
+
+def _classify_error(error: Exception) -> Exception:
+    """Wrap an extraction error in an exception naming its likely cause."""
+    # Log the specific error for debugging
+    error_msg = str(error)
+    if "rate limit" in error_msg.lower():
+        return Exception(f"Rate limit exceeded: {error_msg}")
+    elif "timeout" in error_msg.lower():
+        return Exception(f"Request timeout: {error_msg}")
+    elif "connection" in error_msg.lower():
+        return Exception(f"Connection error: {error_msg}")
+    elif "authentication" in error_msg.lower():
+        return Exception(f"Authentication error: {error_msg}")
+    elif "quota" in error_msg.lower() or "billing" in error_msg.lower():
+        return Exception(f"Quota/billing error: {error_msg}")
+    else:
+        return Exception(f"API error: {error_msg}")
 
 
 def validate_and_get_relationship_type(
@@ -746,6 +1091,24 @@ class LLMGraphTransformer:
           function calling capabilities to handle structured output. Defaults to False.
         additional_instructions (str): Allows you to add additional instructions
           to the prompt without having to change the whole prompt.
+        max_concurrency (int): Maximum number of documents processed concurrently
+          by the async conversion. Defaults to 5.
+        rate_limiter (Optional[TokenBucketRateLimiter]): Limiter acquired before
+          every LLM call so requests queue up instead of exceeding provider quotas.
+        cache (Optional[ExtractionCache]): Persistent extraction cache. When set,
+          parsed nodes and relationships are looked up by a hash of the chunk text,
+          prompt, allowed schema and model configuration before calling the LLM.
+        pack_size (int): Maximum number of chunks sent together in one request by
+          `aiter_graph_documents`, amortizing the prompt and schema over several
+          chunks. Defaults to 1 (one request per chunk).
+        pack_token_budget (Optional[int]): Maximum estimated tokens of the chunk
+          texts packed into one request. Set it to the per-request budget minus
+          `request_overhead_tokens` to keep packed requests within the same
+          budget as single ones. Defaults to no limit.
+        streaming (bool): Consume single-chunk responses in `aprocess_response`
+          with `astream`, parsing relationships while the model is still
+          generating and passing each one to the `on_relationship` callback as
+          soon as its JSON object is complete. Defaults to False.
 
     Example:
         .. code-block:: python
@@ -773,6 +1136,12 @@ class LLMGraphTransformer:
         relationship_properties: Union[bool, List[str]] = False,
         ignore_tool_usage: bool = False,
         additional_instructions: str = "",
+        max_concurrency: int = 5,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        cache: Optional[ExtractionCache] = None,
+        pack_size: int = 1,
+        pack_token_budget: Optional[int] = None,
+        streaming: bool = False,
     ) -> None:
         # Validate and check allowed relationships input
         self._relationship_type = validate_and_get_relationship_type(
@@ -781,12 +1150,65 @@ class LLMGraphTransformer:
 
         self.allowed_nodes = allowed_nodes
         self.allowed_relationships = allowed_relationships
+        # Strict mode lookup index, normalized once instead of per relationship
+        self._allowed_node_types = frozenset(el.lower() for el in allowed_nodes)
+        self._allowed_relationship_types: frozenset = frozenset()
+        self._allowed_triples: frozenset = frozenset()
+        if self._relationship_type == "tuple":
+            self._allowed_triples = frozenset(
+                (s_t.lower(), r_t.lower(), t_t.lower())
+                for s_t, r_t, t_t in allowed_relationships  # type: ignore
+            )
+        elif self._relationship_type == "string":
+            self._allowed_relationship_types = frozenset(
+                el.lower() for el in allowed_relationships  # type: ignore
+            )
         self.strict_mode = strict_mode
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        if pack_size < 1:
+            raise ValueError("`pack_size` must be a positive integer.")
+        self.pack_size = pack_size
+        self.pack_token_budget = pack_token_budget
+        # Canonical nodes shared by every graph document of this transformer
+        self._node_interner = NodeInterner()
+        self.streaming = streaming
+        self._llm = llm
+        self._stream_chain: Any = None
         self._function_call = not ignore_tool_usage
-        # Check if the LLM really supports structured output
+        schema_tokens = 0
+        prompt_key: Optional[Tuple[Any, ...]] = None
         if self._function_call:
             try:
-                llm.with_structured_output(_Graph)
+                llm_type = llm._llm_type  # type: ignore
+            except AttributeError:
+                llm_type = None
+            schema_key = (
+                _freeze(allowed_nodes),
+                _freeze(allowed_relationships),
+                _freeze(node_properties),
+                llm_type,
+                _freeze(relationship_properties),
+                self._relationship_type,
+            )
+            schema = _memoized(
+                ("schema",) + schema_key,
+                lambda: create_simple_model(
+                    allowed_nodes,
+                    allowed_relationships,
+                    node_properties,
+                    llm_type,
+                    relationship_properties,
+                    self._relationship_type,
+                ),
+            )
+            llm_key = _llm_config_key(llm)
+            # Doubles as the check whether the LLM supports structured output
+            try:
+                structured_llm = self._structured_output(
+                    llm, llm_key, ("structured_output",) + schema_key, schema
+                )
             except NotImplementedError:
                 self._function_call = False
         if not self._function_call:
@@ -799,226 +1221,543 @@ class LLMGraphTransformer:
             try:
                 import json_repair  # type: ignore
 
-                self.json_repair = json_repair
+                # Only reached once the strict parsers have failed
+                self._repair_json = functools.partial(
+                    json_repair.loads, skip_json_loads=True
+                )
             except ImportError:
                 raise ImportError(
                     "Could not import json_repair python package. "
                     "Please install it with `pip install json-repair`."
                 )
-            prompt = prompt or create_unstructured_prompt(
-                allowed_nodes,
-                allowed_relationships,
-                self._relationship_type,
-                additional_instructions,
-            )
+            if prompt is None:
+                prompt_key = (
+                    "unstructured_prompt",
+                    _freeze(allowed_nodes),
+                    _freeze(allowed_relationships),
+                    self._relationship_type,
+                    additional_instructions,
+                )
+                prompt = _memoized(
+                    prompt_key,
+                    lambda: create_unstructured_prompt(
+                        allowed_nodes,
+                        allowed_relationships,
+                        self._relationship_type,
+                        additional_instructions,
+                    ),
+                )
             self.chain = prompt | llm
+            # Packed requests tag every relation with its chunk index instead
+            self.packed_chain = self.chain
         else:
-            # Define chain
-            try:
-                llm_type = llm._llm_type  # type: ignore
-            except AttributeError:
-                llm_type = None
-            schema = create_simple_model(
-                allowed_nodes,
-                allowed_relationships,
-                node_properties,
-                llm_type,
-                relationship_properties,
-                self._relationship_type,
+            packed_schema = _memoized(
+                ("packed_schema",) + schema_key, lambda: create_packed_model(schema)
             )
-            structured_llm = llm.with_structured_output(schema, include_raw=True)
-            prompt = prompt or get_default_prompt(additional_instructions)
+            packed_llm = self._structured_output(
+                llm, llm_key, ("packed_structured_output",) + schema_key, packed_schema
+            )
+            if prompt is None:
+                prompt_key = ("prompt", additional_instructions)
+                prompt = _memoized(
+                    prompt_key, lambda: get_default_prompt(additional_instructions)
+                )
             self.chain = prompt | structured_llm
+            self.packed_chain = prompt | packed_llm
+            self._schema = schema
+            # The schema is sent as a tool definition with every request
+            schema_tokens = _memoized(
+                ("schema_tokens",) + schema_key,
+                lambda: estimate_tokens(json.dumps(convert_to_openai_tool(schema))),
+            )
 
-    def process_response(
-        self, document: Document, config: Optional[RunnableConfig] = None
-    ) -> GraphDocument:
-        """
-        Processes a single document, transforming it into a graph document using
-        an LLM based on the model's schema and constraints.
-        """
-        text = document.page_content
-        raw_schema = self.chain.invoke({"input": text}, config=config)
-        if self._function_call:
-            raw_schema = cast(Dict[Any, Any], raw_schema)
-            nodes, relationships = _convert_to_graph_document(raw_schema)
+        # Everything besides the chunk text that determines the extraction result
+        try:
+            model_params = llm._identifying_params  # type: ignore
+        except AttributeError:
+            model_params = None
+        # Static prompt and schema tokens of every request, counted against the
+        # tokens-per-minute budget and left out of the chunk token budget
+        if prompt_key is None:
+            prompt_repr, prompt_tokens = _prompt_prefix_tokens(prompt)
         else:
-            nodes_set = set()
-            relationships = []
-            if not isinstance(raw_schema, str):
-                raw_schema = raw_schema.content
-            parsed_json = self.json_repair.loads(raw_schema)
-            if isinstance(parsed_json, dict):
-                parsed_json = [parsed_json]
-            for rel in parsed_json:
-                # Check if mandatory properties are there
-                if (
-                    not isinstance(rel, dict)
-                    or not rel.get("head")
-                    or not rel.get("tail")
-                    or not rel.get("relation")
-                ):
-                    continue
-                # Nodes need to be deduplicated using a set
-                # Use default Node label for nodes if missing
-                nodes_set.add((rel["head"], rel.get("head_type", DEFAULT_NODE_TYPE)))
-                nodes_set.add((rel["tail"], rel.get("tail_type", DEFAULT_NODE_TYPE)))
+            prompt_repr, prompt_tokens = _memoized(
+                ("prompt_tokens",) + prompt_key, lambda: _prompt_prefix_tokens(prompt)
+            )
+        self.request_overhead_tokens = prompt_tokens + schema_tokens
+        self._prompt = prompt
+        self._cache_context = fingerprint(
+            prompt_repr,
+            allowed_nodes,
+            allowed_relationships,
+            node_properties,
+            relationship_properties,
+            self._function_call,
+            type(llm).__name__,
+            model_params,
+        )
 
-                source_node = Node(
-                    id=rel["head"], type=rel.get("head_type", DEFAULT_NODE_TYPE)
+    def _apply_strict_mode(
+        self, nodes: List[Node], relationships: List[Relationship]
+    ) -> Tuple[List[Node], List[Relationship]]:
+        """Filter nodes and relationships against the schema compiled at init."""
+        if not self.strict_mode or not (self.allowed_nodes or self.allowed_relationships):
+            return nodes, relationships
+        if telemetry.enabled:
+            node_count, relationship_count = len(nodes), len(relationships)
+        if self._allowed_node_types:
+            allowed_node_types = self._allowed_node_types
+            nodes = [node for node in nodes if node.type.lower() in allowed_node_types]
+            relationships = [
+                rel
+                for rel in relationships
+                if rel.source.type.lower() in allowed_node_types
+                and rel.target.type.lower() in allowed_node_types
+            ]
+        if self._allowed_triples:
+            # Filter by type and direction
+            allowed_triples = self._allowed_triples
+            relationships = [
+                rel
+                for rel in relationships
+                if (rel.source.type.lower(), rel.type.lower(), rel.target.type.lower())
+                in allowed_triples
+            ]
+        elif self._allowed_relationship_types:
+            # Filter by type only
+            allowed_relationship_types = self._allowed_relationship_types
+            relationships = [
+                rel
+                for rel in relationships
+                if rel.type.lower() in allowed_relationship_types
+            ]
+        if telemetry.enabled:
+            telemetry.increment(
+                "strict_mode_dropped_total", node_count - len(nodes), kind="nodes"
+            )
+            telemetry.increment(
+                "strict_mode_dropped_total",
+                relationship_count - len(relationships),
+                kind="relationships",
+            )
+        return nodes, relationships
+
+    def _invoke_chain(self, text: str, config: Optional[RunnableConfig] = None) -> Any:
+        if self.rate_limiter:
+            with telemetry.span("rate_limit_wait"):
+                self.rate_limiter.acquire_sync(self.request_overhead_tokens + estimate_tokens(text))
+        with telemetry.span("llm_request", chars=len(text)):
+            response = self.chain.invoke({"input": text}, config=config)
+        if telemetry.enabled:
+            _record_token_usage(response)
+        return response
+
+    async def _ainvoke_chain(
+        self, text: str, config: Optional[RunnableConfig] = None
+    ) -> Any:
+        if self.rate_limiter:
+            with telemetry.span("rate_limit_wait"):
+                await self.rate_limiter.acquire(self.request_overhead_tokens + estimate_tokens(text))
+        with telemetry.span("llm_request", chars=len(text)):
+            response = await self.chain.ainvoke({"input": text}, config=config)
+        if telemetry.enabled:
+            _record_token_usage(response)
+        return response
+
+    async def _ainvoke_packed_chain(
+        self, texts: Sequence[str], config: Optional[RunnableConfig] = None
+    ) -> Any:
+        packed_input = format_packed_input(texts, self._function_call)
+        if self.rate_limiter:
+            with telemetry.span("rate_limit_wait"):
+                await self.rate_limiter.acquire(
+                    self.request_overhead_tokens + estimate_tokens(packed_input)
                 )
-                target_node = Node(
-                    id=rel["tail"], type=rel.get("tail_type", DEFAULT_NODE_TYPE)
+        with telemetry.span("llm_request", chars=len(packed_input), chunks=len(texts)):
+            response = await self.packed_chain.ainvoke({"input": packed_input}, config=config)
+        if telemetry.enabled:
+            _record_token_usage(response)
+        return response
+
+    def _streaming_chain(self) -> Any:
+        """Chain yielding raw message chunks, built on first use.
+
+        The structured-output chain only returns its result once the response is
+        complete, so the schema is bound as a forced tool call instead.
+        """
+        if self._stream_chain is None:
+            if self._function_call:
+                tool_name = convert_to_openai_tool(self._schema)["function"]["name"]
+                self._stream_chain = self._prompt | self._llm.bind_tools(  # type: ignore[attr-defined]
+                    [self._schema], tool_choice=tool_name
                 )
-                relationships.append(
-                    Relationship(
-                        source=source_node, target=target_node, type=rel["relation"]
-                    )
+            else:
+                self._stream_chain = self.chain
+        return self._stream_chain
+
+    def _relationship_allowed(self, rel: Relationship) -> bool:
+        """Strict mode check of a single relationship."""
+        if not self.strict_mode or not (self.allowed_nodes or self.allowed_relationships):
+            return True
+        source_type, target_type = rel.source.type.lower(), rel.target.type.lower()
+        if self._allowed_node_types and not (
+            source_type in self._allowed_node_types
+            and target_type in self._allowed_node_types
+        ):
+            return False
+        if self._allowed_triples:
+            return (source_type, rel.type.lower(), target_type) in self._allowed_triples
+        if self._allowed_relationship_types:
+            return rel.type.lower() in self._allowed_relationship_types
+        return True
+
+    def _streamed_relationship(
+        self, key: Optional[str], object_text: str, graph: "_StreamedGraph"
+    ) -> Optional[Relationship]:
+        """Add a streamed JSON object to `graph` and return its relationship,
+        or None for nodes, malformed objects, relationships waiting for the
+        type of a later node and relationships rejected by strict mode."""
+        try:
+            obj = _strict_json_loads(object_text)
+        except ValueError:
+            graph.malformed = True
+            return None
+        if not isinstance(obj, dict):
+            return None
+        if self._function_call:
+            if key == "nodes":
+                # Nodes precede relationships in the schema, index them for type backfill
+                node = _parse_node(obj, self._node_interner)
+                if node is not None:
+                    graph.node_types.setdefault(obj["id"], obj.get("type", DEFAULT_NODE_TYPE))
+                    graph.nodes.append(node)
+                return None
+            if any(
+                not obj.get(f"{end}_node_type")
+                and obj.get(f"{end}_node_id") not in graph.node_types
+                for end in ("source", "target")
+            ):
+                # The endpoint type may still follow, convert once the response is complete
+                graph.relationships.append(obj)
+                return None
+            relationship = _parse_relationship(obj, graph.node_types, self._node_interner)
+        else:
+            relationship = _unstructured_relationship(obj, self._node_interner)
+        if relationship is None:
+            return None
+        graph.relationships.append(relationship)
+        return relationship if self._relationship_allowed(relationship) else None
+
+    def _streamed_graph_complete(self, stream: JSONObjectStream, message: Any) -> bool:
+        """Whether the objects taken from `stream` are the whole response, so
+        the response does not need to be parsed again."""
+        if not stream.finished:
+            return False
+        if self._function_call:
+            tool_calls = getattr(message, "tool_calls", None) or []
+            if not tool_calls:
+                return False
+            # Arrays encoded as JSON strings were not seen by the stream
+            args = tool_calls[0].get("args") or {}
+            return not any(isinstance(args.get(key), str) for key in ("nodes", "relationships"))
+        content = message.content if isinstance(message.content, str) else ""
+        body = (_strip_code_fence(content) or content).strip()
+        return body.startswith("[") and body.endswith("]")
+
+    async def _astream_chain(
+        self,
+        text: str,
+        config: Optional[RunnableConfig],
+        on_relationship: Optional[Callable[[Relationship], Any]],
+    ) -> Tuple[Any, Optional[Tuple[List[Node], List[Relationship]]]]:
+        """Stream the response to `text`, passing relationships to
+        `on_relationship` as their JSON objects close.
+
+        Returns:
+            The complete response, in the shape `_parse_response` expects, and
+            the nodes and relationships converted from the stream. The latter
+            is None if the stream did not cover the whole response (e.g. it was
+            malformed and needs the repair tier).
+        """
+        if self.rate_limiter:
+            with telemetry.span("rate_limit_wait"):
+                await self.rate_limiter.acquire(self.request_overhead_tokens + estimate_tokens(text))
+        stream = JSONObjectStream({"nodes", "relationships"} if self._function_call else None)
+        graph = _StreamedGraph()
+        message = None
+        tool_call_index: Any = None
+        first_relationship = True
+        start = time.perf_counter()
+
+        async def deliver(relationship: Relationship) -> None:
+            nonlocal first_relationship
+            if on_relationship is None:
+                return
+            if first_relationship:
+                telemetry.observe("llm_first_relationship_seconds", time.perf_counter() - start)
+                first_relationship = False
+            result = on_relationship(relationship)
+            if inspect.isawaitable(result):
+                await result
+
+        with telemetry.span("llm_request", chars=len(text), streaming=True):
+            async for chunk in self._streaming_chain().astream({"input": text}, config=config):
+                message = chunk if message is None else message + chunk
+                if self._function_call:
+                    deltas = []
+                    for tool_call_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+                        # Only the first tool call holds the graph
+                        if tool_call_index is None:
+                            tool_call_index = tool_call_chunk.get("index")
+                        if tool_call_chunk.get("index") == tool_call_index:
+                            deltas.append(tool_call_chunk.get("args") or "")
+                    delta = "".join(deltas)
+                else:
+                    delta = chunk.content if isinstance(chunk.content, str) else ""
+                for key, object_text in stream.feed(delta):
+                    relationship = self._streamed_relationship(key, object_text, graph)
+                    if relationship is not None:
+                        await deliver(relationship)
+        if message is None:
+            raise ValueError("The model returned an empty stream")
+        if telemetry.enabled:
+            _record_token_usage(message)
+        nodes, relationships, deferred = graph.finish(self._function_call, self._node_interner)
+        for relationship in deferred:
+            if self._relationship_allowed(relationship):
+                await deliver(relationship)
+        raw_schema = {"parsed": None, "raw": message} if self._function_call else message
+        if graph.malformed or not self._streamed_graph_complete(stream, message):
+            telemetry.increment("streamed_responses_reparsed_total")
+            return raw_schema, None
+        return raw_schema, (nodes, relationships)
+
+    def _plan_packs(self, documents: Sequence[Document]) -> List[Tuple[int, ...]]:
+        """Group consecutive document indices into packs of at most `pack_size`
+        documents and `pack_token_budget` estimated tokens."""
+        packs: List[Tuple[int, ...]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index, document in enumerate(documents):
+            tokens = estimate_tokens(document.page_content)
+            if current and (
+                len(current) >= self.pack_size
+                or (
+                    self.pack_token_budget is not None
+                    and current_tokens + tokens > self.pack_token_budget
                 )
-            # Create nodes list
-            nodes = [Node(id=el[0], type=el[1]) for el in list(nodes_set)]
+            ):
+                packs.append(tuple(current))
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            packs.append(tuple(current))
+        return packs
+
+    @staticmethod
+    def _structured_output(
+        llm: BaseLanguageModel,
+        llm_key: Optional[Tuple[Any, ...]],
+        key: Tuple[Any, ...],
+        schema: Type[BaseModel],
+    ) -> Any:
+        """Structured-output runnable of `llm` for `schema`, reused across
+        transformers whose LLMs share a configuration."""
+        if llm_key is None:
+            return llm.with_structured_output(schema, include_raw=True)
+        return _memoized(
+            key + llm_key,
+            lambda: llm.with_structured_output(schema, include_raw=True),
+            _runnable_cache,
+        )
+
+    def _cached_extraction(
+        self, text: str
+    ) -> Tuple[Optional[str], Optional[Tuple[List[Node], List[Relationship]]]]:
+        """Cache key of `text` and its cached extraction, if any."""
+        if not self.cache:
+            return None, None
+        cache_key = ExtractionCache.make_key(text, self._cache_context)
+        cached = self.cache.get(cache_key, self._node_interner)
+        telemetry.increment(
+            "extraction_cache_total", result="miss" if cached is None else "hit"
+        )
+        return cache_key, cached
+
+    def _parse_response(self, raw_schema: Any) -> Tuple[List[Node], List[Relationship]]:
+        """Nodes and relationships of a single-chunk LLM response."""
+        if self._function_call:
+            raw_schema = cast(Dict[Any, Any], raw_schema)
+            return _convert_to_graph_document(raw_schema, self._node_interner)
+        if not isinstance(raw_schema, str):
+            raw_schema = raw_schema.content
+        parsed_json = _loads_json(raw_schema, self._repair_json)
+        return _convert_unstructured_relations(parsed_json, self._node_interner)
+
+    def _build_graph_document(
+        self,
+        document: Document,
+        cache_key: Optional[str],
+        cached: Optional[Tuple[List[Node], List[Relationship]]],
+        raw_schema: Any = None,
+        parsed: Optional[Tuple[List[Node], List[Relationship]]] = None,
+    ) -> GraphDocument:
+        """Shared post-processing of `process_response` and `aprocess_response`:
+        parse the response unless cached or already `parsed` while streaming,
+        cache it, and apply strict mode."""
+        if cached is not None:
+            nodes, relationships = cached
+        else:
+            nodes, relationships = parsed if parsed is not None else self._parse_response(raw_schema)
+            if self.cache:
+                self.cache.set(cache_key, nodes, relationships)  # type: ignore[arg-type]
 
         # Strict mode filtering
-        if self.strict_mode and (self.allowed_nodes or self.allowed_relationships):
-            if self.allowed_nodes:
-                lower_allowed_nodes = [el.lower() for el in self.allowed_nodes]
-                nodes = [
-                    node for node in nodes if node.type.lower() in lower_allowed_nodes
-                ]
-                relationships = [
-                    rel
-                    for rel in relationships
-                    if rel.source.type.lower() in lower_allowed_nodes
-                    and rel.target.type.lower() in lower_allowed_nodes
-                ]
-            if self.allowed_relationships:
-                # Filter by type and direction
-                if self._relationship_type == "tuple":
-                    relationships = [
-                        rel
-                        for rel in relationships
-                        if (
-                            (
-                                rel.source.type.lower(),
-                                rel.type.lower(),
-                                rel.target.type.lower(),
-                            )
-                            in [  # type: ignore
-                                (s_t.lower(), r_t.lower(), t_t.lower())
-                                for s_t, r_t, t_t in self.allowed_relationships
-                            ]
-                        )
-                    ]
-                else:  # Filter by type only
-                    relationships = [
-                        rel
-                        for rel in relationships
-                        if rel.type.lower()
-                        in [el.lower() for el in self.allowed_relationships]  # type: ignore
-                    ]
+        nodes, relationships = self._apply_strict_mode(nodes, relationships)
 
         return GraphDocument(nodes=nodes, relationships=relationships, source=document)
 
+    def process_response(
+        self, document: Document, config: Optional[RunnableConfig] = None
+    ) -> GraphDocument:
+        """
+        Processes a single document, transforming it into a graph document using
+        an LLM based on the model's schema and constraints.
+        """
+        cache_key, cached = self._cached_extraction(document.page_content)
+        raw_schema = (
+            self._invoke_chain(document.page_content, config) if cached is None else None
+        )
+        return self._build_graph_document(document, cache_key, cached, raw_schema)
+
     def convert_to_graph_documents(
-        self, documents: Sequence[Document], config: Optional[RunnableConfig] = None
+        self,
+        documents: Sequence[Document],
+        config: Optional[RunnableConfig] = None,
+        max_concurrency: Optional[int] = None,
     ) -> List[GraphDocument]:
         """Convert a sequence of documents into graph documents.
 
+        Documents are processed by a bounded thread pool, so synchronous callers
+        get the same request concurrency as `aconvert_to_graph_documents`.
+
         Args:
             documents (Sequence[Document]): The original documents.
-            kwargs: Additional keyword arguments.
+            config (Optional[RunnableConfig]): Optional runnable configuration.
+            max_concurrency (Optional[int]): Number of worker threads
+              (default: self.max_concurrency).
 
         Returns:
-            Sequence[GraphDocument]: The transformed documents as graphs.
+            Sequence[GraphDocument]: The transformed documents as graphs, in the
+            order of `documents`.
         """
-        return [self.process_response(document, config) for document in documents]
+        max_workers = min(max_concurrency or self.max_concurrency, len(documents))
+        if max_workers <= 1:
+            return [self.process_response(document, config) for document in documents]
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="kg-extract"
+        ) as executor:
+            # Each task runs in a copy of the caller's context, so its spans
+            # nest under the caller's current span
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, self.process_response, document, config
+                )
+                for document in documents
+            ]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                # Like the serial loop, stop at the first failure
+                for future in futures:
+                    future.cancel()
+                raise
 
     async def aprocess_response(
-        self, document: Document, config: Optional[RunnableConfig] = None
+        self,
+        document: Document,
+        config: Optional[RunnableConfig] = None,
+        on_relationship: Optional[Callable[[Relationship], Any]] = None,
     ) -> GraphDocument:
         """
         Asynchronously processes a single document, transforming it into a
         graph document.
+
+        `on_relationship` (a function or coroutine function) receives every
+        relationship of the document: while the response streams in when
+        `streaming` is enabled, otherwise once the document is processed. A
+        streamed response is only parsed again if the stream could not be
+        converted completely (e.g. malformed JSON that needs repair).
         """
-        text = document.page_content
-        raw_schema = await self.chain.ainvoke({"input": text}, config=config)
-        if self._function_call:
-            raw_schema = cast(Dict[Any, Any], raw_schema)
-            nodes, relationships = _convert_to_graph_document(raw_schema)
+        cache_key, cached = self._cached_extraction(document.page_content)
+        streamed = cached is None and self.streaming
+        parsed = None
+        if cached is not None:
+            raw_schema = None
+        elif streamed:
+            raw_schema, parsed = await self._astream_chain(
+                document.page_content, config, on_relationship
+            )
         else:
-            nodes_set = set()
-            relationships = []
-            if not isinstance(raw_schema, str):
-                raw_schema = raw_schema.content
-            parsed_json = self.json_repair.loads(raw_schema)
-            if isinstance(parsed_json, dict):
-                parsed_json = [parsed_json]
-            for rel in parsed_json:
-                # Check if mandatory properties are there
-                if (
-                    not rel.get("head")
-                    or not rel.get("tail")
-                    or not rel.get("relation")
-                ):
-                    continue
-                # Nodes need to be deduplicated using a set
-                # Use default Node label for nodes if missing
-                nodes_set.add((rel["head"], rel.get("head_type", DEFAULT_NODE_TYPE)))
-                nodes_set.add((rel["tail"], rel.get("tail_type", DEFAULT_NODE_TYPE)))
+            raw_schema = await self._ainvoke_chain(document.page_content, config)
+        graph_document = self._build_graph_document(
+            document, cache_key, cached, raw_schema, parsed
+        )
+        if on_relationship is not None and not streamed:
+            await _deliver_relationships(graph_document, on_relationship)
+        return graph_document
 
-                source_node = Node(
-                    id=rel["head"], type=rel.get("head_type", DEFAULT_NODE_TYPE)
-                )
-                target_node = Node(
-                    id=rel["tail"], type=rel.get("tail_type", DEFAULT_NODE_TYPE)
-                )
-                relationships.append(
-                    Relationship(
-                        source=source_node, target=target_node, type=rel["relation"]
-                    )
-                )
-            # Create nodes list
-            nodes = [Node(id=el[0], type=el[1]) for el in list(nodes_set)]
-
-        if self.strict_mode and (self.allowed_nodes or self.allowed_relationships):
-            if self.allowed_nodes:
-                lower_allowed_nodes = [el.lower() for el in self.allowed_nodes]
-                nodes = [
-                    node for node in nodes if node.type.lower() in lower_allowed_nodes
-                ]
-                relationships = [
-                    rel
-                    for rel in relationships
-                    if rel.source.type.lower() in lower_allowed_nodes
-                    and rel.target.type.lower() in lower_allowed_nodes
-                ]
-            if self.allowed_relationships:
-                # Filter by type and direction
-                if self._relationship_type == "tuple":
-                    relationships = [
-                        rel
-                        for rel in relationships
-                        if (
-                            (
-                                rel.source.type.lower(),
-                                rel.type.lower(),
-                                rel.target.type.lower(),
-                            )
-                            in [  # type: ignore
-                                (s_t.lower(), r_t.lower(), t_t.lower())
-                                for s_t, r_t, t_t in self.allowed_relationships
-                            ]
-                        )
-                    ]
-                else:  # Filter by type only
-                    relationships = [
-                        rel
-                        for rel in relationships
-                        if rel.type.lower()
-                        in [el.lower() for el in self.allowed_relationships]  # type: ignore
-                    ]
+    async def aprocess_packed(
+        self, documents: Sequence[Document], config: Optional[RunnableConfig] = None
+    ) -> List[Optional[GraphDocument]]:
+        """
+        Asynchronously process several documents with a single LLM request.
 
-        return GraphDocument(nodes=nodes, relationships=relationships, source=document)
+        Cached documents are left out of the request. Documents the model
+        returned no graph for are None, so that callers extract them again
+        instead of treating an empty graph as their result.
+        """
+        results: List[Optional[Tuple[List[Node], List[Relationship]]]] = []
+        cache_keys: List[Optional[str]] = []
+        for document in documents:
+            cache_key, cached = self._cached_extraction(document.page_content)
+            results.append(cached)
+            cache_keys.append(cache_key)
+
+        pending = [index for index, result in enumerate(results) if result is None]
+        if pending:
+            raw_schema = await self._ainvoke_packed_chain(
+                [documents[index].page_content for index in pending], config
+            )
+            extracted = _convert_packed_response(
+                raw_schema,
+                len(pending),
+                self._function_call,
+                None if self._function_call else self._repair_json,
+                self._node_interner,
+            )
+            for index, graph in zip(pending, extracted):
+                if graph is None:
+                    logging.warning(
+                        f"Packed response contained no graph for chunk {index} of {len(documents)}"
+                    )
+                    telemetry.increment("packed_chunks_missing_total")
+                    continue
+                results[index] = graph
+                if self.cache:
+                    self.cache.set(cache_keys[index], *graph)  # type: ignore[arg-type]
+
+        graph_documents: List[Optional[GraphDocument]] = []
+        for document, result in zip(documents, results):
+            if result is None:
+                graph_documents.append(None)
+                continue
+            nodes, relationships = self._apply_strict_mode(*result)
+            graph_documents.append(
+                GraphDocument(nodes=nodes, relationships=relationships, source=document)
+            )
+        return graph_documents
 
     async def aconvert_to_graph_documents(
         self, documents: Sequence[Document], config: Optional[RunnableConfig] = None
@@ -1028,111 +1767,184 @@ class LLMGraphTransformer:
         """
         return await self._aconvert_to_graph_documents_with_retry(documents, config)
 
-    async def _aconvert_to_graph_documents_with_retry(
+    async def aiter_graph_documents(
         self, documents: Sequence[Document], config: Optional[RunnableConfig] = None,
-        max_retries: int = 3, base_delay: float = 1.0
-    ) -> List[GraphDocument]:
+        max_retries: int = 3, base_delay: float = 1.0,
+        max_concurrency: Optional[int] = None,
+        on_relationship: Optional[Callable[[int, Relationship], Any]] = None,
+    ) -> AsyncIterator[Tuple[int, GraphDocument]]:
         """
-        Convert documents to graph documents with exponential backoff retry logic.
-        
+        Asynchronously yield graph documents as soon as each one is completed.
+
+        Documents are processed by a bounded pool of workers pulling from a shared
+        queue, so a slow chunk only occupies its own slot. Failed documents are
+        re-queued after their own exponential backoff delay without blocking a
+        worker while they wait. Documents that still fail after `max_retries` are
+        logged and skipped.
+
+        With `pack_size` above 1, consecutive documents are extracted together in
+        one request (see `aprocess_packed`) and retried together, but still
+        yielded one by one. Documents a packed response has no graph for are
+        queued again to be extracted on their own.
+
+        `on_relationship(index, relationship)` lets downstream stages start on
+        relationships before their document is complete: with `streaming`
+        enabled, single-document requests deliver each relationship as soon as
+        the model has generated it; packed requests deliver them once the pack
+        completes. Relationships streamed by an attempt that later fails are
+        not withdrawn and may be delivered again by the retry.
+
         Args:
             documents: Sequence of documents to process
             config: Optional runnable configuration
-            max_retries: Maximum number of retry attempts (default: 3)
+            max_retries: Maximum number of retry attempts per document (default: 3)
             base_delay: Base delay in seconds for exponential backoff (default: 1.0)
-        
-        Returns:
-            List of GraphDocument objects
+            max_concurrency: Number of concurrent workers (default: self.max_concurrency)
+            on_relationship: Optional function or coroutine function called with
+                (index of the document in `documents`, Relationship)
+
+        Yields:
+            Tuples of (index of the document in `documents`, GraphDocument), in
+            completion order
+
+        Example:
+            .. code-block:: python
+                async for index, graph_document in transformer.aiter_graph_documents(docs):
+                    store(graph_document)
         """
-        successful_results = []
-        failed_documents = list(documents)
-        
-        for attempt in range(max_retries + 1):
-            if not failed_documents:
-                break
-                
-            if attempt > 0:
-                delay = base_delay * (2 ** (attempt - 1))
-                logging.info(f"Retrying {len(failed_documents)} documents in {delay:.1f}s (attempt {attempt + 1}/{max_retries + 1})")
-                await asyncio.sleep(delay)
-            
-            # Process documents in smaller batches to avoid overwhelming the API
-            batch_size = min(5, len(failed_documents))  # Process max 5 documents at a time
-            current_batch = failed_documents[:batch_size]
-            remaining_documents = failed_documents[batch_size:]
-            
-            try:
-                # Create tasks for current batch
-                tasks = [
-                    asyncio.create_task(self._safe_aprocess_response(doc, config))
-                    for doc in current_batch
-                ]
-                
-                # Wait for all tasks to complete
-                batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Process results and separate successful from failed
-                batch_successful = []
-                batch_failed_docs = []
-                
-                for i, result in enumerate(batch_results):
-                    if isinstance(result, Exception):
-                        # This document failed, add to retry list
-                        batch_failed_docs.append(current_batch[i])
-                        logging.warning(f"Document failed: {str(result)[:100]}...")
-                    else:
-                        # This document succeeded
-                        batch_successful.append(result)
-                
-                successful_results.extend(batch_successful)
-                failed_documents = batch_failed_docs + remaining_documents
-                
-                # If this batch had some successes, continue with remaining documents
-                if batch_successful and remaining_documents:
-                    # Recursively process remaining documents
-                    remaining_results = await self._aconvert_to_graph_documents_with_retry(
-                        remaining_documents, config, max_retries - attempt, base_delay
-                    )
-                    successful_results.extend(remaining_results)
-                    break
-                    
-            except Exception as e:
-                logging.error(f"Batch processing failed on attempt {attempt + 1}: {str(e)}")
-                if attempt == max_retries:
-                    # Final attempt failed, log error and return what we have
-                    logging.error(f"Final attempt failed. Returning {len(successful_results)} successful results out of {len(documents)} total documents.")
-                continue
-        
-        # Log final results
-        success_count = len(successful_results)
         total_count = len(documents)
+        if not total_count:
+            return
+        max_concurrency = max_concurrency or self.max_concurrency
+
+        packs = self._plan_packs(documents)
+        queue: "asyncio.Queue[Tuple[Tuple[int, ...], int]]" = asyncio.Queue()
+        completed: "asyncio.Queue[Tuple[int, Optional[GraphDocument]]]" = asyncio.Queue()
+        for pack in packs:
+            queue.put_nowait((pack, 0))
+        retry_tasks: set = set()
+
+        async def requeue_after(item: Tuple[Tuple[int, ...], int], delay: float) -> None:
+            await asyncio.sleep(delay)
+            queue.put_nowait(item)
+
+        async def worker() -> None:
+            while True:
+                pack, attempt = await queue.get()
+                label = f"Document {pack[0]}" if len(pack) == 1 else f"Documents {pack[0]}-{pack[-1]}"
+                try:
+                    with telemetry.span(
+                        "process_response", chunk=pack[0], chunks=len(pack), attempt=attempt
+                    ):
+                        if len(pack) == 1:
+                            results: List[Optional[GraphDocument]] = [
+                                await self._safe_aprocess_response(
+                                    documents[pack[0]],
+                                    config,
+                                    None
+                                    if on_relationship is None
+                                    else functools.partial(on_relationship, pack[0]),
+                                )
+                            ]
+                        else:
+                            results = list(await self._safe_aprocess_packed(
+                                [documents[index] for index in pack], config
+                            ))
+                            missing = [
+                                index for index, result in zip(pack, results) if result is None
+                            ]
+                            if missing:
+                                logging.info(f"Extracting {len(missing)} chunks missing from the packed response on their own")
+                                for index in missing:
+                                    queue.put_nowait(((index,), 0))
+                                pack = tuple(index for index in pack if index not in missing)
+                                results = [result for result in results if result is not None]
+                            if on_relationship is not None:
+                                for index, result in zip(pack, results):
+                                    await _deliver_relationships(
+                                        result,  # type: ignore[arg-type]
+                                        functools.partial(on_relationship, index),
+                                    )
+                except Exception as e:
+                    logging.warning(f"{label} failed: {str(e)[:100]}...")
+                    if attempt < max_retries:
+                        telemetry.increment("llm_retries_total")
+                        delay = base_delay * (2 ** attempt)
+                        logging.info(f"Retrying {label.lower()} in {delay:.1f}s (attempt {attempt + 2}/{max_retries + 1})")
+                        retry_tasks.add(asyncio.create_task(
+                            requeue_after((pack, attempt + 1), delay)
+                        ))
+                        continue
+                    logging.error(f"{label} failed after {max_retries + 1} attempts.")
+                    telemetry.increment("chunks_failed_total", len(pack))
+                    results = [None] * len(pack)
+                for index, result in zip(pack, results):
+                    completed.put_nowait((index, result))
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(max_concurrency, len(packs)))
+        ]
+        success_count = 0
+        try:
+            for _ in range(total_count):
+                index, result = await completed.get()
+                if result is not None:
+                    success_count += 1
+                    yield index, result
+        finally:
+            # Also reached when the consumer stops iterating early
+            for task in workers + list(retry_tasks):
+                task.cancel()
+            await asyncio.gather(*workers, *retry_tasks, return_exceptions=True)
+
+        # Log final results
         if success_count < total_count:
             logging.warning(f"Processed {success_count}/{total_count} documents successfully. {total_count - success_count} documents failed.")
         else:
             logging.info(f"Successfully processed all {total_count} documents.")
-        
-        return successful_results
+
+    async def _aconvert_to_graph_documents_with_retry(
+        self, documents: Sequence[Document], config: Optional[RunnableConfig] = None,
+        max_retries: int = 3, base_delay: float = 1.0,
+        max_concurrency: Optional[int] = None
+    ) -> List[GraphDocument]:
+        """
+        Convert documents to graph documents using the worker pool of
+        `aiter_graph_documents`.
+
+        Returns:
+            List of GraphDocument objects for the successful documents, in the
+            original document order
+        """
+        results: List[Optional[GraphDocument]] = [None] * len(documents)
+        async for index, result in self.aiter_graph_documents(
+            documents, config, max_retries, base_delay, max_concurrency
+        ):
+            results[index] = result
+        return [result for result in results if result is not None]
 
     async def _safe_aprocess_response(
-        self, document: Document, config: Optional[RunnableConfig] = None
+        self,
+        document: Document,
+        config: Optional[RunnableConfig] = None,
+        on_relationship: Optional[Callable[[Relationship], Any]] = None,
     ) -> GraphDocument:
         """
         Safely process a single document with specific error handling.
         """
         try:
-            return await self.aprocess_response(document, config)
+            return await self.aprocess_response(document, config, on_relationship)
         except Exception as e:
-            # Log the specific error for debugging
-            error_msg = str(e)
-            if "rate limit" in error_msg.lower():
-                raise Exception(f"Rate limit exceeded: {error_msg}")
-            elif "timeout" in error_msg.lower():
-                raise Exception(f"Request timeout: {error_msg}")
-            elif "connection" in error_msg.lower():
-                raise Exception(f"Connection error: {error_msg}")
-            elif "authentication" in error_msg.lower():
-                raise Exception(f"Authentication error: {error_msg}")
-            elif "quota" in error_msg.lower() or "billing" in error_msg.lower():
-                raise Exception(f"Quota/billing error: {error_msg}")
-            else:
-                raise Exception(f"API error: {error_msg}")
\ No newline at end of file
+            raise _classify_error(e)
+
+    async def _safe_aprocess_packed(
+        self, documents: Sequence[Document], config: Optional[RunnableConfig] = None
+    ) -> List[Optional[GraphDocument]]:
+        """
+        Safely process a pack of documents with specific error handling.
+        """
+        try:
+            return await self.aprocess_packed(documents, config)
+        except Exception as e:
+            raise _classify_error(e)
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""
+Streaming, budgeted readers for visualizing the accumulated Neo4j graph.
+
+Queries use keyset pagination on the internal id (`WHERE id(x) > $after ORDER BY
+id(x) LIMIT $page_size`) and project only the fields the visualization needs,
+so the whole database is never materialized at once. When the graph exceeds
+the node budget, the highest-degree nodes are sampled instead.
+
+Degrees are computed with `COUNT { (n)--() }` subqueries, which read the
+degree from the node store but require Neo4j 5 or later (AuraDB runs 5).
+
+Passing `chunks` (provenance entries, see `neo4j_writer.provenance_key`)
+restricts the readers to the graph extracted from those chunks, e.g. one
+document.
+"""
+from typing import Any, Dict, Iterator, List, Optional
+
+from neo4j_writer import BASE_ENTITY_LABEL, escape_name
+
+NODE_FIELDS = (
+    "id(n) AS internal_id, n.id AS id, "
+    f"[label IN labels(n) WHERE label <> '{BASE_ENTITY_LABEL}'][0] AS type, "
+    "n.source_document AS source_document"
+)
+
+
+def _provenance(variable: str, chunks: Optional[List[str]]) -> str:
+    """Condition matching graph elements extracted from `$chunks`."""
+    if chunks is None:
+        return "true"
+    return f"any(c IN coalesce({variable}.chunks, []) WHERE c IN $chunks)"
+
+
+class GraphReader:
+    """Reads nodes and relationships from Neo4j page by page.
+
+    Args:
+        graph: A Neo4jGraph (or any object exposing `query(cypher, params)`).
+        page_size (int): Rows fetched per query.
+    """
+
+    def __init__(self, graph: Any, page_size: int = 5000) -> None:
+        if page_size < 1:
+            raise ValueError("`page_size` must be a positive integer.")
+        self.graph = graph
+        self.page_size = page_size
+
+    def count_nodes(self, chunks: Optional[List[str]] = None) -> int:
+        return self.graph.query(
+            f"MATCH (n) WHERE {_provenance('n', chunks)} RETURN count(n) AS count",
+            {"chunks": chunks},
+        )[0]["count"]
+
+    def count_relationships(self, chunks: Optional[List[str]] = None) -> int:
+        return self.graph.query(
+            f"MATCH ()-[r]->() WHERE {_provenance('r', chunks)} RETURN count(r) AS count",
+            {"chunks": chunks},
+        )[0]["count"]
+
+    def iter_nodes(
+        self, limit: Optional[int] = None, chunks: Optional[List[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield every node (up to `limit`) in internal id order."""
+        after = -1
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = self.page_size if remaining is None else min(self.page_size, remaining)
+            rows = self.graph.query(
+                f"MATCH (n) WHERE id(n) > $after AND {_provenance('n', chunks)} "
+                f"RETURN {NODE_FIELDS} ORDER BY internal_id LIMIT $limit",
+                {"after": after, "limit": page_size, "chunks": chunks},
+            )
+            yield from rows
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < page_size:
+                return
+            after = rows[-1]["internal_id"]
+
+    def top_nodes_by_degree(
+        self, limit: int, chunks: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the `limit` nodes with the most relationships.
+
+        Requires Neo4j 5 or later for the `COUNT {}` subquery.
+        """
+        return self.graph.query(
+            f"MATCH (n) WHERE {_provenance('n', chunks)} "
+            "WITH n, COUNT { (n)--() } AS degree "
+            f"ORDER BY degree DESC LIMIT $limit RETURN {NODE_FIELDS}, degree",
+            {"limit": limit, "chunks": chunks},
+        )
+
+    def iter_relationships(
+        self, limit: Optional[int] = None, chunks: Optional[List[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield every relationship (up to `limit`) in internal id order."""
+        after = -1
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = self.page_size if remaining is None else min(self.page_size, remaining)
+            rows = self.graph.query(
+                f"MATCH (a)-[r]->(b) WHERE id(r) > $after AND {_provenance('r', chunks)} "
+                "RETURN id(r) AS internal_id, id(a) AS source, id(b) AS target, "
+                "type(r) AS type ORDER BY internal_id LIMIT $limit",
+                {"after": after, "limit": page_size, "chunks": chunks},
+            )
+            yield from rows
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < page_size:
+                return
+            after = rows[-1]["internal_id"]
+
+    def iter_relationships_between(
+        self,
+        node_ids: List[int],
+        limit: Optional[int] = None,
+        chunks: Optional[List[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield relationships whose endpoints are both in `node_ids`."""
+        remaining = limit
+        for start in range(0, len(node_ids), self.page_size):
+            if remaining is not None and remaining <= 0:
+                return
+            params = {
+                "sources": node_ids[start : start + self.page_size],
+                "ids": node_ids,
+                "chunks": chunks,
+            }
+            query = (
+                "MATCH (a)-[r]->(b) WHERE id(a) IN $sources AND id(b) IN $ids "
+                f"AND {_provenance('r', chunks)} "
+                "RETURN id(a) AS source, id(b) AS target, type(r) AS type"
+            )
+            if remaining is not None:
+                query += " LIMIT $limit"
+                params["limit"] = remaining
+            rows = self.graph.query(query, params)
+            yield from rows
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def load(
+        self,
+        node_budget: Optional[int] = None,
+        edge_budget: Optional[int] = None,
+        chunks: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Load the graph for visualization within the given budgets.
+
+        When the database (or the graph of `chunks`) holds more nodes than
+        `node_budget`, only the highest-degree nodes and the relationships among
+        them are returned.
+
+        Returns:
+            Dict[str, Any]: `nodes`, `relationships`, the database totals and
+            whether the result was `sampled`.
+        """
+        total_nodes = self.count_nodes(chunks)
+        total_relationships = self.count_relationships(chunks)
+        sampled = node_budget is not None and total_nodes > node_budget
+        if sampled:
+            nodes = self.top_nodes_by_degree(node_budget, chunks)  # type: ignore[arg-type]
+            relationships = list(
+                self.iter_relationships_between(
+                    [node["internal_id"] for node in nodes], edge_budget, chunks
+                )
+            )
+        else:
+            nodes = list(self.iter_nodes(chunks=chunks))
+            relationships = list(self.iter_relationships(edge_budget, chunks))
+        return {
+            "nodes": nodes,
+            "relationships": relationships,
+            "total_nodes": total_nodes,
+            "total_relationships": total_relationships,
+            "sampled": sampled or (
+                edge_budget is not None and total_relationships > edge_budget
+            ),
+        }
+
+    def find_seeds(
+        self,
+        entity_id: Optional[str] = None,
+        entity_type: Optional[str] = None,
+        limit: int = 25,
+        base_entity_label: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Look up seed nodes by id and/or label through the id indexes.
+
+        Without an id, the `limit` highest-degree nodes of `entity_type` are
+        used, which requires Neo4j 5 or later for the `COUNT {}` subquery.
+        """
+        if entity_type:
+            label = escape_name(entity_type)
+        elif base_entity_label:
+            label = escape_name(BASE_ENTITY_LABEL)
+        else:
+            label = ""
+        pattern = f"(n:{label})" if label else "(n)"
+        if entity_id:
+            # Node ids are title-cased by the transformer, accept the raw input too
+            return self.graph.query(
+                f"MATCH {pattern} WHERE n.id IN $ids RETURN {NODE_FIELDS} LIMIT $limit",
+                {"ids": list(dict.fromkeys([entity_id, entity_id.title()])), "limit": limit},
+            )
+        if not label:
+            raise ValueError("Either an entity id or an entity type is required.")
+        return self.graph.query(
+            f"MATCH {pattern} WITH n, COUNT {{ (n)--() }} AS degree "
+            f"ORDER BY degree DESC LIMIT $limit RETURN {NODE_FIELDS}",
+            {"limit": limit},
+        )
+
+    def neighborhood(
+        self,
+        seeds: List[Dict[str, Any]],
+        hops: int = 1,
+        max_fanout: int = 25,
+        node_budget: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Expand `seeds` breadth-first up to `hops`, following at most
+        `max_fanout` relationships per node and hop.
+
+        Returns:
+            Dict[str, Any]: `nodes` and `relationships` of the neighborhood and
+            whether expansion was `truncated` by the node budget.
+        """
+        nodes: Dict[int, Dict[str, Any]] = {node["internal_id"]: node for node in seeds}
+        relationships: Dict[int, Dict[str, Any]] = {}
+        frontier = list(nodes)
+        truncated = False
+        for _ in range(hops):
+            if not frontier:
+                break
+            rows = self.graph.query(
+                "UNWIND $frontier AS node_id MATCH (a) WHERE id(a) = node_id "
+                "CALL { WITH a MATCH (a)-[r]-(n) RETURN r, n LIMIT $fanout } "
+                "RETURN id(r) AS rel_id, id(startNode(r)) AS source, "
+                f"id(endNode(r)) AS target, type(r) AS rel_type, {NODE_FIELDS}",
+                {"frontier": frontier, "fanout": max_fanout},
+            )
+            next_frontier = []
+            for row in rows:
+                node_id = row["internal_id"]
+                if node_id not in nodes:
+                    if node_budget is not None and len(nodes) >= node_budget:
+                        truncated = True
+                        continue
+                    nodes[node_id] = {
+                        key: row[key] for key in ("internal_id", "id", "type", "source_document")
+                    }
+                    next_frontier.append(node_id)
+                relationships[row["rel_id"]] = {
+                    "source": row["source"], "target": row["target"], "type": row["rel_type"]
+                }
+            frontier = next_frontier
+        return {
+            "nodes": list(nodes.values()),
+            "relationships": list(relationships.values()),
+            "truncated": truncated,
+        }
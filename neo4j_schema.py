@@ -0,0 +1,81 @@
+"""
+Idempotent schema bootstrap for the knowledge graph database.
+
+Every write MERGEs nodes on `id`, so each entity label needs a uniqueness
+constraint (which is backed by an index) on that property. Where existing data
+already violates uniqueness, a plain range index is created instead.
+"""
+import logging
+import re
+from typing import Any, Dict, Iterable, List
+
+from neo4j_writer import BASE_ENTITY_LABEL, escape_name
+
+
+def _schema_name(label: str, kind: str) -> str:
+    return f"kg_{re.sub(r'[^0-9a-zA-Z]+', '_', label).strip('_').lower()}_id_{kind}"
+
+
+def _existing_names(graph: Any) -> set:
+    names = set()
+    for query in ("SHOW CONSTRAINTS YIELD name", "SHOW INDEXES YIELD name"):
+        names.update(row["name"] for row in graph.query(query))
+    return names
+
+
+def ensure_schema(
+    graph: Any,
+    labels: Iterable[str],
+    base_entity_label: bool = False,
+    include_source: bool = False,
+) -> Dict[str, List[str]]:
+    """Create uniqueness constraints (or range indexes) on `id` for every label.
+
+    Safe to run repeatedly: already existing schema objects are left untouched.
+
+    Args:
+        graph: A Neo4jGraph (or any object exposing `query(cypher)`).
+        labels (Iterable[str]): Entity labels to index.
+        base_entity_label (bool): Also index the shared `__Entity__` label.
+        include_source (bool): Also index `Document` nodes created for sources.
+
+    Returns:
+        Dict[str, List[str]]: Names of schema objects that were `created`,
+        already `existing`, or `failed` to be created.
+    """
+    all_labels = list(dict.fromkeys(labels))
+    if base_entity_label:
+        all_labels.insert(0, BASE_ENTITY_LABEL)
+    if include_source:
+        all_labels.append("Document")
+
+    existing = _existing_names(graph)
+    report: Dict[str, List[str]] = {"created": [], "existing": [], "failed": []}
+    for label in all_labels:
+        constraint_name = _schema_name(label, "unique")
+        index_name = _schema_name(label, "index")
+        if constraint_name in existing or index_name in existing:
+            report["existing"].append(
+                constraint_name if constraint_name in existing else index_name
+            )
+            continue
+        try:
+            graph.query(
+                f"CREATE CONSTRAINT {constraint_name} IF NOT EXISTS "
+                f"FOR (n:{escape_name(label)}) REQUIRE n.id IS UNIQUE"
+            )
+            report["created"].append(constraint_name)
+            continue
+        except Exception as e:
+            # Duplicate ids in existing data prevent a uniqueness constraint
+            logging.warning(f"Could not create constraint on {label}.id: {str(e)[:100]}")
+        try:
+            graph.query(
+                f"CREATE INDEX {index_name} IF NOT EXISTS "
+                f"FOR (n:{escape_name(label)}) ON (n.id)"
+            )
+            report["created"].append(index_name)
+        except Exception as e:
+            logging.error(f"Could not create index on {label}.id: {str(e)[:100]}")
+            report["failed"].append(label)
+    return report
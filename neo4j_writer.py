@@ -0,0 +1,420 @@
+"""
+Batched bulk writer for storing GraphDocuments in Neo4j.
+
+Nodes are grouped by label and relationships by (source label, type, target
+label) so that each group is written with a single parameterized
+`UNWIND $rows AS row MERGE ...` statement per batch, inside explicit write
+transactions. Only `driver.session(database=...)` and `session.execute_write`
+are used, so any object exposing those (e.g. a mock driver) can stand in for
+a real Neo4j driver. `AsyncNeo4jBatchWriter` issues the same statements
+through a `neo4j.AsyncDriver`.
+
+When source documents carry a `chunk_hash` in their metadata, every node,
+relationship and source `Document` records the chunks it was extracted from in
+a `chunks` list property, so the graph of a chunk can later be removed. The
+entries are scoped to the written document name (see `provenance_key`): a
+chunk whose text also occurs in another document keeps that document's graph
+when it is removed from the first one.
+"""
+import hashlib
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_community.graphs.graph_document import GraphDocument
+
+BASE_ENTITY_LABEL = "__Entity__"
+
+
+def escape_name(name: str) -> str:
+    """Backtick-quote a label or relationship type for safe use in Cypher."""
+    return "`" + name.replace("`", "``") + "`"
+
+
+def provenance_key(chunk_hash: str, document_name: Optional[str] = None) -> str:
+    """Entry of the `chunks` property for a chunk of `document_name`."""
+    return f"{document_name}:{chunk_hash}" if document_name else chunk_hash
+
+
+def _batches(rows: List[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def _primitive_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    # Neo4j properties cannot hold nested maps
+    return {
+        key: value
+        for key, value in metadata.items()
+        if isinstance(value, (str, int, float, bool))
+    }
+
+
+def _run_batch(tx: Any, query: str, rows: List[Dict[str, Any]], params: Dict[str, Any]) -> None:
+    tx.run(query, rows=rows, **params).consume()
+
+
+def _run_query(tx: Any, query: str, params: Dict[str, Any]) -> Any:
+    return tx.run(query, **params).consume()
+
+
+async def _arun_batch(
+    tx: Any, query: str, rows: List[Dict[str, Any]], params: Dict[str, Any]
+) -> None:
+    result = await tx.run(query, rows=rows, **params)
+    await result.consume()
+
+
+async def _arun_query(tx: Any, query: str, params: Dict[str, Any]) -> Any:
+    result = await tx.run(query, **params)
+    return await result.consume()
+
+
+def _deleted(summary: Any, counter: str) -> int:
+    try:
+        return getattr(summary.counters, counter)
+    except AttributeError:
+        return 0
+
+
+def _merge_chunks(variable: str) -> str:
+    # Append the row's chunk hashes without duplicating existing ones
+    return (
+        f" SET {variable}.chunks = coalesce({variable}.chunks, []) + "
+        f"[c IN row.chunks WHERE NOT c IN coalesce({variable}.chunks, [])]"
+    )
+
+
+class Neo4jBatchWriter:
+    """Writes GraphDocuments to Neo4j using batched UNWIND/MERGE statements.
+
+    Args:
+        driver: A neo4j driver (or compatible stand-in) exposing `session()`.
+        database (Optional[str]): Target database name. Defaults to the server default.
+        batch_size (int): Maximum rows sent per statement/transaction.
+        base_entity_label (bool): Merge nodes on an additional `__Entity__` label,
+          which allows a single index on `__Entity__(id)` to serve every lookup.
+        include_source (bool): Store the source chunk as a `Document` node linked
+          to the entities it mentions via `MENTIONS` relationships.
+    """
+
+    def __init__(
+        self,
+        driver: Any,
+        database: Optional[str] = None,
+        batch_size: int = 1000,
+        base_entity_label: bool = False,
+        include_source: bool = False,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("`batch_size` must be a positive integer.")
+        self.driver = driver
+        self.database = database
+        self.batch_size = batch_size
+        self.base_entity_label = base_entity_label
+        self.include_source = include_source
+
+    def _merge_node(self, variable: str, label: str, id_expr: str) -> str:
+        if self.base_entity_label:
+            return (
+                f"MERGE ({variable}:{escape_name(BASE_ENTITY_LABEL)} {{id: {id_expr}}}) "
+                f"SET {variable}:{escape_name(label)} "
+            )
+        return f"MERGE ({variable}:{escape_name(label)} {{id: {id_expr}}}) "
+
+    def _node_query(self, label: str, with_document: bool, with_chunks: bool) -> str:
+        query = (
+            "UNWIND $rows AS row "
+            + self._merge_node("n", label, "row.id")
+            + "SET n += row.properties"
+        )
+        if with_document:
+            query += (
+                " SET n.source_document = $document_name, n.created_at = $created_at"
+            )
+        if with_chunks:
+            query += _merge_chunks("n")
+        return query
+
+    def _relationship_query(
+        self, source_label: str, rel_type: str, target_label: str, with_chunks: bool
+    ) -> str:
+        query = (
+            "UNWIND $rows AS row "
+            + self._merge_node("source", source_label, "row.source")
+            + "WITH source, row "
+            + self._merge_node("target", target_label, "row.target")
+            + f"MERGE (source)-[r:{escape_name(rel_type)}]->(target) "
+            "SET r += row.properties"
+        )
+        if with_chunks:
+            query += _merge_chunks("r")
+        return query
+
+    def _document_query(self, with_chunks: bool) -> str:
+        return (
+            "UNWIND $rows AS row "
+            "MERGE (d:Document {id: row.id}) "
+            "SET d.text = row.text, d += row.metadata"
+            + (_merge_chunks("d") if with_chunks else "")
+            + " WITH d, row "
+            "UNWIND row.mentions AS mention "
+            + (
+                f"MATCH (n:{escape_name(BASE_ENTITY_LABEL)} {{id: mention.id}}) "
+                if self.base_entity_label
+                else "MATCH (n {id: mention.id}) "
+            )
+            + "WHERE mention.label IN labels(n) "
+            "MERGE (d)-[:MENTIONS]->(n)"
+        )
+
+    def group(
+        self, graph_documents: Sequence[GraphDocument], document_name: Optional[str] = None
+    ) -> Tuple[
+        Dict[str, List[Dict[str, Any]]],
+        Dict[Tuple[str, str, str], List[Dict[str, Any]]],
+        List[Dict[str, Any]],
+    ]:
+        """Group nodes by label and relationships by type, deduplicating rows.
+
+        Chunk provenance entries are scoped to `document_name`.
+        """
+        nodes: Dict[str, Dict[Any, Dict[str, Any]]] = defaultdict(dict)
+        relationships: Dict[Tuple[str, str, str], Dict[Any, Dict[str, Any]]] = defaultdict(dict)
+        documents: Dict[str, Dict[str, Any]] = {}
+
+        def node_row(node_type: str, node_id: Any) -> Dict[str, Any]:
+            return nodes[node_type].setdefault(
+                node_id, {"id": node_id, "properties": {}, "chunks": []}
+            )
+
+        def add_chunk(row: Dict[str, Any], chunk: Optional[str]) -> None:
+            if chunk and chunk not in row["chunks"]:
+                row["chunks"].append(chunk)
+
+        for doc in graph_documents:
+            chunk = doc.source.metadata.get("chunk_hash") if doc.source else None
+            if chunk:
+                chunk = provenance_key(chunk, document_name)
+            for node in doc.nodes:
+                row = node_row(node.type, node.id)
+                row["properties"].update(node.properties or {})
+                add_chunk(row, chunk)
+            for rel in doc.relationships:
+                # Relationship endpoints must exist even if the LLM omitted them
+                add_chunk(node_row(rel.source.type, rel.source.id), chunk)
+                add_chunk(node_row(rel.target.type, rel.target.id), chunk)
+                key = (rel.source.type, rel.type, rel.target.type)
+                row = relationships[key].setdefault(
+                    (rel.source.id, rel.target.id),
+                    {
+                        "source": rel.source.id,
+                        "target": rel.target.id,
+                        "properties": {},
+                        "chunks": [],
+                    },
+                )
+                row["properties"].update(rel.properties or {})
+                add_chunk(row, chunk)
+            if self.include_source and doc.source is not None:
+                text = doc.source.page_content
+                document_id = hashlib.md5(text.encode("utf-8")).hexdigest()
+                row = documents.setdefault(
+                    document_id,
+                    {
+                        "id": document_id,
+                        "text": text,
+                        "metadata": _primitive_metadata(doc.source.metadata),
+                        "mentions": [],
+                        "chunks": [],
+                    },
+                )
+                add_chunk(row, chunk)
+                row["mentions"].extend(
+                    {"id": node.id, "label": node.type} for node in doc.nodes
+                )
+
+        return (
+            {label: list(rows.values()) for label, rows in nodes.items()},
+            {key: list(rows.values()) for key, rows in relationships.items()},
+            list(documents.values()),
+        )
+
+    def _statements(
+        self, graph_documents: Sequence[GraphDocument], document_name: Optional[str]
+    ) -> Iterator[Tuple[str, str, List[Dict[str, Any]]]]:
+        """Yield `(kind, query, rows)` in write order."""
+        node_groups, relationship_groups, documents = self.group(graph_documents, document_name)
+        with_chunks = any(
+            doc.source is not None and doc.source.metadata.get("chunk_hash")
+            for doc in graph_documents
+        )
+        # Nodes first so relationship MERGEs hit existing nodes
+        for label, rows in node_groups.items():
+            yield "nodes", self._node_query(label, document_name is not None, with_chunks), rows
+        for (source_label, rel_type, target_label), rows in relationship_groups.items():
+            yield (
+                "relationships",
+                self._relationship_query(source_label, rel_type, target_label, with_chunks),
+                rows,
+            )
+        if documents:
+            yield "documents", self._document_query(with_chunks), documents
+
+    def _delete_statements(self) -> List[Tuple[str, Optional[str]]]:
+        """Return `(query, deleted counter)` pairs removing the graph of `$chunks`."""
+        match_label = (
+            f":{escape_name(BASE_ENTITY_LABEL)}" if self.base_entity_label else ""
+        )
+        statements: List[Tuple[str, Optional[str]]] = []
+        # Source documents still referenced by another document are kept
+        if self.include_source:
+            statements.append(
+                (
+                    "MATCH (d:Document) WHERE any(c IN d.chunks WHERE c IN $chunks) "
+                    "SET d.chunks = [c IN d.chunks WHERE NOT c IN $chunks] "
+                    "WITH d WHERE size(d.chunks) = 0 DETACH DELETE d",
+                    None,
+                )
+            )
+        statements.append(
+            (
+                f"MATCH (n{match_label})-[r]-() "
+                "WHERE any(c IN n.chunks WHERE c IN $chunks) "
+                "AND any(c IN r.chunks WHERE c IN $chunks) "
+                "WITH DISTINCT r "
+                "SET r.chunks = [c IN r.chunks WHERE NOT c IN $chunks] "
+                "WITH r WHERE size(r.chunks) = 0 DELETE r",
+                "relationships_deleted",
+            )
+        )
+        statements.append(
+            (
+                f"MATCH (n{match_label}) WHERE any(c IN n.chunks WHERE c IN $chunks) "
+                "SET n.chunks = [c IN n.chunks WHERE NOT c IN $chunks] "
+                # MENTIONS of a kept source document do not keep a node alive
+                "WITH n WHERE size(n.chunks) = 0 "
+                "AND all(r IN [(n)-[r]-() | r] WHERE type(r) = 'MENTIONS') "
+                "DETACH DELETE n",
+                "nodes_deleted",
+            )
+        )
+        return statements
+
+    def _write_params(self, document_name: Optional[str]) -> Dict[str, Any]:
+        return {
+            "document_name": document_name,
+            "created_at": datetime.now().isoformat(),
+        }
+
+    @staticmethod
+    def _write_stats(counts: Dict[str, int], start: float) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - start
+        total_rows = sum(counts.values())
+        return {
+            "nodes": counts["nodes"],
+            "relationships": counts["relationships"],
+            "documents": counts["documents"],
+            "seconds": elapsed,
+            "rows_per_sec": total_rows / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def _write_rows(
+        self, session: Any, query: str, rows: List[Dict[str, Any]], params: Dict[str, Any]
+    ) -> int:
+        for batch in _batches(rows, self.batch_size):
+            session.execute_write(_run_batch, query, batch, params)
+        return len(rows)
+
+    def write(
+        self,
+        graph_documents: Sequence[GraphDocument],
+        document_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Write graph documents and return counts and throughput.
+
+        Args:
+            graph_documents: The graph documents to store.
+            document_name: Optional name stored as `source_document` on every node.
+
+        Returns:
+            Dict[str, Any]: Rows written per kind, elapsed seconds and rows/sec.
+        """
+        start = time.perf_counter()
+        params = self._write_params(document_name)
+        counts: Dict[str, int] = defaultdict(int)
+        with self.driver.session(database=self.database) as session:
+            for kind, query, rows in self._statements(graph_documents, document_name):
+                counts[kind] += self._write_rows(session, query, rows, params)
+        return self._write_stats(counts, start)
+
+    def delete_chunks(
+        self, chunk_hashes: Sequence[str], document_name: Optional[str] = None
+    ) -> Dict[str, int]:
+        """Remove the graph the given chunks contributed to `document_name`.
+
+        The chunks are removed from the `chunks` property of every affected
+        relationship, node and source document. Relationships and documents left
+        without any chunk are deleted, as are nodes left without any chunk and
+        without relationships other than `MENTIONS`. Graph that another document
+        contributed through a chunk with the same text is kept.
+
+        Returns:
+            Dict[str, int]: Number of deleted relationships and nodes.
+        """
+        deleted = {"relationships": 0, "nodes": 0}
+        if not chunk_hashes:
+            return deleted
+        params = {"chunks": [provenance_key(h, document_name) for h in chunk_hashes]}
+        with self.driver.session(database=self.database) as session:
+            for query, counter in self._delete_statements():
+                summary = session.execute_write(_run_query, query, params)
+                if counter:
+                    deleted[counter[: -len("_deleted")]] += _deleted(summary, counter)
+        return deleted
+
+
+class AsyncNeo4jBatchWriter(Neo4jBatchWriter):
+    """Asynchronous variant of Neo4jBatchWriter for `neo4j.AsyncDriver`.
+
+    Uses the same queries and batching; `write` and `delete_chunks` are
+    coroutines, so writes share the event loop with LLM extraction instead of
+    blocking it or a worker thread.
+    """
+
+    async def _write_rows(  # type: ignore[override]
+        self, session: Any, query: str, rows: List[Dict[str, Any]], params: Dict[str, Any]
+    ) -> int:
+        for batch in _batches(rows, self.batch_size):
+            await session.execute_write(_arun_batch, query, batch, params)
+        return len(rows)
+
+    async def write(  # type: ignore[override]
+        self,
+        graph_documents: Sequence[GraphDocument],
+        document_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Asynchronously write graph documents, see `Neo4jBatchWriter.write`."""
+        start = time.perf_counter()
+        params = self._write_params(document_name)
+        counts: Dict[str, int] = defaultdict(int)
+        async with self.driver.session(database=self.database) as session:
+            for kind, query, rows in self._statements(graph_documents, document_name):
+                counts[kind] += await self._write_rows(session, query, rows, params)
+        return self._write_stats(counts, start)
+
+    async def delete_chunks(  # type: ignore[override]
+        self, chunk_hashes: Sequence[str], document_name: Optional[str] = None
+    ) -> Dict[str, int]:
+        """Asynchronously remove the graph of chunks, see `Neo4jBatchWriter.delete_chunks`."""
+        deleted = {"relationships": 0, "nodes": 0}
+        if not chunk_hashes:
+            return deleted
+        params = {"chunks": [provenance_key(h, document_name) for h in chunk_hashes]}
+        async with self.driver.session(database=self.database) as session:
+            for query, counter in self._delete_statements():
+                summary = await session.execute_write(_arun_query, query, params)
+                if counter:
+                    deleted[counter[: -len("_deleted")]] += _deleted(summary, counter)
+        return deleted
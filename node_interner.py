@@ -0,0 +1,38 @@
+"""
+Interning of graph nodes.
+
+Relationships extracted from different chunks reference the same entities
+over and over. `NodeInterner` hands out one canonical `Node` per (id, type),
+so every relationship endpoint of a run shares a single instance instead of
+holding its own copy, and each distinct node is validated by pydantic once.
+Canonical nodes are held weakly and disappear once no graph document
+references them anymore.
+
+Interned nodes are shared: treat them as immutable and build a new Node to
+change one.
+"""
+import weakref
+from typing import Any, Tuple
+
+from langchain_community.graphs.graph_document import Node
+
+
+class NodeInterner:
+    """Canonical property-less `Node` instances keyed by `(id, type)`."""
+
+    def __init__(self) -> None:
+        self._nodes: "weakref.WeakValueDictionary[Tuple[Any, str], Node]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def node(self, node_id: Any, node_type: str) -> Node:
+        """Return the canonical node for `(node_id, node_type)`, creating it if needed."""
+        key = (node_id, node_type)
+        node = self._nodes.get(key)
+        if node is None:
+            node = Node(id=node_id, type=node_type)
+            self._nodes[key] = node
+        return node
+
+    def __len__(self) -> int:
+        return len(self._nodes)
@@ -0,0 +1,128 @@
+"""
+Progress reporting decoupled from the UI.
+
+Pipeline code reports through the module-level `reporter`, which forwards to
+the active backend: Streamlit when running inside `app.py` (the default), or
+the console/logging for headless runs such as the batch CLI.
+
+Coroutines run on the shared background loop report on behalf of whoever
+submitted them: `reporter.bind(coro)` captures the caller's context (the
+Streamlit script run) and every message written while `coro` runs, including
+from tasks it spawns, goes through that context.
+"""
+import contextvars
+import logging
+import threading
+
+# Reporting context of the caller a coroutine runs for, see `_Reporter.bind`
+_caller_context: contextvars.ContextVar = contextvars.ContextVar(
+    "caller_context", default=None
+)
+
+
+class StreamlitReporter:
+    """Reports progress with Streamlit elements."""
+
+    def __init__(self):
+        import streamlit as st
+
+        self._st = st
+
+    def capture(self):
+        """Return the script run context of the calling thread."""
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        return get_script_run_ctx(suppress_warning=True)
+
+    def _emit(self, element, message):
+        context = _caller_context.get()
+        if context is None:
+            element(message)
+            return
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+        # Streamlit looks the page up on the current thread. Bind the caller's
+        # context only for this synchronous call, so coroutines of other
+        # sessions sharing the thread keep writing to their own pages.
+        thread = threading.current_thread()
+        previous = get_script_run_ctx(suppress_warning=True)
+        add_script_run_ctx(thread, context)
+        try:
+            element(message)
+        finally:
+            add_script_run_ctx(thread, previous)
+
+    def write(self, message):
+        self._emit(self._st.write, message)
+
+    def info(self, message):
+        self._emit(self._st.info, message)
+
+    def warning(self, message):
+        self._emit(self._st.warning, message)
+
+    def error(self, message):
+        self._emit(self._st.error, message)
+
+
+class ConsoleReporter:
+    """Reports progress through the logging module."""
+
+    def __init__(self, logger=None):
+        self._logger = logger or logging.getLogger("kg")
+
+    def capture(self):
+        return None
+
+    def write(self, message):
+        self._logger.info(message.replace("**", ""))
+
+    def info(self, message):
+        self._logger.info(message.replace("**", ""))
+
+    def warning(self, message):
+        self._logger.warning(message.replace("**", ""))
+
+    def error(self, message):
+        self._logger.error(message.replace("**", ""))
+
+
+class _Reporter:
+    """Forwards calls to the active backend, created lazily."""
+
+    def __init__(self):
+        self._backend = None
+
+    def set_backend(self, backend):
+        self._backend = backend
+
+    def bind(self, coro):
+        """Wrap `coro` so its messages go through the calling thread's context.
+
+        Call this on the submitting thread, before handing `coro` to another
+        thread's event loop.
+        """
+        return _run_in_context(coro, self.capture())
+
+    def __getattr__(self, name):
+        if self._backend is None:
+            self._backend = StreamlitReporter()
+        return getattr(self._backend, name)
+
+
+async def _run_in_context(coro, context):
+    # Tasks created by `coro` copy the context variable, so they report for
+    # the same caller
+    token = _caller_context.set(context)
+    try:
+        return await coro
+    finally:
+        _caller_context.reset(token)
+
+
+reporter = _Reporter()
+
+
+def set_reporter(backend):
+    """Route all progress messages to `backend` (e.g. ConsoleReporter())."""
+    reporter.set_backend(backend)
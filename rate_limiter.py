@@ -0,0 +1,107 @@
+"""
+Token-bucket rate limiting for LLM provider calls.
+
+Providers cap both requests per minute and tokens per minute. Instead of
+truncating input to stay under those limits, callers acquire capacity from
+this limiter before each request and are queued until it is available.
+"""
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English/biomedical text (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class _Bucket:
+    """A single token bucket using a reservation model.
+
+    Capacity is deducted immediately, letting the balance go negative; the
+    caller then waits until the refill has paid off its reservation. This keeps
+    callers in FIFO order without an explicit queue.
+
+    The bucket holds `burst` of the quota and refills at the rest of it per
+    minute, so no 60 second window (including the first) admits more than
+    `per_minute`.
+    """
+
+    def __init__(self, per_minute: float, burst: float) -> None:
+        self.per_minute = float(per_minute)
+        self.capacity = per_minute * burst
+        self.rate = (per_minute - self.capacity) / 60.0
+        self.balance = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        self.balance = min(
+            self.capacity, self.balance + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        # A single request larger than the quota can never fit, clamp it
+        self.balance -= min(amount, self.per_minute)
+        return max(0.0, -self.balance / self.rate)
+
+
+class TokenBucketRateLimiter:
+    """Limits request and token throughput to the provider's per-minute quotas.
+
+    Args:
+        requests_per_minute (Optional[float]): Maximum requests per minute.
+          None disables the request limit.
+        tokens_per_minute (Optional[float]): Maximum (estimated) tokens per minute.
+          None disables the token limit.
+        burst (float): Share of each quota that may be used at once, e.g. on
+          startup. The rest is spread over the minute. Defaults to 0.1.
+
+    Example:
+        .. code-block:: python
+            limiter = TokenBucketRateLimiter(requests_per_minute=10)
+            await limiter.acquire(tokens=estimate_tokens(text))
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        burst: float = 0.1,
+    ) -> None:
+        if not 0 <= burst < 1:
+            raise ValueError("`burst` must be at least 0 and below 1.")
+        self._requests = (
+            _Bucket(requests_per_minute, burst) if requests_per_minute else None
+        )
+        self._tokens = _Bucket(tokens_per_minute, burst) if tokens_per_minute else None
+        self._lock = threading.Lock()
+        self.total_wait = 0.0
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self._requests:
+                wait = max(wait, self._requests.reserve(1, now))
+            if self._tokens and tokens:
+                wait = max(wait, self._tokens.reserve(tokens, now))
+            self.total_wait += wait
+            return wait
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """Wait until a request of `tokens` estimated tokens may be sent.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def acquire_sync(self, tokens: int = 0) -> float:
+        """Blocking variant of :meth:`acquire` for synchronous callers."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,335 @@
+"""
+Per-stage tracing and metrics for the ingestion pipeline.
+
+Pipeline code records through the module-level `telemetry`:
+
+    with telemetry.span("neo4j_write", chunks=len(batch)):
+        ...
+    telemetry.increment("llm_retries_total")
+    telemetry.observe("llm_request_seconds", elapsed)
+
+Every finished span is also observed in the `span_duration_seconds`
+histogram, labelled with the span name. Recorded data can be exported as
+Prometheus text (`to_prometheus`, or served over HTTP with `serve_prometheus`)
+or as OpenTelemetry-compatible OTLP/JSON (`to_otlp_json`, `write_otlp_json`).
+
+Telemetry is disabled by default. While disabled, `span` returns a shared
+no-op context manager and counters return immediately, so instrumented code
+pays no more than an attribute check.
+"""
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "kg_current_span", default=None
+)
+
+
+def _label_key(labels: Dict[str, Any]) -> _LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class _NoopSpan:
+    """Stand-in returned while telemetry is disabled."""
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """A timed operation; nested spans share the trace of their parent."""
+
+    def __init__(self, telemetry: "Telemetry", name: str, attributes: Dict[str, Any]) -> None:
+        self._telemetry = telemetry
+        self.name = name
+        self.attributes = attributes
+        self.span_id = secrets.token_hex(8)
+        self.trace_id = ""
+        self.parent_span_id: Optional[str] = None
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self._token: Optional[contextvars.Token] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        if parent is not None:
+            self.trace_id = parent.trace_id
+            self.parent_span_id = parent.span_id
+        else:
+            self.trace_id = secrets.token_hex(16)
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        if self._token is not None:
+            _current_span.reset(self._token)
+        self._telemetry._finish(self)
+        return False
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Telemetry:
+    """In-process span and metric recorder.
+
+    Args:
+        enabled (bool): Whether anything is recorded.
+        max_spans (int): Finished spans kept for export; older ones are dropped.
+        service_name (str): `service.name` resource attribute of OTLP exports.
+    """
+
+    def __init__(
+        self, enabled: bool = False, max_spans: int = 10000, service_name: str = "knowledge-graph"
+    ) -> None:
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        self._spans: List[Span] = []
+        self._dropped_spans = 0
+        self._counters: Dict[str, Dict[_LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[_LabelKey, _Histogram]] = {}
+        self._server: Any = None
+
+    def configure(self, enabled: bool, max_spans: Optional[int] = None) -> None:
+        self.enabled = enabled
+        if max_spans is not None:
+            self.max_spans = max_spans
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        """Context manager timing `name` as a span (a no-op while disabled)."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add `value` to the counter `name`."""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record `value` in the histogram `name`."""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(DEFAULT_BUCKETS)
+            histogram.observe(value)
+
+    def _finish(self, span: Span) -> None:
+        self.observe(
+            "span_duration_seconds", (span.end_ns - span.start_ns) / 1e9, span=span.name
+        )
+        if span.error is not None:
+            self.increment("span_errors_total", span=span.name)
+        with self._lock:
+            self._spans.append(span)
+            if len(self._spans) > self.max_spans:
+                overflow = len(self._spans) - self.max_spans
+                del self._spans[:overflow]
+                self._dropped_spans += overflow
+
+    def reset(self) -> None:
+        """Discard every recorded span and metric."""
+        with self._lock:
+            self._spans.clear()
+            self._dropped_spans = 0
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_prometheus(self, prefix: str = "kg_") -> str:
+        """Render counters and histograms in the Prometheus text format."""
+
+        def labels_text(key: _LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = key + extra
+            if not pairs:
+                return ""
+            escaped = (
+                (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                for name, value in pairs
+            )
+            return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for key, value in series.items():
+                    lines.append(f"{prefix}{name}{labels_text(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            f"{prefix}{name}_bucket{labels_text(key, (('le', str(bound)),))} {cumulative}"
+                        )
+                    lines.append(
+                        f"{prefix}{name}_bucket{labels_text(key, (('le', '+Inf'),))} {histogram.count}"
+                    )
+                    lines.append(f"{prefix}{name}_sum{labels_text(key)} {histogram.sum}")
+                    lines.append(f"{prefix}{name}_count{labels_text(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_otlp_json(self) -> Dict[str, Any]:
+        """Spans and metrics in the OTLP/JSON layout used by OpenTelemetry collectors."""
+
+        def attributes(values: Dict[str, Any]) -> List[Dict[str, Any]]:
+            converted = []
+            for key, value in values.items():
+                if isinstance(value, bool):
+                    typed = {"boolValue": value}
+                elif isinstance(value, int):
+                    typed = {"intValue": str(value)}
+                elif isinstance(value, float):
+                    typed = {"doubleValue": value}
+                else:
+                    typed = {"stringValue": str(value)}
+                converted.append({"key": key, "value": typed})
+            return converted
+
+        now = str(time.time_ns())
+        resource = {"attributes": attributes({"service.name": self.service_name})}
+        scope = {"name": "kg"}
+        with self._lock:
+            spans = [
+                {
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    **({"parentSpanId": span.parent_span_id} if span.parent_span_id else {}),
+                    "name": span.name,
+                    "kind": 1,
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns),
+                    "attributes": attributes(span.attributes),
+                    "status": (
+                        {"code": 2, "message": span.error} if span.error else {"code": 1}
+                    ),
+                }
+                for span in self._spans
+            ]
+            metrics = [
+                {
+                    "name": name,
+                    "sum": {
+                        "aggregationTemporality": 2,
+                        "isMonotonic": True,
+                        "dataPoints": [
+                            {"attributes": attributes(dict(key)), "asDouble": value, "timeUnixNano": now}
+                            for key, value in series.items()
+                        ],
+                    },
+                }
+                for name, series in sorted(self._counters.items())
+            ]
+            metrics.extend(
+                {
+                    "name": name,
+                    "histogram": {
+                        "aggregationTemporality": 2,
+                        "dataPoints": [
+                            {
+                                "attributes": attributes(dict(key)),
+                                "count": str(histogram.count),
+                                "sum": histogram.sum,
+                                "bucketCounts": [str(count) for count in histogram.counts],
+                                "explicitBounds": list(histogram.buckets),
+                                "timeUnixNano": now,
+                            }
+                            for key, histogram in series.items()
+                        ],
+                    },
+                }
+                for name, series in sorted(self._histograms.items())
+            )
+        return {
+            "resourceSpans": [
+                {"resource": resource, "scopeSpans": [{"scope": scope, "spans": spans}]}
+            ],
+            "resourceMetrics": [
+                {"resource": resource, "scopeMetrics": [{"scope": scope, "metrics": metrics}]}
+            ],
+        }
+
+    def write_otlp_json(self, path: str) -> None:
+        """Write `to_otlp_json()` to `path`."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_otlp_json(), f)
+
+    def serve_prometheus(self, port: int, host: str = "127.0.0.1") -> None:
+        """Serve `to_prometheus()` at http://host:port/metrics from a daemon thread."""
+        if self._server is not None:
+            return
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(
+            target=self._server.serve_forever, name="kg-metrics", daemon=True
+        ).start()
+
+
+telemetry = Telemetry()
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from chunking import TokenChunker, split_sections
+from rate_limiter import estimate_tokens
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def sentences(prefix, count, words=5):
+    return " ".join(
+        f"{prefix}{index} " + " ".join(["word"] * (words - 2)) + " end." for index in range(count)
+    )
+
+
+PAPER = "\n".join(
+    [
+        "Title: ACE2 and Spike binding",
+        "Authors: A. Author, B. Author",
+        "Abstract: ACE2 binds Spike. TMPRSS2 primes Spike.",
+        "Full Text:",
+        sentences("Intro", 6),
+        "",
+        sentences("Methods", 6),
+    ]
+)
+
+
+def test_split_sections_keeps_headers():
+    sections = split_sections("Preamble\nTitle: ACE2\nAbstract: Short.")
+
+    assert sections == [(None, "Preamble"), ("Title", "Title: ACE2"), ("Abstract", "Abstract: Short.")]
+
+
+def test_small_sections_are_packed_and_long_ones_carry_their_header():
+    chunker = TokenChunker(max_tokens=20, overlap_tokens=0, count_tokens=count_words)
+
+    chunks = chunker.split_with_sections(PAPER)
+
+    # Title, authors and abstract fit together and keep the first section name
+    assert chunks[0][1] == "Title"
+    assert chunks[0][0].startswith("Title:") and "Abstract:" in chunks[0][0]
+    assert "Full Text" not in chunks[0][0]
+    # Every chunk of the long section is attributed to it, not only the first
+    full_text = chunks[1:]
+    assert len(full_text) > 1
+    assert {section for _, section in full_text} == {"Full Text"}
+    assert full_text[0][0].startswith("Full Text:")
+
+
+def test_consecutive_chunks_overlap_by_trailing_sentences():
+    chunker = TokenChunker(max_tokens=20, overlap_tokens=6, count_tokens=count_words)
+    text = "Full Text:\n" + sentences("S", 12)
+
+    chunks = chunker.split_text(text)
+
+    assert len(chunks) > 2
+    for previous, following in zip(chunks, chunks[1:]):
+        last_sentence = previous.rsplit(". ", 1)[-1]
+        assert following.startswith(last_sentence)
+        # Only whole sentences within the overlap budget are repeated
+        assert count_words(last_sentence) <= 6
+
+
+def test_overlap_does_not_cross_sections():
+    chunker = TokenChunker(max_tokens=20, overlap_tokens=6, count_tokens=count_words)
+
+    chunks = chunker.split_with_sections(PAPER)
+
+    assert not any("Abstract" in chunk for chunk, section in chunks if section == "Full Text")
+
+
+def test_zero_overlap_repeats_nothing():
+    chunker = TokenChunker(max_tokens=20, overlap_tokens=0, count_tokens=count_words)
+    text = sentences("S", 12)
+
+    chunks = chunker.split_text(text)
+
+    assert " ".join(chunks).split() == text.split()
+
+
+@pytest.mark.parametrize("max_tokens", [8, 25, 100])
+def test_no_chunk_exceeds_the_budget(max_tokens):
+    rng = random.Random(max_tokens)
+    vocabulary = ["ACE2", "binds", "the", "Spike", "protein", "in", "lung", "cells"]
+    paragraphs = []
+    for _ in range(30):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 200))]
+        # Sentences of random length, some without any sentence end
+        text = " ".join(word + ("." if rng.random() < 0.1 else "") for word in words)
+        paragraphs.append(text)
+    # A sequence longer than the budget on its own has to be cut as well
+    paragraphs.append("Sequence: " + "ACGT" * 400 + ".")
+    text = "Title: Test\nAbstract: " + "\n\n".join(paragraphs[:3]) + "\nFull Text:\n" + "\n\n".join(paragraphs[3:])
+
+    for overlap_tokens in (max_tokens // 4, 0):
+        chunker = TokenChunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+        chunks = chunker.split_text(text)
+        assert all(estimate_tokens(chunk) <= max_tokens for chunk in chunks)
+
+    # Without overlap, nothing but whitespace is lost or repeated at the cut points
+    assert "".join("".join(chunk.split()) for chunk in chunks) == "".join(text.split())
+
+
+def test_invalid_budgets():
+    with pytest.raises(ValueError):
+        TokenChunker(max_tokens=0)
+    with pytest.raises(ValueError):
+        TokenChunker(max_tokens=10, overlap_tokens=10)
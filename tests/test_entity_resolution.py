@@ -0,0 +1,87 @@
+import pytest
+from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
+from langchain_core.documents import Document
+
+from entity_resolution import EntityIndex, cluster_ids, resolve_entities
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ("Angiotensin-Converting Enzyme 1", "Angiotensin-Converting Enzyme 2"),
+        ("ACE1 receptor", "ACE2 receptor"),
+        ("Interleukin-6", "Interleukin-8"),
+        ("IL-6 signaling", "IL-8 signaling"),
+        ("CD4 T cells", "CD8 T cells"),
+        ("TLR4 signaling", "TLR7 signaling"),
+        ("Toll-like receptor 4", "Toll-like receptor 7"),
+        ("Type I interferon", "Type II interferon"),
+        ("Hepatitis B virus", "Hepatitis C virus"),
+    ],
+)
+def test_fuzzy_matching_keeps_numbered_variants_apart(first, second):
+    assert cluster_ids([first, second]) == []
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ("Tumor necrosis factor alpha", "Tumour necrosis factor alpha"),
+        ("Interferon gamma response", "Interferon-gamma responses"),
+        ("Angiotensin-Converting Enzyme 2", "Angiotensin-converting-enzyme 2"),
+    ],
+)
+def test_fuzzy_matching_merges_spelling_variants(first, second):
+    assert cluster_ids([first, second]) == [[first, second]]
+
+
+def test_exact_and_acronym_keys():
+    ids = ["Ace2 Receptor", "ACE2 receptors", "Angiotensin-Converting Enzyme 2 (ACE2)", "ACE2"]
+    assert cluster_ids(ids) == [ids[:2], ids[2:]]
+
+
+def test_resolve_entities_keeps_distinct_genes():
+    ace1 = Node(id="Angiotensin-Converting Enzyme 1", type="Human_gene")
+    ace2 = Node(id="Angiotensin-Converting Enzyme 2", type="Human_gene")
+    covid = Node(id="Covid-19", type="Pathology")
+    document = GraphDocument(
+        nodes=[ace1, ace2, covid],
+        relationships=[
+            Relationship(source=ace1, target=covid, type="IS_RISK_FACTOR_FOR"),
+            Relationship(source=ace2, target=covid, type="IS_RISK_FACTOR_FOR"),
+        ],
+        source=Document(page_content="ACE1 and ACE2 in Covid-19"),
+    )
+
+    (resolved,), mapping = resolve_entities([document])
+
+    assert mapping == {}
+    assert {node.id for node in resolved.nodes} == {ace1.id, ace2.id, covid.id}
+    assert len(resolved.relationships) == 2
+
+
+def test_shared_index_gives_the_same_clusters():
+    ids = ["Ace2 Receptor", "ACE2 receptors", "Angiotensin-Converting Enzyme 2 (ACE2)", "ACE2", "ACE1"]
+    index = EntityIndex()
+    # Ids indexed ahead of resolution, e.g. while responses stream in
+    for entity_id in ids[:3]:
+        index.add(entity_id)
+
+    assert cluster_ids(ids, index=index) == cluster_ids(ids)
+    assert len(index) == len(ids)
+    assert index.add("ACE2") is index.add("ACE2")
+
+
+def test_index_is_reused_across_batches():
+    def batch(*ids):
+        nodes = [Node(id=entity_id, type="Human_gene") for entity_id in ids]
+        return [GraphDocument(nodes=nodes, relationships=[], source=Document(page_content=" ".join(ids)))]
+
+    index = EntityIndex()
+    known = {"Human_gene": {"Ace2 Receptor"}}
+
+    _, mapping = resolve_entities(batch("ACE2 receptors"), known_ids=known, index=index)
+    _, unindexed = resolve_entities(batch("ACE2 receptors"), known_ids=known)
+
+    assert mapping == unindexed == {("Human_gene", "ACE2 receptors"): "Ace2 Receptor"}
+    assert len(index) == 2
@@ -0,0 +1,104 @@
+import pytest
+from langchain_community.graphs.graph_document import Node, Relationship
+from langchain_core.documents import Document
+
+import extraction_cache
+from extraction_cache import ExtractionCache, fingerprint
+from llm_backends import FakeGraphChatModel
+from llm_graph_transformer import LLMGraphTransformer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # Distinct access times, so the LRU order does not depend on timer resolution
+    monkeypatch.setattr(extraction_cache, "time", FakeClock())
+    cache = ExtractionCache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+def graph(index):
+    gene = Node(id=f"Gene {index}", type="Gene")
+    disease = Node(id="Covid-19", type="Disease", properties={"icd": "U07.1"})
+    # Relationship endpoints are stored without properties
+    target = Node(id="Covid-19", type="Disease")
+    return [gene, disease], [Relationship(source=gene, target=target, type="ASSOCIATED_WITH")]
+
+
+def test_hits_and_misses_are_counted(cache):
+    key = ExtractionCache.make_key("chunk text", "context")
+    assert cache.get(key) is None
+
+    nodes, relationships = graph(1)
+    cache.set(key, nodes, relationships)
+
+    assert cache.get(key) == (nodes, relationships)
+    assert cache.get(ExtractionCache.make_key("other text", "context")) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+    cache.clear()
+    assert cache.stats() == {
+        "hits": 0, "misses": 0, "hit_rate": 0.0, "evictions": 0, "entries": 0, "size_bytes": 0
+    }
+
+
+def test_eviction_drops_least_recently_used_entries_below_ninety_percent(cache):
+    keys = [ExtractionCache.make_key(f"chunk {index}", "context") for index in range(10)]
+    cache.set(keys[0], *graph(0))
+    entry_size = cache.stats()["size_bytes"]
+    # Room for ten entries; "chunk 10" is one byte larger than the others
+    cache.max_size_bytes = entry_size * 10 + 10
+
+    for index, key in enumerate(keys[1:], start=1):
+        cache.set(key, *graph(index))
+    # Touch the oldest entry, so the second oldest is evicted first
+    assert cache.get(keys[0]) is not None
+    cache.set(ExtractionCache.make_key("chunk 10", "context"), *graph(10))
+
+    stats = cache.stats()
+    assert stats["size_bytes"] <= cache.max_size_bytes * 0.9
+    assert stats["evictions"] == 2
+    assert stats["entries"] == 9
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is None
+    assert cache.get(keys[3]) is not None
+
+
+def test_fingerprint_is_stable_and_order_sensitive():
+    assert fingerprint("prompt", ["Gene"], None) == fingerprint("prompt", ["Gene"], None)
+    assert fingerprint("a", "b") != fingerprint("b", "a")
+    assert fingerprint("ab") != fingerprint("a", "b")
+
+
+def test_extraction_context_change_invalidates_keys(cache):
+    document = Document(page_content="ACE2 is associated with Covid-19")
+
+    def transformer(**kwargs):
+        return LLMGraphTransformer(llm=FakeGraphChatModel(), cache=cache, **kwargs)
+
+    transformer(allowed_nodes=["Gene"]).process_response(document)
+    assert cache.stats()["misses"] == 1
+    # Same prompt and schema: served from the cache
+    transformer(allowed_nodes=["Gene"]).process_response(document)
+    assert cache.stats()["hits"] == 1
+
+    # Any change to the schema, prompt or model configuration is a new key
+    transformer(allowed_nodes=["Gene", "Disease"]).process_response(document)
+    transformer(allowed_nodes=["Gene"], additional_instructions="Only genes.").process_response(document)
+    LLMGraphTransformer(
+        llm=FakeGraphChatModel(seed=1), cache=cache, allowed_nodes=["Gene"]
+    ).process_response(document)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 4, 4)
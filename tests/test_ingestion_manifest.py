@@ -0,0 +1,74 @@
+import pytest
+
+from ingestion_manifest import IngestionManifest, chunk_hash
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / "manifest.sqlite"))
+    yield manifest
+    manifest.close()
+
+
+def hashes(*chunks):
+    return [chunk_hash(chunk) for chunk in chunks]
+
+
+def ingest(manifest, document, chunks):
+    added, removed = manifest.diff(document, hashes(*chunks))
+    manifest.record(document, added, removed)
+    return added, removed
+
+
+def test_unchanged_document_has_nothing_to_extract(manifest):
+    chunks = ["BRCA1 binds BARD1.", "TP53 regulates MDM2."]
+    assert ingest(manifest, "paper.txt", chunks) == (hashes(*chunks), [])
+
+    assert manifest.diff("paper.txt", hashes(*chunks)) == ([], [])
+
+
+def test_edited_document_extracts_only_changed_chunks(manifest):
+    ingest(manifest, "paper.txt", ["BRCA1 binds BARD1.", "TP53 regulates MDM2."])
+
+    added, removed = ingest(
+        manifest, "paper.txt", ["BRCA1 binds BARD1.", "TP53 inhibits MDM2."]
+    )
+
+    assert added == hashes("TP53 inhibits MDM2.")
+    assert removed == hashes("TP53 regulates MDM2.")
+    assert manifest.chunk_hashes("paper.txt") == set(
+        hashes("BRCA1 binds BARD1.", "TP53 inhibits MDM2.")
+    )
+
+
+def test_removed_document_is_forgotten(manifest):
+    ingest(manifest, "paper.txt", ["BRCA1 binds BARD1."])
+    ingest(manifest, "other.txt", ["BRCA1 binds BARD1."])
+
+    manifest.forget("paper.txt")
+
+    assert manifest.chunk_hashes("paper.txt") == set()
+    # The same chunk in another document is tracked separately
+    assert manifest.chunk_hashes("other.txt") == set(hashes("BRCA1 binds BARD1."))
+    assert manifest.diff("paper.txt", hashes("BRCA1 binds BARD1.")) == (
+        hashes("BRCA1 binds BARD1."), []
+    )
+
+
+def test_diff_deduplicates_and_keeps_chunk_order(manifest):
+    current = hashes("b", "a", "b", "c")
+
+    assert manifest.diff("paper.txt", current) == (hashes("b", "a", "c"), [])
+
+
+def test_manifest_persists_across_instances(tmp_path):
+    path = str(tmp_path / "manifest.sqlite")
+    first = IngestionManifest(path)
+    ingest(first, "paper.txt", ["BRCA1 binds BARD1."])
+    first.close()
+
+    second = IngestionManifest(path)
+    try:
+        assert second.diff("paper.txt", hashes("BRCA1 binds BARD1.")) == ([], [])
+    finally:
+        second.close()
@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+from json_stream import JSONObjectStream
+
+RELATIONS = [
+    {"head": "Ace2", "relation": "BINDS", "tail": "Spike"},
+    {"head": "Tmprss2", "relation": "PRIMES", "tail": "Spike"},
+]
+
+
+def feed_all(stream, pieces):
+    completed = []
+    for piece in pieces:
+        completed.extend(stream.feed(piece))
+    return completed
+
+
+def pieces_of(text, size):
+    return [text[index : index + size] for index in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_objects_are_returned_regardless_of_token_boundaries(size):
+    text = json.dumps(RELATIONS)
+    stream = JSONObjectStream()
+
+    completed = feed_all(stream, pieces_of(text, size))
+
+    assert [json.loads(obj) for _, obj in completed] == RELATIONS
+    assert {key for key, _ in completed} == {None}
+    assert stream.finished
+
+
+def test_each_object_is_returned_as_soon_as_it_closes():
+    text = json.dumps(RELATIONS)
+    first_end = text.index("}") + 1
+    stream = JSONObjectStream()
+
+    assert stream.feed(text[: first_end - 1]) == []
+    assert [json.loads(obj) for _, obj in stream.feed(text[first_end - 1 : first_end])] == RELATIONS[:1]
+    assert not stream.finished
+
+
+@pytest.mark.parametrize("size", [1, 2, 5])
+def test_escapes_and_brackets_inside_strings(size):
+    relations = [
+        {"head": 'The "ACE2" {receptor}', "relation": "BINDS", "tail": "Spike [S1]"},
+        {"head": "C:\\\\path\\", "relation": "ENDS_WITH_BACKSLASH\\", "tail": "}]"},
+        {"head": "Unicode \\u00e9 \u00e9", "relation": "HAS", "tail": "Tab\there"},
+    ]
+    text = json.dumps(relations)
+    stream = JSONObjectStream()
+
+    completed = feed_all(stream, pieces_of(text, size))
+
+    assert [json.loads(obj) for _, obj in completed] == relations
+    assert stream.finished
+
+
+def test_escape_split_from_its_character():
+    stream = JSONObjectStream()
+    # The backslash arrives alone, the escaped quote must not close the string
+    completed = feed_all(stream, ['[{"head": "a\\', '"}"', ', "tail": "b"}]'])
+
+    assert [json.loads(obj) for _, obj in completed] == [{"head": 'a"}', "tail": "b"}]
+
+
+def test_nested_arrays_and_objects_stay_inside_their_object():
+    relations = [
+        {"head": "Ace2", "properties": [{"key": "organ", "value": ["lung", "gut"]}], "tail": {"id": "Spike"}},
+        {"head": "Tmprss2", "properties": [], "tail": {"id": "Spike", "aliases": [[1, 2], []]}},
+    ]
+    stream = JSONObjectStream()
+
+    completed = feed_all(stream, pieces_of(json.dumps(relations), 4))
+
+    assert [json.loads(obj) for _, obj in completed] == relations
+
+
+def test_array_keys_select_arrays_of_the_top_level_object():
+    graph = {
+        "nodes": [{"id": "Ace2", "type": "Gene", "properties": [{"key": "a", "value": "b"}]}],
+        "metadata": [{"ignored": True}],
+        "relationships": [
+            {"source_node_id": "Ace2", "target_node_id": "Spike", "type": "BINDS"},
+        ],
+        "nested": {"nodes": [{"id": "too deep"}]},
+    }
+    stream = JSONObjectStream({"nodes", "relationships"})
+
+    completed = feed_all(stream, pieces_of(json.dumps(graph), 3))
+
+    assert [(key, json.loads(obj)) for key, obj in completed] == [
+        ("nodes", graph["nodes"][0]),
+        ("relationships", graph["relationships"][0]),
+    ]
+    assert stream.finished
+
+
+def test_text_around_the_value_is_ignored():
+    stream = JSONObjectStream()
+    text = "Sure, here it is:\n```json\n" + json.dumps(RELATIONS) + "\n```\nAnything [else]"
+
+    completed = feed_all(stream, pieces_of(text, 5))
+
+    assert [json.loads(obj) for _, obj in completed] == RELATIONS
+    assert stream.finished
+    assert stream.feed('[{"head": "late"}]') == []
+
+
+def test_truncated_response_is_not_finished():
+    stream = JSONObjectStream()
+    text = json.dumps(RELATIONS)
+
+    completed = stream.feed(text[: text.rindex("{") + 5])
+
+    assert [json.loads(obj) for _, obj in completed] == RELATIONS[:1]
+    assert not stream.finished
+
+
+def test_completed_text_is_discarded():
+    stream = JSONObjectStream()
+    stream.feed("[" + ", ".join(json.dumps(RELATIONS[0]) for _ in range(1000)))
+
+    # Only the unfinished tail is buffered, not the thousand completed objects
+    assert len(stream._text) < len(json.dumps(RELATIONS[0]))
@@ -0,0 +1,380 @@
+import asyncio
+import functools
+import json
+
+import json_repair
+import pytest
+from langchain_community.graphs.graph_document import GraphDocument
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from pydantic import SecretStr
+
+import llm_graph_transformer
+from llm_backends import FakeGraphChatModel
+from llm_graph_transformer import LLMGraphTransformer
+from telemetry import telemetry
+
+
+class DroppingChunksModel(FakeGraphChatModel):
+    """Omits chunk 1 from packed tool calls and every chunk index from JSON replies."""
+
+    def _respond(self, messages, tools):
+        result = super()._respond(messages, tools)
+        message = result.generations[0].message
+        if message.tool_calls:
+            args = message.tool_calls[0]["args"]
+            if "graphs" in args:
+                args["graphs"] = [graph for graph in args["graphs"] if graph["chunk"] != 1]
+        else:
+            relations = json.loads(message.content)
+            message.content = json.dumps(
+                [{key: value for key, value in rel.items() if key != "chunk"} for rel in relations]
+            )
+        return result
+
+
+class JSONOnlyModel(DroppingChunksModel):
+    def with_structured_output(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def extract(llm, documents, pack_size):
+    transformer = LLMGraphTransformer(llm=llm, pack_size=pack_size)
+    return asyncio.run(transformer.aconvert_to_graph_documents(documents))
+
+
+def documents(count):
+    return [Document(page_content=f"Chunk {index} about gene {index}") for index in range(count)]
+
+
+def test_chunks_missing_from_packed_response_are_extracted_alone():
+    # Tool calls lose the second chunk of each pack, JSON replies every chunk
+    for model, missing in ((DroppingChunksModel, [1, 4]), (JSONOnlyModel, range(6))):
+        docs = documents(6)
+        alone = extract(model(), docs, pack_size=1)
+
+        packed = extract(model(), docs, pack_size=3)
+
+        assert [doc.source for doc in packed] == docs
+        assert all(doc.relationships for doc in packed)
+        for index in missing:
+            assert packed[index].relationships == alone[index].relationships
+
+
+class KeyedModel(FakeGraphChatModel):
+    api_key: SecretStr = SecretStr("tenant-a")
+
+
+def test_structured_output_is_shared_between_equally_configured_llms():
+    llm_graph_transformer._runnable_cache.clear()
+    first = LLMGraphTransformer(llm=KeyedModel(), allowed_nodes=["Gene"])
+    second = LLMGraphTransformer(llm=KeyedModel(), allowed_nodes=["Gene"])
+    other_key = LLMGraphTransformer(llm=KeyedModel(api_key="tenant-b"), allowed_nodes=["Gene"])
+    other_model = LLMGraphTransformer(llm=KeyedModel(seed=1), allowed_nodes=["Gene"])
+
+    assert second.chain.last is first.chain.last
+    # Runnables wrap the LLM client, they are never shared across credentials
+    assert other_key.chain.last is not first.chain.last
+    assert other_model.chain.last is not first.chain.last
+    # Plain and packed runnable per configuration
+    assert len(llm_graph_transformer._runnable_cache) == 6
+
+
+RELATION = json.dumps(
+    [{"head": "Ace2", "head_type": "Gene", "relation": "BINDS", "tail": "Spike", "tail_type": "Protein"}]
+)
+
+
+@pytest.mark.parametrize("response", ["null", "42", "true", '"no relations"', "[]", "{}"])
+def test_well_formed_non_list_response_has_no_relations(response):
+    transformer = LLMGraphTransformer(llm=FakeListChatModel(responses=[response]))
+    assert not transformer._function_call
+
+    graph_document = transformer.process_response(documents(1)[0])
+
+    assert graph_document.nodes == []
+    assert graph_document.relationships == []
+
+
+def test_one_non_list_response_does_not_abort_the_batch():
+    llm = FakeListChatModel(responses=[RELATION, "null", RELATION, "42"])
+    transformer = LLMGraphTransformer(llm=llm, max_concurrency=1)
+
+    graph_documents = transformer.convert_to_graph_documents(documents(4))
+
+    assert [len(doc.relationships) for doc in graph_documents] == [1, 0, 1, 0]
+
+
+class ScriptedTransformer(LLMGraphTransformer):
+    """Replaces the LLM round trip with per-document delays and failures."""
+
+    def __init__(self, delays=None, failures=None, **kwargs):
+        super().__init__(llm=FakeGraphChatModel(), **kwargs)
+        self.delays = delays or {}
+        self.failures = dict(failures or {})
+        self.attempts = []
+        self.cancelled = []
+
+    async def _safe_aprocess_response(self, document, config=None, on_relationship=None):
+        index = int(document.page_content.split()[1])
+        self.attempts.append(index)
+        try:
+            await asyncio.sleep(self.delays.get(index, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        if self.failures.get(index, 0):
+            self.failures[index] -= 1
+            raise RuntimeError(f"chunk {index} failed")
+        return GraphDocument(nodes=[], relationships=[], source=document)
+
+
+def test_failed_documents_are_requeued_until_they_succeed():
+    transformer = ScriptedTransformer(failures={1: 2})
+
+    graph_documents = asyncio.run(
+        transformer._aconvert_to_graph_documents_with_retry(documents(3), base_delay=0)
+    )
+
+    assert [doc.source.page_content for doc in graph_documents] == [
+        doc.page_content for doc in documents(3)
+    ]
+    assert transformer.attempts.count(1) == 3
+
+
+def test_documents_failing_every_attempt_are_skipped():
+    transformer = ScriptedTransformer(failures={1: 10})
+
+    graph_documents = asyncio.run(
+        transformer._aconvert_to_graph_documents_with_retry(
+            documents(3), max_retries=2, base_delay=0
+        )
+    )
+
+    assert [doc.source.page_content for doc in graph_documents] == ["Chunk 0 about gene 0", "Chunk 2 about gene 2"]
+    assert transformer.attempts.count(1) == 3
+
+
+def test_retry_backoff_does_not_block_a_worker():
+    # With one worker, document 1 waits out its backoff while 2 and 3 are processed
+    transformer = ScriptedTransformer(failures={0: 1}, max_concurrency=1)
+
+    async def run():
+        return [
+            index
+            async for index, _ in transformer.aiter_graph_documents(documents(3), base_delay=0.05)
+        ]
+
+    assert asyncio.run(run()) == [1, 2, 0]
+    assert transformer.attempts == [0, 1, 2, 0]
+
+
+def test_results_keep_document_order_despite_completion_order():
+    # Earlier documents take longer, so they complete last
+    transformer = ScriptedTransformer(delays={0: 0.03, 1: 0.02, 2: 0.01})
+
+    async def run():
+        completion = [index async for index, _ in transformer.aiter_graph_documents(documents(4))]
+        ordered = await transformer._aconvert_to_graph_documents_with_retry(documents(4))
+        return completion, ordered
+
+    completion, ordered = asyncio.run(run())
+
+    assert completion == [3, 2, 1, 0]
+    assert [doc.source.page_content for doc in ordered] == [
+        doc.page_content for doc in documents(4)
+    ]
+
+
+def test_stopping_iteration_cancels_workers_and_pending_retries():
+    # Document 0 fails and waits for its retry, 1 completes, 2 is still running
+    transformer = ScriptedTransformer(
+        delays={1: 0.01, 2: 10}, failures={0: 1}, max_concurrency=2
+    )
+
+    async def run():
+        iterator = transformer.aiter_graph_documents(documents(3), base_delay=10)
+        first = await iterator.__anext__()
+        # Closing the generator runs its cleanup, as breaking out of `async for` would
+        await iterator.aclose()
+        pool = [
+            task for task in asyncio.all_tasks()
+            if task.get_coro().__name__ in ("worker", "requeue_after")
+        ]
+        return first, pool
+
+    first, pool = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert first[0] == 1
+    assert transformer.cancelled == [2]
+    assert transformer.attempts == [0, 1, 2]
+    # No worker or retry timer outlives the iterator
+    assert pool == []
+
+
+def test_cancelling_the_consumer_cancels_in_flight_documents():
+    transformer = ScriptedTransformer(delays={0: 10, 1: 10})
+
+    async def run():
+        task = asyncio.create_task(
+            transformer._aconvert_to_graph_documents_with_retry(documents(2))
+        )
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert sorted(transformer.cancelled) == [0, 1]
+
+
+def test_packs_stay_within_the_token_budget():
+    transformer = LLMGraphTransformer(llm=FakeGraphChatModel(), pack_size=4, pack_token_budget=100)
+    sizes = [30, 30, 30, 30, 90, 20, 200, 10]
+    docs = [Document(page_content="x" * (4 * (size - 1))) for size in sizes]
+
+    packs = transformer._plan_packs(docs)
+
+    assert packs == [(0, 1, 2), (3,), (4,), (5,), (6,), (7,)]
+    # Only a document over the budget on its own is sent alone beyond it
+    for pack in packs:
+        assert len(pack) == 1 or sum(sizes[index] for index in pack) <= 100
+
+
+@pytest.fixture
+def parse_tiers():
+    telemetry.reset()
+    telemetry.configure(True)
+
+    def tiers():
+        return {dict(key)["tier"]: count for key, count in telemetry._counters["json_parse_total"].items()}
+
+    yield tiers
+    telemetry.configure(False)
+    telemetry.reset()
+
+
+REPAIR = functools.partial(json_repair.loads, skip_json_loads=True)
+PARSED = [{"head": "Ace2", "relation": "BINDS"}]
+
+
+@pytest.mark.parametrize(
+    "text, tier",
+    [
+        ('[{"head": "Ace2", "relation": "BINDS"}]', "strict"),
+        ('```json\n[{"head": "Ace2", "relation": "BINDS"}]\n```', "fenced"),
+        ('```\n[{"head": "Ace2", "relation": "BINDS"}]\n```', "fenced"),
+        # Single quotes, a trailing comma and a missing bracket
+        ("[{'head': 'Ace2', 'relation': 'BINDS',}", "repair"),
+        ('```json\n[{"head": "Ace2", "relation": "BINDS",}]\n```', "repair"),
+        ('Relations: [{"head": "Ace2", "relation": "BINDS"}]', "repair"),
+    ],
+)
+def test_json_is_parsed_by_the_cheapest_tier(parse_tiers, text, tier):
+    assert llm_graph_transformer._loads_json(text, REPAIR) == PARSED
+    assert parse_tiers() == {tier: 1}
+
+
+def test_malformed_json_fails_without_the_repair_tier(parse_tiers):
+    with pytest.raises(ValueError):
+        llm_graph_transformer._loads_json("[{'head': 'Ace2', 'relation': 'BINDS',}")
+
+    assert parse_tiers() == {"failed": 1}
+
+
+def test_prompt_mode_recovers_relations_from_malformed_json(parse_tiers):
+    malformed = "```json\n[{'head': 'Ace2', 'head_type': 'Gene', 'relation': 'BINDS', 'tail': 'Spike', 'tail_type': 'Protein'},]\n```"
+    transformer = LLMGraphTransformer(llm=FakeListChatModel(responses=[malformed]))
+
+    graph_document = transformer.process_response(documents(1)[0])
+
+    assert [(rel.source.id, rel.type, rel.target.id) for rel in graph_document.relationships] == [
+        ("Ace2", "BINDS", "Spike")
+    ]
+    assert parse_tiers() == {"repair": 1}
+
+
+def stream_extract(transformer, docs):
+    delivered = {}
+
+    async def run():
+        results = {}
+        async for index, graph_document in transformer.aiter_graph_documents(
+            docs, on_relationship=lambda index, rel: delivered.setdefault(index, []).append(rel)
+        ):
+            results[index] = graph_document
+        return [results[index] for index in range(len(docs))]
+
+    return asyncio.run(run()), delivered
+
+
+def triples(relationships):
+    return [(rel.source.id, rel.source.type, rel.type, rel.target.id, rel.target.type) for rel in relationships]
+
+
+@pytest.mark.parametrize("ignore_tool_usage", [False, True])
+def test_streamed_relationships_are_reused_instead_of_parsed_again(monkeypatch, ignore_tool_usage):
+    docs = documents(3)
+    expected = LLMGraphTransformer(
+        llm=FakeGraphChatModel(), ignore_tool_usage=ignore_tool_usage
+    ).convert_to_graph_documents(docs)
+    transformer = LLMGraphTransformer(
+        llm=FakeGraphChatModel(), ignore_tool_usage=ignore_tool_usage, streaming=True
+    )
+
+    def parse_again(raw_schema):
+        raise AssertionError("the streamed response was parsed again")
+
+    monkeypatch.setattr(transformer, "_parse_response", parse_again)
+
+    streamed, delivered = stream_extract(transformer, docs)
+
+    for index, (graph_document, reference) in enumerate(zip(streamed, expected)):
+        assert triples(graph_document.relationships) == triples(reference.relationships)
+        assert sorted(n.id for n in graph_document.nodes) == sorted(n.id for n in reference.nodes)
+        assert triples(delivered[index]) == triples(reference.relationships)
+
+
+class LateNodesModel(FakeGraphChatModel):
+    """Lists relationships without endpoint types before the nodes."""
+
+    def _respond(self, messages, tools):
+        result = super()._respond(messages, tools)
+        tool_call = result.generations[0].message.tool_calls[0]
+        args = tool_call["args"]
+        tool_call["args"] = {
+            "relationships": [
+                {key: value for key, value in rel.items() if not key.endswith("_node_type")}
+                for rel in args["relationships"]
+            ],
+            "nodes": args["nodes"],
+        }
+        return result
+
+
+def test_streamed_relationships_wait_for_the_types_of_later_nodes():
+    docs = documents(2)
+    expected = LLMGraphTransformer(llm=LateNodesModel()).convert_to_graph_documents(docs)
+
+    streamed, delivered = stream_extract(
+        LLMGraphTransformer(llm=LateNodesModel(), streaming=True), docs
+    )
+
+    for index, (graph_document, reference) in enumerate(zip(streamed, expected)):
+        assert reference.relationships
+        assert triples(graph_document.relationships) == triples(reference.relationships)
+        # Delivered once the response is complete, with the types of the nodes
+        assert triples(delivered[index]) == triples(reference.relationships)
+        assert "Node" not in {rel.source.type for rel in delivered[index]}
+
+
+def test_malformed_stream_falls_back_to_the_repair_tier(parse_tiers):
+    malformed = "[{'head': 'Ace2', 'head_type': 'Gene', 'relation': 'BINDS', 'tail': 'Spike', 'tail_type': 'Protein'},]"
+    transformer = LLMGraphTransformer(llm=FakeListChatModel(responses=[malformed]), streaming=True)
+
+    graph_document = asyncio.run(transformer.aprocess_response(documents(1)[0]))
+
+    assert triples(graph_document.relationships) == [("Ace2", "Gene", "BINDS", "Spike", "Protein")]
+    assert parse_tiers() == {"repair": 1}
+    assert telemetry._counters["streamed_responses_reparsed_total"] == {(): 1}
@@ -0,0 +1,142 @@
+import pytest
+
+from neo4j_reader import GraphReader
+
+
+class FakeGraph:
+    """In-memory stand-in for Neo4jGraph answering the reader's queries."""
+
+    def __init__(self, nodes, relationships):
+        # nodes: internal id -> chunks, relationships: (internal id, source, target)
+        self.nodes = nodes
+        self.relationships = relationships
+        self.queries = []
+
+    def _node(self, internal_id):
+        return {
+            "internal_id": internal_id,
+            "id": f"Node {internal_id}",
+            "type": "Gene",
+            "source_document": "paper.txt",
+        }
+
+    def _visible(self, chunks, element_chunks):
+        return chunks is None or any(c in chunks for c in element_chunks)
+
+    def degree(self, internal_id):
+        return sum(internal_id in (s, t) for _, s, t in self.relationships)
+
+    def query(self, cypher, params):
+        self.queries.append((cypher, params))
+        chunks = params.get("chunks")
+        nodes = [n for n, c in sorted(self.nodes.items()) if self._visible(chunks, c)]
+        relationships = [
+            (r, s, t) for r, s, t in sorted(self.relationships)
+            if self._visible(chunks, self.nodes[s])
+        ]
+        if "count(n)" in cypher:
+            return [{"count": len(nodes)}]
+        if "count(r)" in cypher:
+            return [{"count": len(relationships)}]
+        if "COUNT {" in cypher:
+            ranked = sorted(nodes, key=lambda n: (-self.degree(n), n))[: params["limit"]]
+            return [dict(self._node(n), degree=self.degree(n)) for n in ranked]
+        if "id(n) > $after" in cypher:
+            page = [n for n in nodes if n > params["after"]][: params["limit"]]
+            return [self._node(n) for n in page]
+        if "id(r) > $after" in cypher:
+            page = [r for r in relationships if r[0] > params["after"]][: params["limit"]]
+            return [
+                {"internal_id": r, "source": s, "target": t, "type": "RELATES_TO"}
+                for r, s, t in page
+            ]
+        if "id(a) IN $sources" in cypher:
+            rows = [
+                {"source": s, "target": t, "type": "RELATES_TO"}
+                for _, s, t in relationships
+                if s in params["sources"] and t in params["ids"]
+            ]
+            return rows[: params["limit"]] if "limit" in params else rows
+        raise AssertionError(f"unexpected query: {cypher}")
+
+
+def star_graph():
+    # Node 1 is the hub, nodes 2-3 are also connected, 4-9 are leaves of the hub
+    nodes = {n: ["doc:a"] if n < 6 else ["doc:b"] for n in range(1, 10)}
+    relationships = [(100 + n, 1, n) for n in range(2, 10)] + [(200, 2, 3)]
+    return FakeGraph(nodes, relationships)
+
+
+def test_iter_nodes_pages_by_internal_id():
+    graph = star_graph()
+    reader = GraphReader(graph, page_size=4)
+
+    nodes = list(reader.iter_nodes())
+
+    assert [n["internal_id"] for n in nodes] == list(range(1, 10))
+    afters = [params["after"] for _, params in graph.queries]
+    # Each page resumes after the last id of the previous one, the short page ends it
+    assert afters == [-1, 4, 8]
+
+
+def test_iter_nodes_stops_at_limit():
+    graph = star_graph()
+    reader = GraphReader(graph, page_size=4)
+
+    nodes = list(reader.iter_nodes(limit=6))
+
+    assert [n["internal_id"] for n in nodes] == list(range(1, 7))
+    assert [params["limit"] for _, params in graph.queries] == [4, 2]
+
+
+def test_iter_relationships_pages_with_chunk_filter():
+    graph = star_graph()
+    reader = GraphReader(graph, page_size=2)
+
+    relationships = list(reader.iter_relationships(chunks=["doc:a"]))
+
+    assert [r["internal_id"] for r in relationships] == [102, 103, 104, 105, 106, 107, 108, 109, 200]
+    assert all(params["chunks"] == ["doc:a"] for _, params in graph.queries)
+    assert all("$chunks" in cypher for cypher, _ in graph.queries)
+
+
+def test_load_samples_top_degree_nodes_over_budget():
+    graph = star_graph()
+    reader = GraphReader(graph)
+
+    result = reader.load(node_budget=3)
+
+    assert result["sampled"]
+    assert result["total_nodes"] == 9
+    assert [n["internal_id"] for n in result["nodes"]] == [1, 2, 3]
+    assert sorted((r["source"], r["target"]) for r in result["relationships"]) == [
+        (1, 2), (1, 3), (2, 3)
+    ]
+
+
+def test_load_within_budget_reads_everything():
+    graph = star_graph()
+    reader = GraphReader(graph, page_size=2)
+
+    result = reader.load(node_budget=100, edge_budget=5)
+
+    assert len(result["nodes"]) == 9
+    assert len(result["relationships"]) == 5
+    # Only the edge budget was exceeded
+    assert result["total_relationships"] == 9
+    assert result["sampled"]
+    assert not any("COUNT {" in cypher for cypher, _ in graph.queries)
+
+
+def test_relationships_between_respects_limit_across_pages():
+    graph = star_graph()
+    reader = GraphReader(graph, page_size=2)
+
+    rows = list(reader.iter_relationships_between([1, 2, 3, 4], limit=3))
+
+    assert len(rows) == 3
+
+
+def test_invalid_page_size():
+    with pytest.raises(ValueError):
+        GraphReader(star_graph(), page_size=0)
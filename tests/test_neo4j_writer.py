@@ -0,0 +1,132 @@
+from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
+from langchain_core.documents import Document
+
+from neo4j_writer import Neo4jBatchWriter
+
+
+class FakeResult:
+    def consume(self):
+        return None
+
+
+class FakeTransaction:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def run(self, query, **params):
+        self.calls.append((query, params))
+        return FakeResult()
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute_write(self, work, *args):
+        self.driver.transactions += 1
+        return work(FakeTransaction(self.driver.calls), *args)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.calls = []
+        self.transactions = 0
+        self.databases = []
+
+    def session(self, database=None):
+        self.databases.append(database)
+        return FakeSession(self)
+
+
+def graph_document(text, chunk_hash, gene_ids):
+    genes = [Node(id=gene_id, type="Gene") for gene_id in gene_ids]
+    disease = Node(id="Covid-19", type="Disease")
+    return GraphDocument(
+        nodes=genes + [disease],
+        relationships=[
+            Relationship(source=gene, target=disease, type="ASSOCIATED_WITH")
+            for gene in genes
+        ],
+        source=Document(page_content=text, metadata={"chunk_hash": chunk_hash, "chunk": 0}),
+    )
+
+
+def test_write_batches_rows_per_group():
+    driver = FakeDriver()
+    writer = Neo4jBatchWriter(driver, database="kg", batch_size=2)
+    documents = [
+        graph_document("first chunk", "h1", ["Ace2", "Tmprss2"]),
+        graph_document("second chunk", "h2", ["Ace2", "Il6"]),
+    ]
+
+    stats = writer.write(documents, document_name="paper.txt")
+
+    assert driver.databases == ["kg"]
+    assert stats["nodes"] == 4
+    assert stats["relationships"] == 3
+    assert stats["documents"] == 0
+    # Three distinct genes in batches of two, one disease, three relationships in two
+    queries = [query for query, _ in driver.calls]
+    assert len(queries) == driver.transactions == 5
+    gene_calls = [params for query, params in driver.calls if "MERGE (n:`Gene`" in query]
+    assert [len(params["rows"]) for params in gene_calls] == [2, 1]
+    assert all(query.startswith("UNWIND $rows AS row ") for query in queries)
+
+    rows = {row["id"]: row for params in gene_calls for row in params["rows"]}
+    # Provenance is scoped to the document the chunks were written for
+    assert rows["Ace2"]["chunks"] == ["paper.txt:h1", "paper.txt:h2"]
+    assert all(params["document_name"] == "paper.txt" for _, params in driver.calls)
+
+    rel_queries = [query for query in queries if "MERGE (source)-[r:`ASSOCIATED_WITH`]->(target)" in query]
+    assert len(rel_queries) == 2
+    assert "MERGE (source:`Gene` {id: row.source})" in rel_queries[0]
+    assert "MERGE (target:`Disease` {id: row.target})" in rel_queries[0]
+
+
+def test_write_with_source_documents_and_base_entity_label():
+    driver = FakeDriver()
+    writer = Neo4jBatchWriter(
+        driver, batch_size=1000, base_entity_label=True, include_source=True
+    )
+    documents = [graph_document("first chunk", "h1", ["Ace2"])]
+
+    stats = writer.write(documents)
+
+    assert stats["documents"] == 1
+    queries = [query for query, _ in driver.calls]
+    node_queries = [query for query in queries if "MERGE (n:" in query]
+    assert node_queries
+    assert all("MERGE (n:`__Entity__` {id: row.id}) SET n:" in query for query in node_queries)
+    assert "SET n.source_document" not in node_queries[0]
+
+    document_query, document_params = driver.calls[-1]
+    assert document_query.startswith("UNWIND $rows AS row MERGE (d:Document {id: row.id})")
+    assert "MATCH (n:`__Entity__` {id: mention.id})" in document_query
+    (row,) = document_params["rows"]
+    assert row["text"] == "first chunk"
+    assert row["metadata"] == {"chunk_hash": "h1", "chunk": 0}
+    assert row["chunks"] == ["h1"]
+    assert "SET d.chunks = coalesce(d.chunks, [])" in document_query
+    assert {"id": "Ace2", "label": "Gene"} in row["mentions"]
+
+
+def test_delete_chunks_is_scoped_to_the_document():
+    driver = FakeDriver()
+    writer = Neo4jBatchWriter(driver, include_source=True)
+
+    writer.delete_chunks(["h1", "h2"], document_name="paper.txt")
+
+    assert len(driver.calls) == 3
+    assert all(
+        params == {"chunks": ["paper.txt:h1", "paper.txt:h2"]} for _, params in driver.calls
+    )
+    document_query = driver.calls[0][0]
+    # A source document shared with another document only loses this one's chunks
+    assert "d.chunk_hash" not in document_query
+    assert "WITH d WHERE size(d.chunks) = 0 DETACH DELETE d" in document_query
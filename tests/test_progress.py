@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+import progress
+from event_loop import BackgroundLoop
+from progress import ConsoleReporter, reporter, set_reporter
+
+
+class RecordingReporter:
+    """Captures the submitting thread and records which caller each message is for."""
+
+    def __init__(self):
+        self.messages = []
+
+    def capture(self):
+        return threading.current_thread().name
+
+    def write(self, message):
+        self.messages.append((progress._caller_context.get(), message))
+
+
+def test_concurrent_callers_keep_their_own_context():
+    backend = RecordingReporter()
+    set_reporter(backend)
+    loop = BackgroundLoop(name="test-loop")
+    both_running = threading.Barrier(2)
+
+    async def ingest(name):
+        async def chunk(index):
+            await asyncio.sleep(0.01)
+            reporter.write(f"{name} chunk {index}")
+
+        reporter.write(f"{name} start")
+        # Workers spawned by the coroutine report for the same caller
+        await asyncio.gather(*(chunk(index) for index in range(3)))
+
+    def session(name):
+        both_running.wait()
+        loop.run(reporter.bind(ingest(name)))
+
+    try:
+        threads = [
+            threading.Thread(target=session, args=(name,), name=name)
+            for name in ("session-a", "session-b")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        loop.stop()
+        set_reporter(ConsoleReporter())
+
+    assert len(backend.messages) == 8
+    for caller, message in backend.messages:
+        assert message.startswith(caller)
+
+
+def test_context_is_reset_after_the_call():
+    backend = RecordingReporter()
+    set_reporter(backend)
+    try:
+        asyncio.run(reporter.bind(asyncio.sleep(0)))
+        reporter.write("outside")
+    finally:
+        set_reporter(ConsoleReporter())
+
+    assert backend.messages == [(None, "outside")]
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+import rate_limiter
+from rate_limiter import TokenBucketRateLimiter, estimate_tokens
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def send_times(limiter, clock, count, tokens=0):
+    """Times at which `count` back-to-back callers get to send their request."""
+    times = []
+    for _ in range(count):
+        # Every caller asks at the same moment, it is sent once its wait is over
+        times.append(clock.now + limiter._reserve(tokens))
+    return times
+
+
+def max_per_window(times, window=60.0):
+    return max(sum(1 for t in times if start <= t < start + window) for start in times)
+
+
+def test_no_window_exceeds_the_request_quota(clock):
+    limiter = TokenBucketRateLimiter(requests_per_minute=10)
+
+    times = send_times(limiter, clock, 40)
+
+    # One request of burst, the other nine spread over the first minute
+    assert times[0] == 0.0
+    assert times[1] == pytest.approx(60 / 9)
+    assert max_per_window(times) <= 10
+
+
+def test_no_window_exceeds_the_token_quota(clock):
+    limiter = TokenBucketRateLimiter(tokens_per_minute=10000)
+
+    times = send_times(limiter, clock, 50, tokens=1000)
+
+    assert max_per_window(times) <= 10
+    assert times == sorted(times)
+
+
+def test_reservations_are_served_in_order(clock):
+    limiter = TokenBucketRateLimiter(requests_per_minute=60, burst=0.5)
+
+    waits = [limiter._reserve(0) for _ in range(35)]
+
+    # 30 requests of burst, then one per two seconds (30 per minute refill)
+    assert waits[:30] == [0.0] * 30
+    assert waits[30:] == pytest.approx([2.0, 4.0, 6.0, 8.0, 10.0])
+    assert limiter.total_wait == pytest.approx(30.0)
+
+
+def test_refill_pays_off_reservations(clock):
+    limiter = TokenBucketRateLimiter(requests_per_minute=10, burst=0.5)
+    assert [limiter._reserve(0) for _ in range(5)] == [0.0] * 5
+
+    clock.now = 60.0
+
+    # Refilled up to the burst capacity, not beyond it
+    assert [limiter._reserve(0) for _ in range(5)] == [0.0] * 5
+    assert limiter._reserve(0) == pytest.approx(12.0)
+
+
+def test_oversized_request_is_clamped_to_the_quota(clock):
+    limiter = TokenBucketRateLimiter(tokens_per_minute=1000, burst=0.1)
+
+    assert limiter._reserve(50000) == pytest.approx((1000 - 100) / (900 / 60))
+
+
+def test_acquire_waits_for_the_reservation(clock, monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    limiter = TokenBucketRateLimiter(requests_per_minute=10)
+
+    assert asyncio.run(limiter.acquire()) == 0.0
+    wait = asyncio.run(limiter.acquire())
+    assert wait == pytest.approx(60 / 9)
+    assert slept == [wait]
+    assert limiter.acquire_sync() == pytest.approx(2 * 60 / 9)
+    assert clock.now == pytest.approx(2 * 60 / 9)
+
+
+def test_invalid_burst_and_disabled_limits():
+    with pytest.raises(ValueError):
+        TokenBucketRateLimiter(requests_per_minute=10, burst=1.0)
+    assert TokenBucketRateLimiter()._reserve(10**6) == 0.0
+    assert estimate_tokens("a" * 40) == 11
@@ -0,0 +1,180 @@
+import asyncio
+import contextvars
+import json
+import threading
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from llm_graph_transformer import LLMGraphTransformer
+from telemetry import Telemetry, telemetry as shared_telemetry
+
+
+def spans_by_name(recorder):
+    return {span.name: span for span in recorder._spans}
+
+
+def test_nested_spans_share_the_trace_of_their_parent():
+    recorder = Telemetry(enabled=True)
+
+    with recorder.span("ingest_document"):
+        with recorder.span("neo4j_write"):
+            pass
+    with recorder.span("visualize_graph"):
+        pass
+
+    spans = spans_by_name(recorder)
+    assert spans["neo4j_write"].trace_id == spans["ingest_document"].trace_id
+    assert spans["neo4j_write"].parent_span_id == spans["ingest_document"].span_id
+    assert spans["ingest_document"].parent_span_id is None
+    assert spans["visualize_graph"].trace_id != spans["ingest_document"].trace_id
+
+
+def test_tasks_inherit_the_span_they_were_created_in():
+    recorder = Telemetry(enabled=True)
+
+    async def chunk(index):
+        with recorder.span(f"chunk_{index}"):
+            await asyncio.sleep(0.01)
+
+    async def ingest():
+        with recorder.span("ingest_document"):
+            # Interleaved siblings are children of the parent, not of each other
+            await asyncio.gather(*(chunk(index) for index in range(3)))
+
+    asyncio.run(ingest())
+
+    spans = spans_by_name(recorder)
+    parent = spans["ingest_document"]
+    for index in range(3):
+        assert spans[f"chunk_{index}"].parent_span_id == parent.span_id
+        assert spans[f"chunk_{index}"].trace_id == parent.trace_id
+
+
+def test_threads_only_nest_when_given_the_context():
+    recorder = Telemetry(enabled=True)
+
+    def work(name):
+        with recorder.span(name):
+            pass
+
+    with recorder.span("ingest_document"):
+        plain = threading.Thread(target=work, args=("plain_thread",))
+        copied = threading.Thread(
+            target=contextvars.copy_context().run, args=(work, "copied_context")
+        )
+        for thread in (plain, copied):
+            thread.start()
+            thread.join()
+
+    spans = spans_by_name(recorder)
+    parent = spans["ingest_document"]
+    assert spans["copied_context"].parent_span_id == parent.span_id
+    assert spans["plain_thread"].parent_span_id is None
+    assert spans["plain_thread"].trace_id != parent.trace_id
+
+
+def test_sync_worker_pool_spans_nest_under_the_caller():
+    llm = FakeListChatModel(responses=["[]"] * 4)
+    transformer = LLMGraphTransformer(llm=llm, max_concurrency=2)
+    documents = [Document(page_content=f"Chunk {index}") for index in range(4)]
+    shared_telemetry.reset()
+    shared_telemetry.configure(True)
+    try:
+        with shared_telemetry.span("ingest_document") as parent:
+            transformer.convert_to_graph_documents(documents)
+        requests = [span for span in shared_telemetry._spans if span.name == "llm_request"]
+    finally:
+        shared_telemetry.configure(False)
+        shared_telemetry.reset()
+
+    assert len(requests) == 4
+    assert {span.trace_id for span in requests} == {parent.trace_id}
+
+
+def test_disabled_telemetry_records_nothing():
+    recorder = Telemetry()
+
+    with recorder.span("ingest_document"):
+        recorder.increment("chunks_extracted_total")
+
+    assert recorder._spans == []
+    assert recorder.to_prometheus() == "\n"
+
+
+def test_prometheus_escapes_label_values():
+    recorder = Telemetry(enabled=True)
+    recorder.increment("chunks_skipped_total", 2, document='C:\\papers\\"ace2"\nv2.txt')
+
+    text = recorder.to_prometheus()
+
+    assert "# TYPE kg_chunks_skipped_total counter" in text
+    assert (
+        'kg_chunks_skipped_total{document="C:\\\\papers\\\\\\"ace2\\"\\nv2.txt"} 2' in text
+    )
+    # Every sample stays on one line
+    assert all(line.startswith(("#", "kg_")) for line in text.strip().split("\n"))
+
+
+def test_prometheus_histogram_buckets_are_cumulative():
+    recorder = Telemetry(enabled=True)
+    for value in (0.003, 0.2, 0.2, 100.0):
+        recorder.observe("llm_request_seconds", value)
+
+    lines = recorder.to_prometheus().strip().split("\n")
+
+    assert 'kg_llm_request_seconds_bucket{le="0.005"} 1' in lines
+    assert 'kg_llm_request_seconds_bucket{le="0.25"} 3' in lines
+    assert 'kg_llm_request_seconds_bucket{le="60.0"} 3' in lines
+    assert 'kg_llm_request_seconds_bucket{le="+Inf"} 4' in lines
+    assert "kg_llm_request_seconds_count 4" in lines
+
+
+def test_otlp_json_layout(tmp_path):
+    recorder = Telemetry(enabled=True, service_name="kg-test")
+    with recorder.span("ingest_document", document="paper.txt", chunks=3, streaming=False):
+        with pytest.raises(ValueError):
+            with recorder.span("neo4j_write"):
+                raise ValueError("boom")
+    recorder.increment("chunks_extracted_total", 3)
+    path = tmp_path / "telemetry" / "otlp.json"
+
+    recorder.write_otlp_json(str(path))
+    export = json.loads(path.read_text())
+
+    resource_spans = export["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "kg-test"}}
+    ]
+    spans = {span["name"]: span for span in resource_spans["scopeSpans"][0]["spans"]}
+    parent, child = spans["ingest_document"], spans["neo4j_write"]
+    assert len(parent["traceId"]) == 32 and len(parent["spanId"]) == 16
+    assert "parentSpanId" not in parent
+    assert child["parentSpanId"] == parent["spanId"]
+    assert child["status"] == {"code": 2, "message": "ValueError: boom"}
+    assert parent["status"] == {"code": 1}
+    assert parent["attributes"] == [
+        {"key": "document", "value": {"stringValue": "paper.txt"}},
+        {"key": "chunks", "value": {"intValue": "3"}},
+        {"key": "streaming", "value": {"boolValue": False}},
+    ]
+    assert int(parent["endTimeUnixNano"]) >= int(child["endTimeUnixNano"])
+
+    metrics = {
+        metric["name"]: metric
+        for metric in export["resourceMetrics"][0]["scopeMetrics"][0]["metrics"]
+    }
+    counter = metrics["chunks_extracted_total"]["sum"]
+    assert counter["isMonotonic"] and counter["aggregationTemporality"] == 2
+    assert counter["dataPoints"][0]["asDouble"] == 3
+    durations = metrics["span_duration_seconds"]["histogram"]["dataPoints"]
+    assert {point["attributes"][0]["value"]["stringValue"] for point in durations} == {
+        "ingest_document", "neo4j_write"
+    }
+    for point in durations:
+        assert len(point["bucketCounts"]) == len(point["explicitBounds"]) + 1
+        assert point["count"] == "1"
+    assert metrics["span_errors_total"]["sum"]["dataPoints"][0]["attributes"] == [
+        {"key": "span", "value": {"stringValue": "neo4j_write"}}
+    ]